@@ -1,5 +1,23 @@
-from SANALMUHASEBECIM.app import create_app
-from SANALMUHASEBECIM.extensions import db, login_manager, mail, migrate
+"""Sanal Muhasebecim paketi.
 
-# Backwards compatibility for modules importing app, db, etc.
-app = create_app()
+``app``, ``create_app`` ve eklenti nesneleri ilk erişimde yüklenir: paketi (ya da
+``SANALMUHASEBECIM.config`` gibi bir alt modülü) içe aktarmak artık bir uygulama
+kurmaz, veritabanına dokunmaz.
+"""
+
+_EXTENSIONS = ('db', 'login_manager', 'mail', 'migrate')
+
+
+def __getattr__(name):
+    # Backwards compatibility for modules importing app, db, etc.
+    if name == 'create_app':
+        from SANALMUHASEBECIM.app import create_app
+        return create_app
+    if name in _EXTENSIONS:
+        from SANALMUHASEBECIM import extensions
+        return getattr(extensions, name)
+    if name == 'app':
+        from SANALMUHASEBECIM.app import create_app
+        app = globals()['app'] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
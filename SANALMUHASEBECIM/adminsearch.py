@@ -0,0 +1,151 @@
+"""Admin liste sayfaları için indeksli, normalize arama.
+
+Aranan alanlar yazma anında Türkçe'ye uygun şekilde katlanıp (İ/I/ı -> i,
+aksanlar -> ascii, küçük harf) modeldeki ``search_text`` sütununa yazılır ve
+katlanmış metnin trigramları ``search_token`` tablosuna eklenir. Sorgu aynı
+şekilde katlandığı için arama veritabanı collation'ından bağımsızdır; SQLite
+ve MSSQL aynı sonucu döndürür.
+
+* 3+ karakterlik aramalar: trigram indeksinden aday id'ler (hepsini içeren
+  kayıtlar) seçilir, ``search_text LIKE`` ile doğrulanır,
+* daha kısa aramalar: dar ve indeksli ``search_text`` sütununda ``LIKE``.
+
+Eski kayıtlar için ``flask admin-search rebuild`` çalıştırılır.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import and_, event, func, select
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Appointment, SearchToken, Subscriber, Ticket, User
+from SANALMUHASEBECIM.search import fold
+
+SEARCH_TEXT_LENGTH = 255
+
+# model -> (search_token.entity, katlanan alanlar)
+SEARCHABLE = {
+    User: ('user', ('name', 'email')),
+    Appointment: ('appointment', ('email',)),
+    Ticket: ('ticket', ('subject',)),
+    Subscriber: ('subscriber', ('email',)),
+}
+
+_tokens = SearchToken.__table__
+
+
+def normalize(value):
+    """Fold and collapse whitespace the same way for stored text and queries."""
+    return ' '.join(fold(value or '').split())
+
+
+def trigrams(value):
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def search_text_for(target):
+    _, fields = SEARCHABLE[type(target)]
+    return normalize(' '.join(getattr(target, f) or '' for f in fields))[:SEARCH_TEXT_LENGTH]
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_condition(model, q):
+    """Return a WHERE clause matching ``q`` against ``model``'s searchable fields, or None."""
+    folded = normalize(q)[:SEARCH_TEXT_LENGTH]
+    if not folded:
+        return None
+    entity, _ = SEARCHABLE[model]
+    like = model.search_text.like(f"%{_escape_like(folded)}%", escape='\\')
+    grams = trigrams(folded)
+    if not grams:
+        return like
+    # (entity, token, entity_id) birincil anahtarı tekil olduğundan COUNT = eşleşen farklı trigram sayısı
+    candidates = (
+        select(SearchToken.entity_id)
+        .where(SearchToken.entity == entity, SearchToken.token.in_(sorted(grams)))
+        .group_by(SearchToken.entity_id)
+        .having(func.count() == len(grams))
+    )
+    return and_(model.id.in_(candidates), like)
+
+
+def apply_search(query, model, q):
+    """Narrow a ``Query`` or ``select()`` to rows matching ``q``; no-op when ``q`` is empty."""
+    condition = search_condition(model, q) if q else None
+    return query if condition is None else query.where(condition)
+
+
+def _write_tokens(connection, entity, entity_id, value):
+    connection.execute(_tokens.delete().where(_tokens.c.entity == entity, _tokens.c.entity_id == entity_id))
+    grams = trigrams(value or '')
+    if grams:
+        connection.execute(_tokens.insert(), [
+            {'entity': entity, 'token': g, 'entity_id': entity_id} for g in sorted(grams)
+        ])
+
+
+def _set_search_text(mapper, connection, target):
+    target.search_text = search_text_for(target)
+
+
+def _index_after_insert(mapper, connection, target):
+    _write_tokens(connection, SEARCHABLE[type(target)][0], target.id, target.search_text)
+
+
+def _index_after_update(mapper, connection, target):
+    if db.inspect(target).attrs.search_text.history.has_changes():
+        _write_tokens(connection, SEARCHABLE[type(target)][0], target.id, target.search_text)
+
+
+def _index_after_delete(mapper, connection, target):
+    entity = SEARCHABLE[type(target)][0]
+    connection.execute(_tokens.delete().where(_tokens.c.entity == entity, _tokens.c.entity_id == target.id))
+
+
+for _model in SEARCHABLE:
+    event.listen(_model, 'before_insert', _set_search_text)
+    event.listen(_model, 'before_update', _set_search_text)
+    event.listen(_model, 'after_insert', _index_after_insert)
+    event.listen(_model, 'after_update', _index_after_update)
+    event.listen(_model, 'after_delete', _index_after_delete)
+
+
+def rebuild(batch_size=500):
+    """Recompute ``search_text`` and trigram rows for every searchable model."""
+    totals = {}
+    for model, (entity, fields) in SEARCHABLE.items():
+        columns = [model.id] + [getattr(model, f) for f in fields]
+        db.session.execute(_tokens.delete().where(_tokens.c.entity == entity))
+        last_id, total = 0, 0
+        while True:
+            rows = db.session.execute(
+                select(*columns).where(model.id > last_id).order_by(model.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            updates, tokens = [], []
+            for row in rows:
+                value = normalize(' '.join(v or '' for v in row[1:]))[:SEARCH_TEXT_LENGTH]
+                updates.append({'id': row[0], 'search_text': value})
+                tokens.extend({'entity': entity, 'token': g, 'entity_id': row[0]} for g in sorted(trigrams(value)))
+            db.session.execute(db.update(model), updates)
+            if tokens:
+                db.session.execute(_tokens.insert(), tokens)
+            db.session.commit()
+            last_id = rows[-1][0]
+            total += len(rows)
+        db.session.commit()
+        totals[entity] = total
+    return totals
+
+
+admin_search_cli = AppGroup('admin-search', help='Admin list search index commands.')
+
+
+@admin_search_cli.command('rebuild')
+def rebuild_command():
+    """Backfill search_text columns and trigram tokens."""
+    for entity, total in rebuild().items():
+        click.echo(f"{entity}: {total} rows indexed.")
@@ -1,33 +1,20 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask, request, render_template
 from werkzeug.middleware.proxy_fix import ProxyFix
 from SANALMUHASEBECIM.extensions import init_extensions
 from SANALMUHASEBECIM.config import config
-from werkzeug.security import generate_password_hash
+from SANALMUHASEBECIM.startup import StartupMetrics, prepare_schema, seed_default_users  # noqa: F401 - eski içe aktarmalar
 import os
 from dotenv import load_dotenv
 
-
-def seed_default_users(app):
-    """Create default admin and user if they do not exist."""
-    with app.app_context():
-        from SANALMUHASEBECIM.extensions import db
-        from SANALMUHASEBECIM.models import User
-        try:
-            if User.query.filter_by(email='admin@example.com').first() is None:
-                admin = User(name='Admin', email='admin@example.com', password=generate_password_hash('admin'))
-                admin.is_admin = True
-                admin.email_confirmed = True
-                db.session.add(admin)
-            if User.query.filter_by(email='user@example.com').first() is None:
-                user = User(name='User', email='user@example.com', password=generate_password_hash('user'))
-                user.email_confirmed = True
-                db.session.add(user)
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
+# Bu modülün (ve flask/SQLAlchemy gibi bağımlılıklarının) içe aktarma süresi
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 
 def create_app(config_name=None):
+    metrics = StartupMetrics(IMPORT_SECONDS)
     load_dotenv()
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
@@ -36,60 +23,58 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
 
     # Initialize extensions
-    init_extensions(app)
-    # Create tables when using SQLite (no migrations needed for quick local run)
-    with app.app_context():
-        from SANALMUHASEBECIM.extensions import db
-        from sqlalchemy import text
-        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
-        if 'sqlite' in uri:
-            db.create_all()
-            # Add seen_notifications column if missing (e.g. DB created before it was in model)
-            try:
-                db.session.execute(text('SELECT seen_notifications FROM user LIMIT 1'))
-            except Exception:
-                try:
-                    db.session.execute(text('ALTER TABLE user ADD COLUMN seen_notifications TEXT'))
-                    db.session.commit()
-                except Exception:
-                    db.session.rollback()
-    seed_default_users(app)
+    with metrics.phase('extensions'):
+        init_extensions(app)
+        from SANALMUHASEBECIM.staticfiles import init_static
+        init_static(app)
+        from SANALMUHASEBECIM.sqlstats import init_sqlstats
+        init_sqlstats(app)
+    # Tablo oluşturma ve varsayılan hesaplar yalnızca DB_AUTO_SETUP ile; aksi hâlde `flask setup all`
+    if app.config.get('DB_AUTO_SETUP'):
+        with metrics.phase('db_setup'):
+            prepare_schema(app)
+            seed_default_users(app)
     # Respect X-Forwarded headers when behind proxies (e.g., trycloudflare)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_port=1, x_prefix=1)
     
     # Production güvenlik middleware'i
     if not app.config.get('DEBUG'):
-        # Rate limiting için basit cache
-        from collections import defaultdict
-        import time
-        login_attempts = defaultdict(list)
+        # Admin paneli için IP bazlı sınır; sayaçlar paylaşılan limiter deposunda tutulur
+        from flask_limiter.util import get_remote_address
+        from SANALMUHASEBECIM.extensions import limiter
+        
+        def _log_admin_breach(request_limit):
+            app.logger.warning(f'Rate limit exceeded for IP: {get_remote_address()}')
+        
+        admin_limit = limiter.limit(
+            app.config.get('ADMIN_RATE_LIMIT', '5 per minute'),
+            key_func=get_remote_address,
+            scope='admin-panel',
+            on_breach=_log_admin_breach,
+        )
         
         @app.before_request
         def rate_limiting():
-            # Admin panel için rate limiting
             if request.path.startswith('/admin'):
-                client_ip = request.remote_addr
-                current_time = time.time()
-                
-                # Son 1 dakikada 5'ten fazla admin erişim denemesi varsa engelle
-                login_attempts[client_ip] = [t for t in login_attempts[client_ip] if current_time - t < 60]
-                
-                if len(login_attempts[client_ip]) >= 5:
-                    app.logger.warning(f'Rate limit exceeded for IP: {client_ip}')
-                    return "Rate limit exceeded. Please try again later.", 429
-                
-                login_attempts[client_ip].append(current_time)
+                with admin_limit:
+                    pass
         
-        @app.before_request
-        def security_headers():
-            # Güvenlik header'ları
-            from flask import make_response
-            response = make_response()
+        @app.after_request
+        def security_headers(response):
+            # Güvenlik header'ları (before_request'ten yanıt döndürmek her isteği boş yanıtla kesiyordu)
             response.headers['X-Content-Type-Options'] = 'nosniff'
             response.headers['X-Frame-Options'] = 'SAMEORIGIN'
             response.headers['X-XSS-Protection'] = '1; mode=block'
             response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-            response.headers['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self' data:;"
+            # base.html: jQuery (code.jquery.com), Bootstrap JS (cdn.jsdelivr.net),
+            # Font Awesome (cdnjs.cloudflare.com) ve Google Fonts CDN'den yüklenir
+            response.headers['Content-Security-Policy'] = (
+                "default-src 'self'; "
+                "script-src 'self' 'unsafe-inline' https://code.jquery.com https://cdn.jsdelivr.net; "
+                "style-src 'self' 'unsafe-inline' https://cdnjs.cloudflare.com https://cdn.jsdelivr.net https://fonts.googleapis.com; "
+                "img-src 'self' data: https:; "
+                "font-src 'self' data: https://cdnjs.cloudflare.com https://fonts.gstatic.com;"
+            )
             return response
         
         @app.before_request
@@ -101,26 +86,55 @@ def create_app(config_name=None):
     # Production'da gereksiz debug logları kaldırıldı
     
     # Register blueprints
-    from SANALMUHASEBECIM.blueprints.public import bp as public_bp
-    from SANALMUHASEBECIM.blueprints.account import bp as account_bp
-    from SANALMUHASEBECIM.blueprints.blog import bp as blog_bp
-    from SANALMUHASEBECIM.blueprints.admin import bp as admin_bp
-    from SANALMUHASEBECIM.blueprints.booking import bp as booking_bp
-    from SANALMUHASEBECIM.blueprints.helpdesk import bp as helpdesk_bp
-    
-    app.register_blueprint(public_bp)
-    app.register_blueprint(account_bp, url_prefix='/account')
-    app.register_blueprint(blog_bp, url_prefix='/blog')
-    app.register_blueprint(admin_bp, url_prefix='/admin')
-    app.register_blueprint(booking_bp, url_prefix='/booking')
-    app.register_blueprint(helpdesk_bp, url_prefix='/helpdesk')
+    with metrics.phase('blueprints'):
+        from SANALMUHASEBECIM.blueprints.public import bp as public_bp
+        from SANALMUHASEBECIM.blueprints.account import bp as account_bp
+        from SANALMUHASEBECIM.blueprints.blog import bp as blog_bp
+        from SANALMUHASEBECIM.blueprints.admin import bp as admin_bp
+        from SANALMUHASEBECIM.blueprints.booking import bp as booking_bp
+        from SANALMUHASEBECIM.blueprints.helpdesk import bp as helpdesk_bp
+
+        app.register_blueprint(public_bp)
+        app.register_blueprint(account_bp, url_prefix='/account')
+        app.register_blueprint(blog_bp, url_prefix='/blog')
+        app.register_blueprint(admin_bp, url_prefix='/admin')
+        app.register_blueprint(booking_bp, url_prefix='/booking')
+        app.register_blueprint(helpdesk_bp, url_prefix='/helpdesk')
+
+    # CLI komutları
+    from SANALMUHASEBECIM.mailqueue import mail_queue_cli
+    from SANALMUHASEBECIM.newsletter import newsletter_cli
+    from SANALMUHASEBECIM.search import search_cli
+    from SANALMUHASEBECIM.adminsearch import admin_search_cli
+    from SANALMUHASEBECIM.staticfiles import static_cli
+    from SANALMUHASEBECIM.counters import counters_cli
+    from SANALMUHASEBECIM.slots import slots_cli
+    from SANALMUHASEBECIM.billing import billing_cli
+    from SANALMUHASEBECIM.startup import startup_cli
+    from SANALMUHASEBECIM.queryplans import query_plans_cli
+    app.cli.add_command(mail_queue_cli)
+    app.cli.add_command(newsletter_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(admin_search_cli)
+    app.cli.add_command(static_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(slots_cli)
+    app.cli.add_command(billing_cli)
+    app.cli.add_command(startup_cli)
+    app.cli.add_command(query_plans_cli)
     
     # Global template context
     @app.context_processor
     def inject_footer_services():
         try:
+            from types import SimpleNamespace
             from SANALMUHASEBECIM.models import Service
-            footer_services = Service.query.filter_by(is_active=True).order_by(Service.order_index).limit(6).all()
+            from SANALMUHASEBECIM.pagecache import cached_fragment
+
+            def build():
+                rows = Service.query.filter_by(is_active=True).order_by(Service.order_index).limit(6).all()
+                return [SimpleNamespace(name=s.name, slug=s.slug) for s in rows]
+            footer_services = cached_fragment('footer_services', ('services',), build)
         except Exception:
             footer_services = []
         return dict(footer_services=footer_services)
@@ -133,29 +147,8 @@ def create_app(config_name=None):
         unread_ticket_count = 0
         try:
             from flask_login import current_user
-            from flask import session
-            from SANALMUHASEBECIM.models import Ticket, TicketMessage
-            if current_user.is_authenticated and not current_user.is_admin:
-                tickets = Ticket.query.filter_by(user_id=current_user.id).all()
-                last_seen_map = session.get('ticket_last_seen', {}) or {}
-                total = 0
-                for t in tickets:
-                    seen_iso = last_seen_map.get(str(t.id))
-                    seen_dt = None
-                    if seen_iso:
-                        from datetime import datetime as _dt
-                        try:
-                            seen_dt = _dt.fromisoformat(seen_iso)
-                        except Exception:
-                            seen_dt = None
-                    q = TicketMessage.query.filter(
-                        TicketMessage.ticket_id == t.id,
-                        TicketMessage.user_id != current_user.id
-                    )
-                    if seen_dt:
-                        q = q.filter(TicketMessage.created_at > seen_dt)
-                    total += q.count()
-                unread_ticket_count = total
+            from SANALMUHASEBECIM.unread import get_unread_count
+            unread_ticket_count = get_unread_count(current_user)
         except Exception:
             unread_ticket_count = 0
         return dict(
@@ -205,4 +198,5 @@ def create_app(config_name=None):
             return f'<pre style="white-space:pre-wrap;text-align:left;">Internal Server Error\n\n{tb}</pre>', 500
         return "Internal Server Error", 500
 
+    metrics.finish(app)
     return app
@@ -0,0 +1,232 @@
+"""Aylık müşteriler için toplu faturalama çalıştırması.
+
+Bir dönem (ayın ilk günü) için sırasıyla:
+
+1. Aktif aylık lead'lerin o aya ait ``MonthlyPayment`` satırları tek bir
+   ``INSERT ... SELECT`` ile ``due`` durumunda oluşturulur; satırı olan lead
+   atlanır, benzersiz (lead_id, payment_month) indeksi eşzamanlı iki
+   çalıştırmayı da engeller. ``pending`` müşterinin ödeme bildirdiği ve admin
+   onayı bekleyen satırlar içindir; faturalama bunlara dokunmaz.
+2. Son ödeme günü (``BILLING_DUE_DAY``) ve ek süre (``BILLING_GRACE_DAYS``)
+   geçmiş ``due`` satırlar tek bir ``UPDATE`` ile ``overdue`` olur.
+3. Ödeme günü yaklaşan ve gecikmiş satırlar için hatırlatma e-postaları
+   kuyruğa (``outbound_email``) yazılır. Satırlar lead ve kullanıcı bilgisiyle
+   tek sorguda, id sırasıyla partiler hâlinde okunur; gönderilen aşama
+   ``MonthlyPayment.reminder_level`` alanında tutulur, aynı hatırlatma iki kez
+   gitmez.
+
+Her adım tekrar çalıştırılabilir; cron'dan günde bir kez çağrılması yeterlidir::
+
+    flask billing run              # bugünün dönemi
+    flask billing run --period 2025-03 --send
+"""
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import Date, Integer, String, DateTime, and_, exists, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Lead, MonthlyPayment, User
+
+BATCH_SIZE = 500
+RECURRING_STATUSES = ('paid', 'completed')
+# Ödemesi henüz alınmamış (müşteri bildirimi veya admin onayı bekleyen) satırlar
+OPEN_STATUSES = ('due', 'overdue', 'pending')
+
+# reminder_level değerleri
+REMINDER_NONE = 0
+REMINDER_DUE = 1
+REMINDER_OVERDUE = 2
+
+TURKISH_MONTHS = {
+    1: 'Ocak', 2: 'Şubat', 3: 'Mart', 4: 'Nisan', 5: 'Mayıs', 6: 'Haziran',
+    7: 'Temmuz', 8: 'Ağustos', 9: 'Eylül', 10: 'Ekim', 11: 'Kasım', 12: 'Aralık'
+}
+
+
+def period_of(day):
+    return day.replace(day=1)
+
+
+def next_period(period):
+    return date(period.year + (period.month == 12), period.month % 12 + 1, 1)
+
+
+def _due_offset():
+    """Days between the first of the month and its due date."""
+    return max(1, min(28, int(current_app.config.get('BILLING_DUE_DAY', 5)))) - 1
+
+
+def due_date(period):
+    return period + timedelta(days=_due_offset())
+
+
+def generate_payments(period):
+    """Create the period's ``due`` ``MonthlyPayment`` rows for every active monthly lead; returns rows created."""
+    now = datetime.utcnow()
+    already_billed = exists().where(
+        MonthlyPayment.lead_id == Lead.id,
+        MonthlyPayment.payment_month == period,
+    )
+    source = select(
+        Lead.id,
+        Lead.monthly_amount,
+        literal(period, Date),
+        literal('due', String),
+        literal(due_date(next_period(period)), Date),
+        literal(REMINDER_NONE, Integer),
+        literal(now, DateTime),
+        literal(now, DateTime),
+    ).where(
+        Lead.lead_type == 'monthly',
+        Lead.status.in_(RECURRING_STATUSES),
+        Lead.monthly_amount.isnot(None),
+        ~already_billed,
+    )
+    stmt = insert(MonthlyPayment).from_select(
+        ['lead_id', 'amount', 'payment_month', 'status', 'next_payment_date', 'reminder_level', 'created_at', 'updated_at'],
+        source,
+    )
+    try:
+        created = db.session.execute(stmt).rowcount
+        db.session.commit()
+    except IntegrityError:
+        # Aynı dönem başka bir çalıştırma tarafından eşzamanlı oluşturuldu
+        db.session.rollback()
+        created = 0
+    return created
+
+
+def mark_overdue(today):
+    """Flag unpaid ``due`` payments whose due date plus grace period has passed; returns rows updated."""
+    grace = int(current_app.config.get('BILLING_GRACE_DAYS', 3))
+    # due_date(payment_month) + grace < today  <=>  payment_month < today - grace - due_offset
+    cutoff = today - timedelta(days=grace + _due_offset())
+    updated = db.session.execute(
+        update(MonthlyPayment)
+        .where(MonthlyPayment.status == 'due', MonthlyPayment.payment_month < cutoff)
+        .values(status='overdue', updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return updated
+
+
+def settle_oldest(lead_id):
+    """Confirm the lead's oldest unpaid payment so no further reminder goes out; returns it (or None).
+
+    Does not commit; the caller commits together with its own lead updates.
+    """
+    payment = (
+        MonthlyPayment.query
+        .filter(MonthlyPayment.lead_id == lead_id, MonthlyPayment.status.in_(OPEN_STATUSES))
+        .order_by(MonthlyPayment.payment_month)
+        .first()
+    )
+    if payment is not None:
+        payment.status = 'confirmed'
+        payment.payment_date = payment.payment_date or date.today()
+        payment.confirmation_date = datetime.utcnow()
+    return payment
+
+
+def _reminder_email(row, level):
+    from SANALMUHASEBECIM.emails import render_email
+    month_name = f"{TURKISH_MONTHS[row.payment_month.month]} {row.payment_month.year}"
+    due = due_date(row.payment_month).strftime('%d.%m.%Y')
+    if level == REMINDER_OVERDUE:
+        subject = f"Gecikmiş Ödeme - {month_name}"
+        intro = f"{month_name} dönemine ait ödemeniz son ödeme tarihi ({due}) itibarıyla henüz alınmadı."
+    else:
+        subject = f"Aylık Ödeme Hatırlatması - {month_name}"
+        intro = f"{month_name} dönemine ait aylık ödemenizin son ödeme tarihi yaklaşıyor."
+    html_body, text_body = render_email(
+        'billing_reminder',
+        name=(row.name or '').split()[0] if row.name else 'Değerli Müşterimiz',
+        intro=intro, amount=row.amount, iban=row.iban, due=due,
+    )
+    return subject, text_body, html_body
+
+
+def _queue_stage(condition, level):
+    """Queue one reminder per matching payment, batch by batch; returns emails queued."""
+    from SANALMUHASEBECIM.mailqueue import enqueue_email
+    queued = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(
+                MonthlyPayment.id, MonthlyPayment.payment_month, MonthlyPayment.amount,
+                Lead.iban, User.email, User.name,
+            )
+            .join(Lead, MonthlyPayment.lead_id == Lead.id)
+            .join(User, Lead.user_id == User.id)
+            .where(condition, MonthlyPayment.reminder_level < level, MonthlyPayment.id > last_id)
+            .order_by(MonthlyPayment.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return queued
+        last_id = rows[-1].id
+        for row in rows:
+            if row.email:
+                subject, text_body, html_body = _reminder_email(row, level)
+                enqueue_email(subject=subject, recipients=[row.email], text_body=text_body, html_body=html_body, commit=False)
+                queued += 1
+        # E-postalar ve aşama işareti aynı transaction'da: yarıda kalan parti tekrar kuyruğa girmez
+        db.session.execute(
+            update(MonthlyPayment)
+            .where(MonthlyPayment.id.in_([row.id for row in rows]))
+            .values(reminder_level=level)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+
+def queue_reminders(today):
+    """Queue due-soon and overdue reminders that have not been sent yet; returns (due, overdue) counts."""
+    days_before = int(current_app.config.get('BILLING_REMINDER_DAYS', 5))
+    # due_date(payment_month) - days_before <= today
+    due_soon = and_(
+        MonthlyPayment.status == 'due',
+        MonthlyPayment.payment_month <= today + timedelta(days=days_before - _due_offset()),
+    )
+    due = _queue_stage(due_soon, REMINDER_DUE)
+    overdue = _queue_stage(MonthlyPayment.status == 'overdue', REMINDER_OVERDUE)
+    return due, overdue
+
+
+def run_billing(today=None, period=None):
+    """Run a full billing pass; safe to repeat. Returns a summary dict."""
+    today = today or date.today()
+    period = period_of(period or today)
+    created = generate_payments(period)
+    overdue = mark_overdue(today)
+    due_reminders, overdue_reminders = queue_reminders(today)
+    return {
+        'period': period.strftime('%Y-%m'),
+        'created': created,
+        'marked_overdue': overdue,
+        'due_reminders': due_reminders,
+        'overdue_reminders': overdue_reminders,
+    }
+
+
+billing_cli = AppGroup('billing', help='Monthly billing commands.')
+
+
+@billing_cli.command('run')
+@click.option('--period', default=None, help='Billing period as YYYY-MM (default: current month).')
+@click.option('--send', is_flag=True, help='Drain the email queue after queuing reminders.')
+def run_command(period, send):
+    """Generate monthly payments, mark overdue ones and queue reminders."""
+    period_date = datetime.strptime(period, '%Y-%m').date() if period else None
+    summary = run_billing(period=period_date)
+    for key, value in summary.items():
+        click.echo(f"{key}: {value}")
+    if send:
+        from SANALMUHASEBECIM.mailqueue import drain
+        click.echo(f"Sent: {drain()}")
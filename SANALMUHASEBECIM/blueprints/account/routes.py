@@ -1,13 +1,11 @@
 from flask import render_template, flash, redirect, url_for, request, current_app, jsonify, session
 from flask_login import login_user, current_user, logout_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
-import os
 from . import bp
+from SANALMUHASEBECIM.media import store_upload
 from SANALMUHASEBECIM.models import User, Media, Profile, ServiceRequest, Lead, CustomerService, Payment, Service, MonthlyPayment
 from SANALMUHASEBECIM.forms import RegisterForm, LoginForm, ForgotPasswordForm, ResetPasswordForm, UpdatePasswordForm, ProfileForm, ServiceRequestForm
 from SANALMUHASEBECIM.extensions import db, limiter, oauth, csrf
-from authlib.integrations.base_client.errors import OAuthError
 from SANALMUHASEBECIM.utils import send_confirmation_email, send_password_reset_email, send_telegram_message
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
@@ -143,6 +141,7 @@ def login_facebook():
 
 @bp.route('/auth/google/callback')
 def google_callback():
+    from authlib.integrations.base_client.errors import OAuthError
     if 'google' not in oauth._clients:
         flash('Google OAuth yapılandırması eksik.', 'danger')
         return redirect(url_for('account.login'))
@@ -423,17 +422,8 @@ def upload():
         flash('Dosya seçilmedi.', 'danger')
         return redirect(url_for('account.profile'))
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        os.makedirs(upload_folder, exist_ok=True)
-        filepath = os.path.join(upload_folder, filename)
-        file.save(filepath)
-        # URL oluştur (statik yol)
-        rel_path = os.path.relpath(filepath, os.path.join(current_app.root_path, 'static'))
-        url = url_for('static', filename=rel_path.replace('\\', '/'))
-        media = Media(file_name=filename, url=url, mime=file.mimetype, size=os.path.getsize(filepath), user_id=current_user.id)
-        db.session.add(media)
-        db.session.commit()
+        # İçerik adresli depoya akış halinde yazılır; aynı isimli dosyalar birbirini ezmez
+        store_upload(file, user_id=current_user.id)
         flash('Dosya yüklendi.', 'success')
     else:
         flash('İzin verilmeyen dosya türü.', 'danger')
@@ -459,18 +449,11 @@ def upload_profile_photo():
         return redirect(url_for('account.profile'))
     
     if file and file.filename:
-        filename = secure_filename(f"profile_{current_user.id}_{int(datetime.utcnow().timestamp())}.{file.filename.rsplit('.', 1)[1].lower()}")
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        os.makedirs(upload_folder, exist_ok=True)
-        filepath = os.path.join(upload_folder, filename)
-        file.save(filepath)
-        
-        # URL oluştur
-        rel_path = os.path.relpath(filepath, os.path.join(current_app.root_path, 'static'))
-        url = url_for('static', filename=rel_path.replace('\\', '/'))
-        
-        # Kullanıcının profil fotoğrafını güncelle
-        current_user.profile_photo = url
+        filename = f"profile_{current_user.id}.{file.filename.rsplit('.', 1)[1].lower()}"
+        media = store_upload(file, user_id=current_user.id, file_name=filename, commit=False)
+        
+        # Avatarlar küçük gösterildiği için varsa küçük WebP türevi kullanılır
+        current_user.profile_photo = media.thumb_url
         db.session.commit()
         
         flash('Profil fotoğrafınız başarıyla güncellendi.', 'success')
@@ -490,6 +473,28 @@ def notify_payment(lead_id):
         flash('Bu işlem için yetkiniz yok.', 'danger')
         return redirect(url_for('account.my_services'))
     
+    # Aktif aylık hizmet: faturalanmış dönemin ödemesi bildiriliyor, admin onayına düşer
+    if lead.lead_type == 'monthly':
+        payment = (
+            MonthlyPayment.query
+            .filter(MonthlyPayment.lead_id == lead.id, MonthlyPayment.status.in_(['due', 'overdue']))
+            .order_by(MonthlyPayment.payment_month)
+            .first()
+        )
+        if payment is None:
+            flash('Ödemesi beklenen bir dönem bulunamadı.', 'info')
+            return redirect(url_for('account.profile'))
+        payment.status = 'pending'
+        payment.payment_date = datetime.utcnow().date()
+        db.session.commit()
+        try:
+            service_name = lead.service.name if lead.service else 'Hizmet'
+            send_telegram_message(f"💰 Aylık Ödeme Bildirimi\n\nMüşteri: {current_user.name}\nHizmet: {service_name}\nDönem: {payment.payment_month.strftime('%m.%Y')}\nTutar: {payment.amount} ₺\nLead ID: #{lead.id}\n\nAdmin panelinden onaylayabilirsiniz.")
+        except:
+            pass
+        flash('Ödeme bildiriminiz alındı. Admin onayından sonra durum güncellenecektir.', 'success')
+        return redirect(url_for('account.profile'))
+
     # Lead durumu "payment_pending" mi kontrol et
     if lead.status != 'payment_pending':
         flash('Bu işlem sadece ödeme bekleyen hizmetler için geçerlidir.', 'danger')
@@ -1,17 +1,28 @@
-from flask import render_template, flash, redirect, url_for, request, jsonify, Response
+from flask import render_template, flash, redirect, url_for, request, jsonify
 from flask_login import current_user, login_required
 from functools import wraps
-from sqlalchemy import text
+from sqlalchemy import func, select, text
 from . import bp
 from SANALMUHASEBECIM.models import User, Post, Comment, Appointment, Service, Lead, Ticket, Subscriber, MonthlyPayment
 from sqlalchemy.exc import IntegrityError
 from SANALMUHASEBECIM.forms import EditUserForm, ServiceForm
 from SANALMUHASEBECIM.extensions import db
-from SANALMUHASEBECIM.utils import send_iban_payment_email, send_email, send_telegram_message, create_gcal_event, delete_gcal_event
-import csv
-import io
+from SANALMUHASEBECIM.dashboard import get_dashboard_counts, get_recent_activity
+from SANALMUHASEBECIM.queries import annotate_related_counts
+from SANALMUHASEBECIM.counters import reconcile as reconcile_counters
+from SANALMUHASEBECIM.slots import RELEASE_STATUSES, SlotTaken, reserve as reserve_slot
+from SANALMUHASEBECIM.slots import release_for_user as release_user_slots
+from SANALMUHASEBECIM.billing import run_billing, settle_oldest
+from SANALMUHASEBECIM.mailqueue import wake_workers as wake_mail_workers
+from SANALMUHASEBECIM.exports import export_response
+from SANALMUHASEBECIM.adminsearch import apply_search
+from SANALMUHASEBECIM import keyset
+from SANALMUHASEBECIM.utils import send_iban_payment_email, send_telegram_message, schedule_gcal_invite, delete_gcal_event
+from SANALMUHASEBECIM.emails import send_notice
 from datetime import datetime, timedelta
 
+ASK_QUESTIONS = "Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz."
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -43,51 +54,21 @@ def admin_required(f):
 @login_required
 @admin_required
 def dashboard():
-    # Dashboard istatistikleri
-    total_users = User.query.count()
-    total_posts = Post.query.count()
-    total_comments = Comment.query.count()
-    total_appointments = Appointment.query.count()
-    total_leads = Lead.query.count()
-    total_tickets = Ticket.query.count()
-    total_services = Service.query.count()
-    
-    # Son aktiviteler
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-    recent_posts = Post.query.order_by(Post.post_date.desc()).limit(5).all()
-    recent_appointments = Appointment.query.order_by(Appointment.created_at.desc()).limit(5).all()
-    recent_leads = Lead.query.order_by(Lead.created_at.desc()).limit(5).all()
-    
-    return render_template('admin/dashboard.html', 
+    # Dashboard istatistikleri ve son aktiviteler (tek sorgu + kısa süreli cache)
+    return render_template('admin/dashboard.html',
                          title='Admin Dashboard',
-                         total_users=total_users,
-                         total_posts=total_posts,
-                         total_comments=total_comments,
-                         total_appointments=total_appointments,
-                         total_leads=total_leads,
-                         total_tickets=total_tickets,
-                         total_services=total_services,
-                         recent_users=recent_users,
-                         recent_posts=recent_posts,
-                         recent_appointments=recent_appointments,
-                         recent_leads=recent_leads)
+                         **get_dashboard_counts(),
+                         **get_recent_activity())
 
 @bp.route("/users")
 @login_required
 @admin_required
 def users():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     q = request.args.get('q', type=str)
-    query = User.query
-    if q:
-        # Türkçe karakter desteği ile arama
-        like = f"%{q}%"
-        # SQL Server'da Turkish collation kullanarak arama
-        query = query.filter(
-            text("(User.name COLLATE Turkish_CI_AS LIKE :like COLLATE Turkish_CI_AS) OR (User.email LIKE :email)"),
-            like=like, email=like
-        )
-    users = query.order_by(User.created_at.desc()).paginate(page=page, per_page=20)
+    # Türkçe karakter desteği ile arama (katlanmış search_text + trigram indeksi)
+    query = apply_search(User.query, User, q)
+    users = keyset.paginate(query, [User.created_at, User.id], cursor)
     return render_template('admin/users.html', title='Kullanıcı Yönetimi', users=users, q=q)
 
 #@bp.route("/user/<int:user_id>/edit", methods=['GET', 'POST'])
@@ -183,9 +164,12 @@ def delete_user(user_id):
     
     try:
         # Bağımlı kayıtları temizle (ilişkisel bütünlük için)
+        # Toplu silme sayaç olaylarını atlar; etkilenen yazıların sayaçları sonra yeniden sayılır
+        affected_posts = [pid for (pid,) in db.session.query(Comment.post_id).filter_by(user_id=user.id).distinct()]
         Comment.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         Post.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         Ticket.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+        release_user_slots(user.id)
         Appointment.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         Lead.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         # ServiceRequest tablosunda user_id NOT NULL ise doğrudan sil
@@ -193,6 +177,7 @@ def delete_user(user_id):
 
         db.session.delete(user)
         db.session.commit()
+        reconcile_counters(post_ids=affected_posts, comment_ids=[])
         flash('Kullanıcı ve ilişkili kayıtları silindi.', 'success')
     except IntegrityError:
         db.session.rollback()
@@ -221,7 +206,7 @@ def toggle_user_active(user_id):
 @login_required
 @admin_required
 def posts():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     q = request.args.get('q', type=str)
     query = Post.query
     if q:
@@ -229,15 +214,8 @@ def posts():
         query = query.join(User, Post.user_id == User.id).filter(
             (Post.title.ilike(like)) | (Post.subtitle.ilike(like)) | (User.name.ilike(like))
         )
-    # Öne çıkanları üstte göstermek için sıralama (kolonlar mevcut değilse fallback)
-    try:
-        posts = query.order_by(
-            Post.is_featured.desc(),
-            Post.published_at.desc().nullslast(),
-            Post.post_date.desc()
-        ).paginate(page=page, per_page=20)
-    except Exception:
-        posts = query.order_by(Post.post_date.desc()).paginate(page=page, per_page=20)
+    # Öne çıkanlar üstte, sonra yayın tarihi (yayınlanmamışlar sonda: NULL en küçük)
+    posts = keyset.paginate(query, [Post.is_featured, Post.published_at, Post.post_date, Post.id], cursor)
     return render_template('admin/posts.html', title='Gönderi Yönetimi', posts=posts, q=q)
 
 
@@ -283,7 +261,7 @@ def toggle_post_status(post_id):
 @login_required
 @admin_required
 def comments():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     q = request.args.get('q', type=str)
     query = Comment.query
     if q:
@@ -292,7 +270,7 @@ def comments():
         query = query.join(User, Comment.user_id == User.id).join(Post, Comment.post_id == Post.id).filter(
             (User.name.ilike(like)) | (Post.title.ilike(like)) | (Comment.content.ilike(like))
         )
-    comments = query.order_by(Comment.date.desc()).paginate(page=page, per_page=20)
+    comments = keyset.paginate(query, [Comment.date, Comment.id], cursor)
     pending_count = Comment.query.filter_by(is_approved=False).count()
     return render_template('admin/comments.html', title='Yorum Yönetimi', comments=comments, pending_count=pending_count, q=q)
 
@@ -320,16 +298,14 @@ def delete_comment(comment_id):
 @login_required
 @admin_required
 def appointments():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     status = request.args.get('status')
     q = request.args.get('q')
     query = Appointment.query
     if status:
         query = query.filter(Appointment.status == status)
-    if q:
-        # Türkçe karakter desteği ile arama
-        query = query.filter(text("Appointment.email COLLATE Turkish_CI_AS LIKE :q COLLATE Turkish_CI_AS"), q=f"%{q}%")
-    appointments = query.order_by(Appointment.appointment_datetime.desc()).paginate(page=page, per_page=20)
+    query = apply_search(query, Appointment, q)
+    appointments = keyset.paginate(query, [Appointment.appointment_datetime, Appointment.id], cursor)
     return render_template('admin/appointments.html', title='Randevu Yönetimi', appointments=appointments, status=status, q=q)
 
 @bp.route("/appointments/export")
@@ -338,19 +314,14 @@ def appointments():
 def export_appointments():
     status = request.args.get('status')
     q = request.args.get('q')
-    query = Appointment.query
+    stmt = select(Appointment.email, Appointment.appointment_datetime, Appointment.status,
+                  func.coalesce(Appointment.purpose, ''))
     if status:
-        query = query.filter(Appointment.status == status)
-    if q:
-        # Türkçe karakter desteği ile arama
-        query = query.filter(text("Appointment.email COLLATE Turkish_CI_AS LIKE :q COLLATE Turkish_CI_AS"), q=f"%{q}%")
-    rows = query.order_by(Appointment.appointment_datetime.desc()).all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["email", "datetime", "status", "purpose"])
-    for r in rows:
-        writer.writerow([r.email, r.appointment_datetime, r.status, (r.purpose or "")])
-    return Response(output.getvalue(), mimetype='text/csv', headers={'Content-Disposition': 'attachment; filename=appointments.csv'})
+        stmt = stmt.where(Appointment.status == status)
+    stmt = apply_search(stmt, Appointment, q)
+    stmt = stmt.order_by(Appointment.appointment_datetime.desc())
+    return export_response(stmt, ["email", "datetime", "status", "purpose"], 'appointments',
+                           request.args.get('format', 'csv'))
 
 @bp.route("/services")
 @login_required
@@ -359,12 +330,13 @@ def services():
     page = request.args.get('page', 1, type=int)
     services = Service.query.order_by(Service.id.desc()).paginate(page=page, per_page=20)
     
-    # Her hizmet için bağlı kayıt sayılarını hesapla
-    from SANALMUHASEBECIM.models import Lead, ServiceRequest
+    # Sayfadaki tüm hizmetlerin bağlı kayıt sayıları tek sorguda
+    from SANALMUHASEBECIM.models import ServiceRequest
     
+    annotate_related_counts(services.items,
+                            lead_count=Lead.service_id,
+                            service_request_count=ServiceRequest.service_id)
     for service in services.items:
-        service.lead_count = Lead.query.filter_by(service_id=service.id).count()
-        service.service_request_count = ServiceRequest.query.filter_by(service_id=service.id).count()
         service.total_related = (service.lead_count + service.service_request_count)
     
     return render_template('admin/services.html', title='Hizmet Yönetimi', services=services)
@@ -505,7 +477,7 @@ def seed_services():
 @login_required
 @admin_required
 def leads():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     status = request.args.get('status')
     lead_type = request.args.get('lead_type')
     q = request.args.get('q')
@@ -515,11 +487,11 @@ def leads():
         query = query.filter(Lead.status == status)
     if lead_type:
         query = query.filter(Lead.lead_type == lead_type)
-    if q:
-        like = f"%{q}%"
-        query = query.filter((User.name.ilike(like)) | (User.email.ilike(like)))
+    query = apply_search(query, User, q)
     
-    leads = query.order_by(Lead.created_at.desc()).paginate(page=page, per_page=20)
+    # Başlıktaki toplam kısa süreli cache'ten (yaklaşık), her sayfada COUNT yok
+    leads = keyset.paginate(query, [Lead.created_at, Lead.id], cursor,
+                            count_key=('admin.leads', status, lead_type, q))
     return render_template('admin/leads.html', title='Lead Yönetimi', leads=leads, status=status, lead_type=lead_type, q=q)
 
 @bp.route("/lead/<int:lead_id>/delete", methods=['POST'])
@@ -538,30 +510,29 @@ def delete_lead(lead_id):
 def export_leads():
     status = request.args.get('status')
     q = request.args.get('q')
-    query = Lead.query.join(User).join(Service)
+    # Kullanıcı ve hizmet adları satır başına lazy-load yerine aynı sorguda join edilir
+    stmt = (
+        select(
+            func.coalesce(User.name, 'N/A'),
+            func.coalesce(User.email, 'N/A'),
+            func.coalesce(Service.name, 'N/A'),
+            Lead.lead_type,
+            Lead.status,
+            Lead.created_at,
+            Lead.one_time_amount,
+            Lead.monthly_amount,
+            Lead.iban,
+            Lead.next_payment_date,
+        )
+        .join(User, User.id == Lead.user_id)
+        .join(Service, Service.id == Lead.service_id)
+    )
     if status:
-        query = query.filter(Lead.status == status)
-    if q:
-        like = f"%{q}%"
-        query = query.filter((User.name.ilike(like)) | (User.email.ilike(like)))
-    rows = query.order_by(Lead.created_at.desc()).all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["user_name", "user_email", "service_name", "lead_type", "status", "created_at", "one_time_amount", "monthly_amount", "iban", "next_payment_date"])
-    for r in rows:
-        writer.writerow([
-            r.user.name if r.user else 'N/A',
-            r.user.email if r.user else 'N/A',
-            r.service.name if r.service else 'N/A',
-            r.lead_type,
-            r.status,
-            r.created_at,
-            r.one_time_amount,
-            r.monthly_amount,
-            r.iban,
-            r.next_payment_date
-        ])
-    return Response(output.getvalue(), mimetype='text/csv', headers={'Content-Disposition': 'attachment; filename=leads.csv'})
+        stmt = stmt.where(Lead.status == status)
+    stmt = apply_search(stmt, User, q)
+    stmt = stmt.order_by(Lead.created_at.desc())
+    headers = ["user_name", "user_email", "service_name", "lead_type", "status", "created_at", "one_time_amount", "monthly_amount", "iban", "next_payment_date"]
+    return export_response(stmt, headers, 'leads', request.args.get('format', 'csv'))
 
 @bp.route("/ticket/<int:ticket_id>/open", methods=['POST'])
 @login_required
@@ -585,7 +556,7 @@ def admin_open_ticket(ticket_id):
 @login_required
 @admin_required
 def tickets():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     status = request.args.get('status')
     priority = request.args.get('priority')
     q = request.args.get('q')
@@ -594,28 +565,23 @@ def tickets():
         query = query.filter(Ticket.status == status)
     if priority:
         query = query.filter(Ticket.priority == priority)
-    if q:
-        # Türkçe karakter desteği ile arama
-        query = query.filter(text("Ticket.subject COLLATE Turkish_CI_AS LIKE :q COLLATE Turkish_CI_AS"), q=f"%{q}%")
-    tickets = query.order_by(Ticket.created_at.desc()).paginate(page=page, per_page=20)
+    query = apply_search(query, Ticket, q)
+    tickets = keyset.paginate(query, [Ticket.created_at, Ticket.id], cursor)
     return render_template('admin/tickets.html', title='Ticket Yönetimi', tickets=tickets, status=status, priority=priority, q=q)
 
 @bp.route("/subscribers")
 @login_required
 @admin_required
 def subscribers():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     q = request.args.get('q', type=str)
     status = request.args.get('status', type=str)
-    query = Subscriber.query
-    if q:
-        # Türkçe karakter desteği ile arama
-        query = query.filter(text("Subscriber.email COLLATE Turkish_CI_AS LIKE :q COLLATE Turkish_CI_AS"), q=f"%{q}%")
+    query = apply_search(Subscriber.query, Subscriber, q)
     if status == 'active':
         query = query.filter_by(is_active=True)
     elif status == 'inactive':
         query = query.filter_by(is_active=False)
-    subs = query.order_by(Subscriber.created_at.desc()).paginate(page=page, per_page=20)
+    subs = keyset.paginate(query, [Subscriber.created_at, Subscriber.id], cursor)
     return render_template('admin/subscribers.html', title='Aboneler', subs=subs, q=q, status=status)
 
 @bp.route("/subscriber/<int:sub_id>/toggle", methods=['POST'])
@@ -706,20 +672,16 @@ def export_tickets():
     status = request.args.get('status')
     priority = request.args.get('priority')
     q = request.args.get('q')
-    query = Ticket.query
+    stmt = select(Ticket.id, Ticket.user_id, Ticket.subject, Ticket.status, Ticket.priority,
+                  Ticket.created_at, Ticket.completed_at)
     if status:
-        query = query.filter(Ticket.status == status)
+        stmt = stmt.where(Ticket.status == status)
     if priority:
-        query = query.filter(Ticket.priority == priority)
-    if q:
-        query = query.filter(text("Ticket.subject COLLATE Turkish_CI_AS LIKE :q COLLATE Turkish_CI_AS"), q=f"%{q}%")
-    rows = query.order_by(Ticket.created_at.desc()).all()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["id", "user_id", "subject", "status", "priority", "created_at", "completed_at"])
-    for r in rows:
-        writer.writerow([r.id, r.user_id, r.subject, r.status, r.priority, r.created_at, r.completed_at])
-    return Response(output.getvalue(), mimetype='text/csv', headers={'Content-Disposition': 'attachment; filename=tickets.csv'})
+        stmt = stmt.where(Ticket.priority == priority)
+    stmt = apply_search(stmt, Ticket, q)
+    stmt = stmt.order_by(Ticket.created_at.desc())
+    headers = ["id", "user_id", "subject", "status", "priority", "created_at", "completed_at"]
+    return export_response(stmt, headers, 'tickets', request.args.get('format', 'csv'))
 
 @bp.route("/analytics")
 @login_required
@@ -825,17 +787,20 @@ def send_payment_request(lead_id):
     honorific = 'Bey' if (lead.user and lead.user.name and not lead.user.name.endswith(('Hanım','Bey'))) else 'Hanım'
     user_name = (lead.user.name if lead.user else 'Müşterimiz').split()[0]
     greeting = f"Sayın {user_name} {honorific},"
-    recipient_line = f"\nAlıcı: {lead.recipient_full_name}" if lead.recipient_full_name else ""
+    details = [('💰 ' + ('Tutar' if lead.lead_type == 'one_time_payment_pending' else 'Aylık Tutar'), f"{amount_val:.2f} TL"),
+               ('🏦 IBAN', iban)]
+    if lead.recipient_full_name:
+        details.append(('👤 Alıcı', lead.recipient_full_name))
     if lead.lead_type == 'one_time_payment_pending':
         subject = f"{service_name} Hizmetiniz İçin Ödeme Bilgileri"
-        text_body = f"{greeting}\n\nGörüşmemiz sonrasında {service_name} hizmetiniz için ödeme bilgileriniz aşağıdadır:\n\n💰 Tutar: {amount_val:.2f} TL\n🏦 IBAN: {iban}{recipient_line}\n\nÖdemenizi yaptıktan sonra, ödeme onayı alındığında toplantı planlama bilgilerini sizinle paylaşacağız.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi"
-        html_body = f"<p>{greeting}</p><p>Görüşmemiz sonrasında <strong>{service_name}</strong> hizmetiniz için ödeme bilgileriniz aşağıdadır:</p><div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 15px 0;'><p><strong>💰 Tutar:</strong> {amount_val:.2f} TL</p><p><strong>🏦 IBAN:</strong> {iban}</p>{(f'<p><strong>👤 Alıcı:</strong> {lead.recipient_full_name}</p>' if lead.recipient_full_name else '')}</div><p>Ödemenizi yaptıktan sonra, ödeme onayı alındığında toplantı planlama bilgilerini sizinle paylaşacağız.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+        intro = f"Görüşmemiz sonrasında {service_name} hizmetiniz için ödeme bilgileriniz aşağıdadır:"
+        closing = "Ödemenizi yaptıktan sonra, ödeme onayı alındığında toplantı planlama bilgilerini sizinle paylaşacağız."
     else:
         subject = f"{service_name} Aylık Hizmet Ödeme Bilgileri"
-        text_body = f"{greeting}\n\n{service_name} aylık hizmetiniz için ödeme bilgileriniz aşağıdadır:\n\n💰 Aylık Tutar: {amount_val:.2f} TL\n🏦 IBAN: {iban}{recipient_line}\n\nHer ay belirtilen tutarı ilgili tarihe kadar ödemenizi rica ederiz. Ödemeniz alındığında hizmetlerimiz devam edecektir.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi"
-        html_body = f"<p>{greeting}</p><p><strong>{service_name}</strong> aylık hizmetiniz için ödeme bilgileriniz aşağıdadır:</p><div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 15px 0;'><p><strong>💰 Aylık Tutar:</strong> {amount_val:.2f} TL</p><p><strong>🏦 IBAN:</strong> {iban}</p>{(f'<p><strong>👤 Alıcı:</strong> {lead.recipient_full_name}</p>' if lead.recipient_full_name else '')}</div><p>Her ay belirtilen tutarı ilgili tarihe kadar ödemenizi rica ederiz. Ödemeniz alındığında hizmetlerimiz devam edecektir.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
-    
-    send_email(subject=subject, recipients=[lead.user.email], text_body=text_body, html_body=html_body)
+        intro = f"{service_name} aylık hizmetiniz için ödeme bilgileriniz aşağıdadır:"
+        closing = "Her ay belirtilen tutarı ilgili tarihe kadar ödemenizi rica ederiz. Ödemeniz alındığında hizmetlerimiz devam edecektir."
+    send_notice(subject, [lead.user.email], greeting=greeting, paragraphs=[intro], details=details,
+                closing=[closing, ASK_QUESTIONS])
     flash('Ödeme bilgileri e-posta ile gönderildi. Kullanıcı hizmetlerim sayfasında görebilecek.', 'success')
     return redirect(url_for('admin.leads'))
 
@@ -866,19 +831,14 @@ def confirm_payment(lead_id):
         greeting = f"Sayın {user_name} {honorific},"
         if lead.lead_type == 'one_time':
             subject = f"{service_name} Hizmetiniz İçin Ödemeniz Alındı"
-            text_body = f"{greeting}\n\n✅ {service_name} hizmetiniz için ödemeniz başarıyla alınmıştır.\n\nEn kısa sürede toplantı planlama bilgilerini sizinle paylaşacağız. Toplantı tarih ve saat bilgileri e-posta ile gönderilecektir.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi"
-            html_body = f"<p>{greeting}</p><p><strong>✅ {service_name} hizmetiniz için ödemeniz başarıyla alınmıştır.</strong></p><p>En kısa sürede toplantı planlama bilgilerini sizinle paylaşacağız. Toplantı tarih ve saat bilgileri e-posta ile gönderilecektir.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+            headline = f"✅ {service_name} hizmetiniz için ödemeniz başarıyla alınmıştır."
+            body = "En kısa sürede toplantı planlama bilgilerini sizinle paylaşacağız. Toplantı tarih ve saat bilgileri e-posta ile gönderilecektir."
         else:
             subject = f"{service_name} Aylık Ödemeniz Alındı"
-            text_body = f"{greeting}\n\n✅ {service_name} aylık hizmetiniz için ödemeniz başarıyla alınmıştır.\n\nDesteğimiz planlandığı şekilde devam edecektir. Bir sonraki ay ödeme bilgileri size tekrar gönderilecektir.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi"
-            html_body = f"<p>{greeting}</p><p><strong>✅ {service_name} aylık hizmetiniz için ödemeniz başarıyla alınmıştır.</strong></p><p>Desteğimiz planlandığı şekilde devam edecektir. Bir sonraki ay ödeme bilgileri size tekrar gönderilecektir.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
-        
-        send_email(
-            subject=subject,
-            recipients=[lead.user.email],
-            text_body=text_body,
-            html_body=html_body
-        )
+            headline = f"✅ {service_name} aylık hizmetiniz için ödemeniz başarıyla alınmıştır."
+            body = "Desteğimiz planlandığı şekilde devam edecektir. Bir sonraki ay ödeme bilgileri size tekrar gönderilecektir."
+        send_notice(subject, [lead.user.email], greeting=greeting, headline=headline,
+                    paragraphs=[body, ASK_QUESTIONS])
     
     flash('Ödeme onaylandı ve müşteri tipi güncellendi.', 'success')
     return redirect(url_for('admin.leads'))
@@ -913,19 +873,14 @@ def confirm_user_payment(lead_id):
         user_name = (lead.user.name if lead.user else 'Müşterimiz').split()[0]
         greeting = f"Sayın {user_name} {honorific},"
         
-        if lead.lead_type == 'one_time':
-            send_email(
-                subject=f"{service_name} - Ödeme Alındı",
-                recipients=[lead.user.email],
-                text_body=f"{greeting}\n\n{service_name} hizmeti için ödemeniz alınmıştır.\n\nToplantı planlanacak ve bilgiler e-posta ile gönderilecektir.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi",
-                html_body=f"<p>{greeting}</p><p><strong>{service_name} hizmeti için ödemeniz alınmıştır.</strong></p><p>Toplantı planlanacak ve bilgiler e-posta ile gönderilecektir.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
-            )
-        elif lead.lead_type == 'monthly':
-            send_email(
-                subject=f"{service_name} - Aylık Ödeme Alındı",
-                recipients=[lead.user.email],
-                text_body=f"{greeting}\n\n{service_name} hizmeti için aylık ödemeniz alınmıştır.\n\nToplantı planlanacak ve bilgiler e-posta ile gönderilecektir.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi",
-                html_body=f"<p>{greeting}</p><p><strong>{service_name} hizmeti için aylık ödemeniz alınmıştır.</strong></p><p>Toplantı planlanacak ve bilgiler e-posta ile gönderilecektir.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+        if lead.lead_type in ('one_time', 'monthly'):
+            monthly = lead.lead_type == 'monthly'
+            send_notice(
+                f"{service_name} - {'Aylık Ödeme' if monthly else 'Ödeme'} Alındı",
+                [lead.user.email],
+                greeting=greeting,
+                headline=f"{service_name} hizmeti için {'aylık ' if monthly else ''}ödemeniz alınmıştır.",
+                paragraphs=["Toplantı planlanacak ve bilgiler e-posta ile gönderilecektir."],
             )
     
     flash('Kullanıcı ödeme bildirimi onaylandı ve ödeme alındı olarak işaretlendi.', 'success')
@@ -956,15 +911,12 @@ def correct_payment(lead_id):
         user_name = (lead.user.name if lead.user else 'Müşterimiz').split()[0]
         greeting = f"Sayın {user_name} {honorific},"
         
-        subject = f"{service_name} Ödeme Bilgileri Düzeltildi"
-        text_body = f"{greeting}\n\n{service_name} hizmetiniz için ödeme bilgileriniz düzeltilmiştir.\n\nYeni ödeme bilgileri yakında size gönderilecektir.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi"
-        html_body = f"<p>{greeting}</p><p><strong>{service_name} hizmetiniz için ödeme bilgileriniz düzeltilmiştir.</strong></p><p>Yeni ödeme bilgileri yakında size gönderilecektir.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
-        
-        send_email(
-            subject=subject,
-            recipients=[lead.user.email],
-            text_body=text_body,
-            html_body=html_body
+        send_notice(
+            f"{service_name} Ödeme Bilgileri Düzeltildi",
+            [lead.user.email],
+            greeting=greeting,
+            headline=f"{service_name} hizmetiniz için ödeme bilgileriniz düzeltilmiştir.",
+            paragraphs=["Yeni ödeme bilgileri yakında size gönderilecektir.", ASK_QUESTIONS],
         )
     
     flash('Ödeme bilgileri düzeltildi. Lead tekrar "Bekleniyor" durumuna çevrildi. Yeni ödeme bilgileri girebilirsiniz.', 'info')
@@ -999,22 +951,17 @@ def confirm_monthly_payment(payment_id):
             month_name = turkish_months[payment.payment_month.month]
             year = payment.payment_month.year
             
-            send_email(
-                subject=f"Ödeme Onaylandı - {month_name} {year}",
-                recipients=[payment.lead.user.email],
-                body=f"""
-                Merhaba {payment.lead.user.name},
-                
-                {month_name} {year} ayı ödemeniz onaylandı.
-                
-                Ödeme Detayları:
-                - Tutar: {payment.amount} ₺
-                - Onay Tarihi: {payment.confirmation_date.strftime('%d.%m.%Y %H:%M')}
-                - Sonraki Ödeme Tarihi: {payment.next_payment_date.strftime('%d.%m.%Y')}
-                
-                Teşekkürler!
-                SanalMuhasebe
-                """
+            send_notice(
+                f"Ödeme Onaylandı - {month_name} {year}",
+                [payment.lead.user.email],
+                greeting=f"Merhaba {payment.lead.user.name},",
+                paragraphs=[f"{month_name} {year} ayı ödemeniz onaylandı."],
+                details=[
+                    ('Tutar', f"{payment.amount} ₺"),
+                    ('Onay Tarihi', payment.confirmation_date.strftime('%d.%m.%Y %H:%M')),
+                    ('Sonraki Ödeme Tarihi', payment.next_payment_date.strftime('%d.%m.%Y') if payment.next_payment_date else '-'),
+                ],
+                closing=["Teşekkürler!"],
             )
         except:
             pass
@@ -1062,11 +1009,16 @@ def schedule_meeting(lead_id):
         honorific = 'Bey' if (lead.user and lead.user.name and not lead.user.name.endswith(('Hanım','Bey'))) else 'Hanım'
         user_name = (lead.user.name if lead.user else 'Müşterimiz').split()[0]
         greeting = f"Sayın {user_name} {honorific},"
-        send_email(
-            subject=f"{service_name} Hizmetiniz İçin Toplantı Planlandı",
-            recipients=[lead.user.email],
-            text_body=f"{greeting}\n\nToplantınız planlanmıştır.\nTarih: {meeting_datetime.strftime('%d.%m.%Y %H:%M')}\nPlatform: {platform}\nLink: {meeting_link}\n\nSaygılarımızla\nSanal Muhasebecim Ekibi",
-            html_body=f"<p>{greeting}</p><p>Toplantınız planlanmıştır.</p><p><b>Tarih:</b> {meeting_datetime.strftime('%d.%m.%Y %H:%M')}</p><p><b>Platform:</b> {platform}</p><p><b>Link:</b> <a href='{meeting_link}'>{meeting_link}</a></p><p>Saygılarımızla<br>Sanal Muhasebecim Ekibi</p>"
+        send_notice(
+            f"{service_name} Hizmetiniz İçin Toplantı Planlandı",
+            [lead.user.email],
+            greeting=greeting,
+            paragraphs=["Toplantınız planlanmıştır."],
+            details=[
+                ('Tarih', meeting_datetime.strftime('%d.%m.%Y %H:%M')),
+                ('Platform', platform),
+                ('Link', meeting_link, meeting_link),
+            ],
         )
     
     flash('Toplantı planlandı ve e-posta gönderildi. Kullanıcı hizmetlerim sayfasında görebilecek.', 'success')
@@ -1112,11 +1064,13 @@ def update_monthly_payment(lead_id):
             update_text.append(f"Yeni Alıcı: {lead.recipient_full_name}")
         
         if update_text:
-            send_email(
-                subject="Ödeme Bilgileri Güncellendi",
-                recipients=[lead.user.email],
-                text_body=f"Ödeme bilgileriniz güncellendi:\n" + "\n".join(update_text) + f"\n\nSonraki ödeme tarihi: {lead.next_payment_date.strftime('%d.%m.%Y')}",
-                html_body=f"<p>Ödeme bilgileriniz güncellendi:</p><ul>" + "".join([f"<li>{text}</li>" for text in update_text]) + f"</ul><p><b>Sonraki ödeme tarihi:</b> {lead.next_payment_date.strftime('%d.%m.%Y')}</p>"
+            send_notice(
+                "Ödeme Bilgileri Güncellendi",
+                [lead.user.email],
+                items_intro="Ödeme bilgileriniz güncellendi:",
+                items=update_text,
+                details=[('Sonraki ödeme tarihi', lead.next_payment_date.strftime('%d.%m.%Y'))],
+                signoff=False,
             )
     
     flash('Aylık ödeme bilgileri güncellendi.', 'success')
@@ -1126,28 +1080,19 @@ def update_monthly_payment(lead_id):
 @login_required
 @admin_required
 def send_monthly_reminders():
-    """Aylık müşteriler için ödeme hatırlatması gönder"""
-    # Ödeme tarihi yaklaşan aylık müşterileri bul (5 gün kala)
-    reminder_date = datetime.utcnow() + timedelta(days=5)
-    monthly_leads = Lead.query.filter(
-        Lead.lead_type == 'monthly',
-        Lead.status.in_(['paid', 'completed']),
-        Lead.next_payment_date <= reminder_date,
-        Lead.next_payment_date >= datetime.utcnow()
-    ).all()
-    
-    sent_count = 0
-    for lead in monthly_leads:
-        if lead.user and lead.user.email:
-            send_email(
-                subject="Aylık Ödeme Hatırlatması",
-                recipients=[lead.user.email],
-                text_body=f"Aylık ödeme tarihiniz yaklaşıyor.\n\nTutar: {lead.monthly_amount} TL\nIBAN: {lead.iban}\nSon Ödeme Tarihi: {lead.next_payment_date.strftime('%d.%m.%Y')}\n\nÖdemenizi yaptıktan sonra hizmetleriniz devam edecektir.",
-                html_body=f"<p>Aylık ödeme tarihiniz yaklaşıyor.</p><p><b>Tutar:</b> {lead.monthly_amount} TL</p><p><b>IBAN:</b> {lead.iban}</p><p><b>Son Ödeme Tarihi:</b> {lead.next_payment_date.strftime('%d.%m.%Y')}</p><p>Ödemenizi yaptıktan sonra hizmetleriniz devam edecektir.</p>"
-            )
-            sent_count += 1
-    
-    flash(f'{sent_count} aylık müşteriye ödeme hatırlatması gönderildi.', 'success')
+    """Aylık müşteriler için faturalama çalıştırması (ödeme satırları, gecikme, hatırlatmalar)
+
+    Asıl iş ``flask billing run`` ile cron'dan yapılır; bu buton aynı
+    tekrarlanabilir çalıştırmayı elle tetikler. E-postalar kuyruğa yazılır.
+    """
+    summary = run_billing()
+    wake_mail_workers()
+    sent_count = summary['due_reminders'] + summary['overdue_reminders']
+    flash(
+        f"{sent_count} aylık müşteriye ödeme hatırlatması kuyruğa alındı "
+        f"({summary['created']} yeni ödeme kaydı, {summary['marked_overdue']} gecikmiş).",
+        'success'
+    )
     return redirect(url_for('admin.leads'))
 
 @bp.route("/mark-monthly-payment-received", methods=['POST'])
@@ -1162,18 +1107,28 @@ def mark_monthly_payment_received():
         flash('Bu işlem sadece aylık müşteriler için geçerlidir.', 'danger')
         return redirect(url_for('admin.leads'))
     
-    # Sonraki ödeme tarihini 30 gün sonraya ayarla
-    lead.next_payment_date = datetime.utcnow() + timedelta(days=30)
+    # En eski ödenmemiş dönem onaylanır; faturalama o dönem için hatırlatma göndermez
+    payment = settle_oldest(lead.id)
+    if payment is not None and payment.next_payment_date:
+        lead.next_payment_date = payment.next_payment_date
+    else:
+        # Sonraki ödeme tarihini 30 gün sonraya ayarla
+        lead.next_payment_date = datetime.utcnow() + timedelta(days=30)
     lead.status = 'paid'  # Ödeme alındı olarak işaretle
     db.session.commit()
     
     # Kullanıcıya onay e-postası gönder
     if lead.user and lead.user.email:
-        send_email(
-            subject="Aylık Ödeme Alındı",
-            recipients=[lead.user.email],
-            text_body=f"Aylık ödemeniz alındı.\n\nTutar: {lead.monthly_amount} TL\nSonraki ödeme tarihi: {lead.next_payment_date.strftime('%d.%m.%Y')}\n\nHizmetleriniz devam etmektedir.",
-            html_body=f"<p>Aylık ödemeniz alındı.</p><p><b>Tutar:</b> {lead.monthly_amount} TL</p><p><b>Sonraki ödeme tarihi:</b> {lead.next_payment_date.strftime('%d.%m.%Y')}</p><p>Hizmetleriniz devam etmektedir.</p>"
+        send_notice(
+            "Aylık Ödeme Alındı",
+            [lead.user.email],
+            paragraphs=["Aylık ödemeniz alındı."],
+            details=[
+                ('Tutar', f"{lead.monthly_amount} TL"),
+                ('Sonraki ödeme tarihi', lead.next_payment_date.strftime('%d.%m.%Y')),
+            ],
+            closing=["Hizmetleriniz devam etmektedir."],
+            signoff=False,
         )
     
     flash('Aylık ödeme alındı olarak işaretlendi ve sonraki ödeme tarihi güncellendi.', 'success')
@@ -1192,11 +1147,24 @@ def cancel_lead(lead_id):
         user_name = lead.user.name.split()[0] if lead.user.name else 'Değerli Müşterimiz'
         
         # Profesyonel iptal e-postası
-        send_email(
-            subject=f"{service_name} Hizmet Talebiniz Hakkında",
-            recipients=[lead.user.email],
-            text_body=f"Sayın {user_name},\n\n{service_name} hizmet talebinizle ilgili olarak size bilgi vermek isteriz.\n\nMevcut durum ve iş yükümüz nedeniyle, bu hizmet talebini şu an için karşılayamayacağımızı üzülerek bildirmek isteriz.\n\nAncak, gelecekte tekrar hizmet talebinde bulunmak isterseniz:\n• Web sitemizi ziyaret edebilirsiniz\n• Bizimle doğrudan iletişime geçebilirsiniz\n• Yeni bir randevu talebi oluşturabilirsiniz\n\nBu durumdan dolayı yaşadığınız memnuniyetsizlik için özür dileriz.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçmekten çekinmeyin.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi",
-            html_body=f"<p>Sayın <strong>{user_name}</strong>,</p><p>{service_name} hizmet talebinizle ilgili olarak size bilgi vermek isteriz.</p><p>Mevcut durum ve iş yükümüz nedeniyle, bu hizmet talebini şu an için karşılayamayacağımızı üzülerek bildirmek isteriz.</p><p>Ancak, gelecekte tekrar hizmet talebinde bulunmak isterseniz:</p><ul><li>Web sitemizi ziyaret edebilirsiniz</li><li>Bizimle doğrudan iletişime geçebilirsiniz</li><li>Yeni bir randevu talebi oluşturabilirsiniz</li></ul><p>Bu durumdan dolayı yaşadığınız memnuniyetsizlik için özür dileriz.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçmekten çekinmeyin.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+        send_notice(
+            f"{service_name} Hizmet Talebiniz Hakkında",
+            [lead.user.email],
+            greeting=f"Sayın {user_name},",
+            paragraphs=[
+                f"{service_name} hizmet talebinizle ilgili olarak size bilgi vermek isteriz.",
+                "Mevcut durum ve iş yükümüz nedeniyle, bu hizmet talebini şu an için karşılayamayacağımızı üzülerek bildirmek isteriz.",
+            ],
+            items_intro="Ancak, gelecekte tekrar hizmet talebinde bulunmak isterseniz:",
+            items=[
+                "Web sitemizi ziyaret edebilirsiniz",
+                "Bizimle doğrudan iletişime geçebilirsiniz",
+                "Yeni bir randevu talebi oluşturabilirsiniz",
+            ],
+            closing=[
+                "Bu durumdan dolayı yaşadığınız memnuniyetsizlik için özür dileriz.",
+                "Herhangi bir sorunuz olursa bizimle iletişime geçmekten çekinmeyin.",
+            ],
         )
     
     flash('Hizmet talebi iptal edildi.', 'success')
@@ -1222,11 +1190,14 @@ def restore_lead(lead_id):
         service_name = lead.service.name if lead.service else 'Hizmet'
         user_name = lead.user.name.split()[0] if lead.user.name else 'Değerli Müşterimiz'
         
-        send_email(
-            subject=f"{service_name} Hizmet Talebiniz Devam Ediyor",
-            recipients=[lead.user.email],
-            text_body=f"Sayın {user_name},\n\n{service_name} hizmet talebiniz tekrar aktif hale getirilmiştir. İşlemleriniz kaldığı yerden devam edecektir.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi",
-            html_body=f"<p>Sayın <strong>{user_name}</strong>,</p><p>{service_name} hizmet talebiniz tekrar aktif hale getirilmiştir. İşlemleriniz kaldığı yerden devam edecektir.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+        send_notice(
+            f"{service_name} Hizmet Talebiniz Devam Ediyor",
+            [lead.user.email],
+            greeting=f"Sayın {user_name},",
+            paragraphs=[
+                f"{service_name} hizmet talebiniz tekrar aktif hale getirilmiştir. İşlemleriniz kaldığı yerden devam edecektir.",
+                ASK_QUESTIONS,
+            ],
         )
     
     flash('Hizmet talebi geri alındı ve önceki duruma döndürüldü.', 'success')
@@ -1262,6 +1233,16 @@ def update_appointment_status(appointment_id):
     starts_at_raw = request.form.get('starts_at')
     ends_at_raw = request.form.get('ends_at')
 
+    # İptalde bırakılan dilim, randevu yeniden etkinleşince tekrar alınır; başkası aldıysa değişiklik reddedilir
+    if appointment.status in RELEASE_STATUSES and new_status in ['pending', 'confirmed']:
+        try:
+            # Eski randevular çalışma saatleri dışında olabilir; yalnızca çakışma kontrol edilir
+            reserve_slot(appointment, check_hours=False)
+        except SlotTaken:
+            db.session.rollback()
+            flash('Bu saat başka bir randevuya ayrılmış; randevu yeniden etkinleştirilemez.', 'danger')
+            return redirect(url_for('admin.appointments'))
+
     if meeting_link is not None:
         appointment.meeting_link = meeting_link
         # Link eklendiyse ve SADECE yeni durum confirmed olacaksa e-posta gönder
@@ -1270,11 +1251,18 @@ def update_appointment_status(appointment_id):
             appointment_date = appointment.appointment_datetime.strftime('%d.%m.%Y')
             appointment_time = appointment.appointment_datetime.strftime('%H:%M')
             
-            send_email(
-                subject="Randevunuz Onaylandı - Toplantı Bilgileri",
-                recipients=[appointment.email],
-                text_body=f"Merhaba,\n\nRandevunuz başarıyla onaylanmıştır. Aşağıda toplantı detaylarını bulabilirsiniz:\n\n📅 Tarih: {appointment_date}\n🕐 Saat: {appointment_time}\n🔗 Toplantı Linki: {meeting_link}\n\nToplantı saatinden 5 dakika önce linke tıklayarak toplantıya katılabilirsiniz.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi",
-                html_body=f"<p>Merhaba,</p><p><strong>Randevunuz başarıyla onaylanmıştır.</strong> Aşağıda toplantı detaylarını bulabilirsiniz:</p><div style='background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 15px 0;'><p><strong>📅 Tarih:</strong> {appointment_date}</p><p><strong>🕐 Saat:</strong> {appointment_time}</p><p><strong>🔗 Toplantı Linki:</strong> <a href='{meeting_link}' style='color: #007bff;'>{meeting_link}</a></p></div><p>Toplantı saatinden 5 dakika önce linke tıklayarak toplantıya katılabilirsiniz.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+            send_notice(
+                "Randevunuz Onaylandı - Toplantı Bilgileri",
+                [appointment.email],
+                greeting="Merhaba,",
+                headline="Randevunuz başarıyla onaylanmıştır.",
+                paragraphs=["Aşağıda toplantı detaylarını bulabilirsiniz:"],
+                details=[
+                    ('📅 Tarih', appointment_date),
+                    ('🕐 Saat', appointment_time),
+                    ('🔗 Toplantı Linki', meeting_link, meeting_link),
+                ],
+                closing=["Toplantı saatinden 5 dakika önce linke tıklayarak toplantıya katılabilirsiniz.", ASK_QUESTIONS],
             )
             send_telegram_message(f"Randevu #{appointment.id} toplantı linki gönderildi: {meeting_link}")
             flash('Randevu onaylandı ve toplantı linki e-posta ile gönderildi.', 'success')
@@ -1283,22 +1271,15 @@ def update_appointment_status(appointment_id):
         try:
             appointment.starts_at = datetime.fromisoformat(starts_at_raw)
             appointment.ends_at = datetime.fromisoformat(ends_at_raw)
-            # Opsiyonel: Google Calendar etkinliği oluştur
-            link = create_gcal_event(
+            # Opsiyonel: Google Calendar etkinliği arka planda oluşturulur, davet e-postası ardından gider
+            schedule_gcal_invite(
+                appointment_id=appointment.id,
+                email=appointment.email,
                 summary=f"Danışmanlık - {appointment.email}",
                 description=appointment.purpose or "",
                 starts_at=appointment.starts_at,
                 ends_at=appointment.ends_at,
-                attendees_emails=[appointment.email]
             )
-            if link:
-                send_email(
-                    subject="Takvim Daveti",
-                    recipients=[appointment.email],
-                    text_body=f"Takvim daveti oluşturuldu: {link}",
-                    html_body=f"<p>Takvim daveti oluşturuldu: <a href='{link}' target='_blank'>Etkinliği aç</a></p>"
-                )
-                send_telegram_message(f"Randevu #{appointment.id} için Google Calendar etkinliği oluşturuldu.")
             flash('Başlangıç ve bitiş saatleri kaydedildi.', 'success')
         except Exception:
             flash('Tarih/saat formatı geçersiz. ISO format kullanın: 2025-08-20T14:30', 'danger')
@@ -1426,11 +1407,15 @@ def update_appointment_status(appointment_id):
                 pass
         if new_status == 'cancelled' and appointment.email:
             # İptal bilgilendirmesi
-            send_email(
-                subject="Randevunuz İptal Edildi",
-                recipients=[appointment.email],
-                text_body="Merhaba,\n\nMaalesef randevunuz iptal edilmiştir. Bu durumdan dolayı üzgünüz.\n\nYeni bir randevu talep etmek isterseniz, web sitemizden veya bizimle iletişime geçerek yeni bir randevu oluşturabilirsiniz.\n\nHerhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.\n\nSaygılarımızla,\nSanal Muhasebecim Ekibi",
-                html_body="<p>Merhaba,</p><p><strong>Maalesef randevunuz iptal edilmiştir.</strong> Bu durumdan dolayı üzgünüz.</p><p>Yeni bir randevu talep etmek isterseniz, web sitemizden veya bizimle iletişime geçerek yeni bir randevu oluşturabilirsiniz.</p><p>Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.</p><p>Saygılarımızla,<br><strong>Sanal Muhasebecim Ekibi</strong></p>"
+            send_notice(
+                "Randevunuz İptal Edildi",
+                [appointment.email],
+                greeting="Merhaba,",
+                headline="Maalesef randevunuz iptal edilmiştir. Bu durumdan dolayı üzgünüz.",
+                paragraphs=[
+                    "Yeni bir randevu talep etmek isterseniz, web sitemizden veya bizimle iletişime geçerek yeni bir randevu oluşturabilirsiniz.",
+                    ASK_QUESTIONS,
+                ],
             )
             flash('İptal bilgisi e-posta ile gönderildi.', 'info')
 
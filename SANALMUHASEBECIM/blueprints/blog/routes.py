@@ -2,13 +2,16 @@ from flask import render_template, flash, redirect, url_for, request, abort, jso
 from flask_login import current_user, login_required
 from functools import wraps
 from . import bp
-from SANALMUHASEBECIM.models import Post, Comment, Like, CommentLike, User, Tag, Subscriber
+from SANALMUHASEBECIM.models import Post, Comment, User, Tag
 from SANALMUHASEBECIM.forms import PostForm, CommentForm
 from SANALMUHASEBECIM.extensions import db, limiter
 from datetime import datetime
-from SANALMUHASEBECIM.utils import send_email
+from SANALMUHASEBECIM.newsletter import dispatch_new_post
+from SANALMUHASEBECIM.search import search_posts
+from SANALMUHASEBECIM.pagecache import cached_page
+from SANALMUHASEBECIM import keyset, likes
+from SANALMUHASEBECIM.commenttree import load_comment_tree, post_liked
 from sqlalchemy.orm import load_only, joinedload
-from sqlalchemy import func
 
 
 def admin_required(f):
@@ -30,8 +33,9 @@ def is_spam(text: str) -> bool:
 
 
 @bp.route("/")
+@cached_page('blog', query_args=('cursor',))
 def index():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 6
     # Bazı ortamlarda henüz migration uygulanmamış olabilir. Güvenli alanlarda kal.
     base_query = (
@@ -51,57 +55,63 @@ def index():
                 Post.seo_desc,
                 Post.cover_id,
                 Post.user_id,
+                Post.like_count,
+                Post.comment_count,
             ),
             joinedload(Post.author)
         ).filter(Post.is_active == True)
     )
 
     # Önce yayınlanmışlara göre dene; hata olursa post_date'e göre basit bir sorguya düş.
-    items = []
-    total = 0
-    order_q = None
+    # COUNT eager load'suz sorguyla yapılır ve kısa süre cache'lenir.
     try:
-        order_q = base_query.filter(Post.status == 'published').order_by(Post.published_at.desc())
-        items = order_q.limit(per_page).offset((page - 1) * per_page).all()
-        # COUNT'u güvenli şekilde sadece id ile yap
-        total = db.session.query(func.count(Post.id)).filter(Post.is_active == True, Post.status == 'published').scalar() or 0
+        posts = keyset.paginate(
+            base_query.filter(Post.status == 'published'), [Post.published_at, Post.id], cursor,
+            per_page=per_page, count_key=('blog.index',),
+            count_query=Post.query.filter(Post.is_active == True, Post.status == 'published'),
+        )
     except Exception:
-        order_q = base_query.order_by(Post.post_date.desc())
-        items = order_q.limit(per_page).offset((page - 1) * per_page).all()
-        total = db.session.query(func.count(Post.id)).filter(Post.is_active == True).scalar() or 0
-
-    # Basit pagination objesi
-    class _Pagination:
-        def __init__(self, items, page, per_page, total):
-            self.items = items
-            self.page = page
-            self.per_page = per_page
-            self.total = total
-            self.pages = max(1, (total + per_page - 1) // per_page)
-            self.has_prev = page > 1
-            self.has_next = page < self.pages
-            self.prev_num = page - 1 if self.has_prev else None
-            self.next_num = page + 1 if self.has_next else None
-
-    posts = _Pagination(items, page, per_page, total)
+        db.session.rollback()
+        posts = keyset.paginate(
+            base_query, [Post.post_date, Post.id], cursor,
+            per_page=per_page, count_key=('blog.index', 'all'),
+            count_query=Post.query.filter(Post.is_active == True),
+        )
     return render_template('blog/index.html', title='Blog', posts=posts)
 
 
+@bp.route("/search")
+def search():
+    q = (request.args.get('q') or '').strip()[:200]
+    page = request.args.get('page', 1, type=int)
+    posts = search_posts(q, page=page, per_page=6)
+    return render_template('blog/index.html', title=f"Arama: {q}" if q else 'Arama', posts=posts, search_query=q)
+
+
 @bp.route("/tag/<slug>")
+@cached_page('blog', query_args=('cursor',))
 def by_tag(slug):
     tag = Tag.query.filter_by(slug=slug).first_or_404()
-    page = request.args.get('page', 1, type=int)
     posts_query = Post.query.filter(Post.tags.any(Tag.id == tag.id), Post.is_active == True)
-    posts = posts_query.order_by(Post.published_at.desc().nullslast(), Post.post_date.desc()).paginate(page=page, per_page=6)
+    # Yayın tarihi olmayanlar (NULL) sona düşer
+    posts = keyset.paginate(
+        posts_query, [Post.published_at, Post.post_date, Post.id], request.args.get('cursor'),
+        per_page=6, count_key=('blog.tag', tag.id),
+    )
     return render_template('blog/index.html', title=f"#{tag.name}", posts=posts, active_tag=tag)
 
 
 @bp.route("/<slug>")
+@cached_page('blog', query_args=('cpage',))
 def post_detail(slug):
-    post = Post.query.filter_by(slug=slug, is_active=True, status='published').first_or_404()
+    post = Post.query.options(joinedload(Post.author), joinedload(Post.cover)) \
+        .filter_by(slug=slug, is_active=True, status='published').first_or_404()
     form = CommentForm()
-    comments = Comment.query.filter_by(post_id=post.id, parent_id=None).filter(Comment.is_approved == True).order_by(Comment.date.desc()).all()
-    return render_template('blog/post_detail.html', title=post.title, post=post, form=form, comments=comments)
+    # Onaylı yorumlar tek sorguda ağaç olarak; beğeni bayrakları toplu (bkz. commenttree)
+    user_id = current_user.id if current_user.is_authenticated else None
+    comments = load_comment_tree(post.id, user_id, page=request.args.get('cpage', 1, type=int))
+    return render_template('blog/post_detail.html', title=post.title, post=post, form=form, comments=comments,
+                           post_liked=post_liked(post.id, user_id))
 
 
 @bp.route("/<slug>/comment", methods=['POST'])
@@ -181,18 +191,9 @@ def new_post():
         post.published_at = datetime.utcnow()
         db.session.commit()
 
-        # Yeni gönderi bildirimi: abone listesine gönder
+        # Yeni gönderi bildirimi: abone listesine arka planda gönderilir
         try:
-            subs = Subscriber.query.filter_by(is_active=True).all()
-            if subs:
-                emails = [s.email for s in subs if s.email]
-                post_url = url_for('blog.post_detail', slug=post.slug, _external=True)
-                subject = f"Yeni Yazı: {post.title}"
-                html_body = f"<p>Yeni bir yazı yayınladık: <strong>{post.title}</strong></p><p><a href='{post_url}'>Yazıyı okumak için tıklayın</a></p>"
-                text_body = f"Yeni bir yazı yayınladık: {post.title}\n{post_url}"
-                # Büyük listeler için basit bölme (50'lik gruplar)
-                for i in range(0, len(emails), 50):
-                    send_email(subject=subject, recipients=emails[i:i+50], text_body=text_body, html_body=html_body)
+            dispatch_new_post(post.id)
         except Exception:
             pass
 
@@ -236,17 +237,12 @@ def delete_post(post_id):
 @login_required
 def like_post(post_id):
     post = Post.query.get_or_404(post_id)
-    existing_like = Like.query.filter_by(user_id=current_user.id, post_id=post_id).first()
-    
-    if existing_like:
-        db.session.delete(existing_like)
-        flash('Beğeniniz kaldırıldı.', 'info')
-    else:
-        like = Like(user_id=current_user.id, post_id=post_id)
-        db.session.add(like)
-        flash('Gönderi beğenildi!', 'success')
-    
+    liked, _ = likes.toggle(Post, post.id, current_user.id)
     db.session.commit()
+    if liked:
+        flash('Gönderi beğenildi!', 'success')
+    else:
+        flash('Beğeniniz kaldırıldı.', 'info')
     return redirect(url_for('blog.post_detail', slug=post.slug or post.id))
 
 
@@ -254,19 +250,13 @@ def like_post(post_id):
 @login_required
 def like_comment(comment_id):
     comment = Comment.query.get_or_404(comment_id)
-    existing_like = CommentLike.query.filter_by(user_id=current_user.id, comment_id=comment_id).first()
-    
-    if existing_like:
-        db.session.delete(existing_like)
-        comment.like_count -= 1
-        flash('Beğeniniz kaldırıldı.', 'info')
-    else:
-        like = CommentLike(user_id=current_user.id, comment_id=comment_id)
-        db.session.add(like)
-        comment.like_count += 1
-        flash('Yorum beğenildi!', 'success')
-    
+    # Beğeni satırı ve Comment.like_count tek transaction'da, okuma yapmadan güncellenir
+    liked, _ = likes.toggle(Comment, comment.id, current_user.id)
     db.session.commit()
+    if liked:
+        flash('Yorum beğenildi!', 'success')
+    else:
+        flash('Beğeniniz kaldırıldı.', 'info')
     return redirect(url_for('blog.post_detail', slug=comment.post.slug or comment.post.id))
 
 
@@ -303,21 +293,10 @@ def reply_comment(comment_id):
 @login_required
 def like_post_ajax(post_id):
     post = Post.query.get_or_404(post_id)
-    existing_like = Like.query.filter_by(user_id=current_user.id, post_id=post_id).first()
-    
-    if existing_like:
-        db.session.delete(existing_like)
-        liked = False
-    else:
-        like = Like(user_id=current_user.id, post_id=post_id)
-        db.session.add(like)
-        liked = True
-    
+    # Toplam beğeni sayısı sayaç güncellemesinden döner, ek sorgu olmadan
+    liked, total_likes = likes.toggle(Post, post.id, current_user.id)
     db.session.commit()
     
-    # Post'un toplam beğeni sayısını al
-    total_likes = Like.query.filter_by(post_id=post_id).count()
-    
     return jsonify({
         'success': True,
         'liked': liked,
@@ -329,21 +308,10 @@ def like_post_ajax(post_id):
 @login_required
 def like_comment_ajax(comment_id):
     comment = Comment.query.get_or_404(comment_id)
-    existing_like = CommentLike.query.filter_by(user_id=current_user.id, comment_id=comment_id).first()
-    
-    if existing_like:
-        db.session.delete(existing_like)
-        liked = False
-    else:
-        like = CommentLike(user_id=current_user.id, comment_id=comment_id)
-        db.session.add(like)
-        liked = True
-    
+    # Toplam beğeni sayısı sayaç güncellemesinden döner, ek sorgu olmadan
+    liked, total_likes = likes.toggle(Comment, comment.id, current_user.id)
     db.session.commit()
     
-    # Comment'in toplam beğeni sayısını al
-    total_likes = CommentLike.query.filter_by(comment_id=comment_id).count()
-    
     return jsonify({
         'success': True,
         'liked': liked,
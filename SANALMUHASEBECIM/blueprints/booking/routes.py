@@ -1,11 +1,12 @@
-from flask import render_template, flash, redirect, url_for, request
+from flask import render_template, flash, redirect, url_for, request, current_app
 from flask_login import current_user, login_required
-from datetime import datetime, timedelta, date
+from datetime import MAXYEAR, datetime, timedelta, date
 from . import bp
 from SANALMUHASEBECIM.models import Appointment
 from sqlalchemy import or_, and_
 from SANALMUHASEBECIM.forms import DanismanlikForm
 from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.slots import SlotTaken, SlotUnavailable, month_availability, reserve, taken_slots
 from SANALMUHASEBECIM.utils import (
     send_telegram_message,
     create_gcal_event,
@@ -175,6 +176,17 @@ def new_appointment(service_request_id=None):
             pass
         
         db.session.add(appointment)
+        # Dilim, (personel, başlangıç) anahtarıyla atomik olarak ayrılır; eşzamanlı ikinci talep burada reddedilir
+        try:
+            reserve(appointment)
+        except SlotUnavailable:
+            db.session.rollback()
+            flash('Seçilen saat çalışma saatleri dışında. Lütfen listeden bir saat seçin.', 'warning')
+            return redirect(url_for('booking.new_appointment'))
+        except SlotTaken:
+            db.session.rollback()
+            flash('Seçtiğiniz saat az önce başka bir danışan tarafından alındı. Lütfen başka bir saat seçin.', 'warning')
+            return redirect(url_for('booking.new_appointment'))
         db.session.commit()
         
         # Telegram bildirimi
@@ -424,7 +436,27 @@ def cancel_appointment(appointment_id):
 @bp.route('/availability')
 @login_required
 def availability():
-    """Return confirmed appointment times for a given date (YYYY-MM-DD)."""
+    """Return slot availability.
+
+    ``?month=YYYY-MM`` ayın tüm günleri için boş/dolu dilimleri tek çağrıda
+    döndürür; ``?date=YYYY-MM-DD`` geriye dönük uyumluluk için o günün dolu
+    saatlerini verir.
+    """
+    month_str = request.args.get('month')
+    if month_str:
+        try:
+            month_start = datetime.strptime(month_str, '%Y-%m')
+        except ValueError:
+            return {"days": {}}
+        # taken_slots ay sonunu bir sonraki ayın başı olarak hesaplar; 9999-12 taşar
+        if month_start.year >= MAXYEAR:
+            return {"days": {}}
+        return {
+            "month": month_str,
+            "slot_minutes": current_app.config.get('BOOKING_SLOT_MINUTES', 30),
+            "days": month_availability(month_start.year, month_start.month),
+        }
+
     day_str = request.args.get('date')
     if not day_str:
         return {"times": []}
@@ -432,12 +464,6 @@ def availability():
         day = datetime.strptime(day_str, '%Y-%m-%d').date()
     except ValueError:
         return {"times": []}
-    start = datetime.combine(day, datetime.min.time())
-    end = datetime.combine(day, datetime.max.time())
-    taken = Appointment.query.filter(
-        Appointment.status == 'confirmed',
-        Appointment.appointment_datetime >= start,
-        Appointment.appointment_datetime <= end,
-    ).all()
-    times = [a.appointment_datetime.strftime('%H:%M') for a in taken]
-    return {"times": times}
+    if day.year >= MAXYEAR:
+        return {"times": []}
+    return {"times": taken_slots(day.year, day.month).get(day.isoformat(), [])}
@@ -1,12 +1,14 @@
-from flask import render_template, flash, redirect, url_for, request, current_app, session
+from flask import render_template, flash, redirect, url_for, request, current_app, session, abort
 from flask_login import current_user, login_required
 from datetime import datetime
 from . import bp
+from sqlalchemy.orm import joinedload
 from SANALMUHASEBECIM.models import Ticket, TicketMessage, Service, Media
+from SANALMUHASEBECIM.media import store_upload
 from SANALMUHASEBECIM.extensions import db
 from SANALMUHASEBECIM.utils import send_telegram_message, send_email
-import os
-from werkzeug.utils import secure_filename
+from SANALMUHASEBECIM.unread import get_unread_map, get_unread_count, mark_tickets_seen
+from SANALMUHASEBECIM.ticketstream import ticket_state, wait_for_change
 from SANALMUHASEBECIM.models import User
 
 @bp.route("/")
@@ -14,24 +16,7 @@ from SANALMUHASEBECIM.models import User
 def index():
     tickets = Ticket.query.filter_by(user_id=current_user.id).filter(Ticket.status.notin_(['closed', 'completed'])).order_by(Ticket.created_at.desc()).all()
     # Unread mapping per ticket (admin mesajları ve diğer kullanıcı mesajları)
-    last_seen_map = session.get('ticket_last_seen', {}) or {}
-    unread_map = {}
-    for t in tickets:
-        seen_iso = last_seen_map.get(str(t.id))
-        seen_dt = None
-        if seen_iso:
-            try:
-                from datetime import datetime as _dt
-                seen_dt = _dt.fromisoformat(seen_iso)
-            except Exception:
-                seen_dt = None
-        q = TicketMessage.query.filter(
-            TicketMessage.ticket_id == t.id,
-            TicketMessage.user_id != current_user.id
-        )
-        if seen_dt:
-            q = q.filter(TicketMessage.created_at > seen_dt)
-        unread_map[t.id] = q.count()
+    unread_map = get_unread_map(current_user)
     return render_template('helpdesk/index.html', title='Yardım Merkezi', tickets=tickets, unread_map=unread_map)
 
 @bp.route("/new", methods=['GET', 'POST'])
@@ -98,25 +83,7 @@ def new_ticket():
             if allowed and ext not in allowed:
                 flash('Dosya tipi desteklenmiyor.', 'danger')
                 return redirect(url_for('helpdesk.new_ticket'))
-            upload_folder = current_app.config['UPLOAD_FOLDER']
-            os.makedirs(upload_folder, exist_ok=True)
-            safe_name = secure_filename(f"ticket_{current_user.id}_{int(datetime.utcnow().timestamp())}.{ext}" if ext else file.filename)
-            filepath = os.path.join(upload_folder, safe_name)
-            file.save(filepath)
-            try:
-                rel_path = os.path.relpath(filepath, os.path.join(current_app.root_path, 'static'))
-                url = url_for('static', filename=rel_path.replace('\\', '/'))
-            except Exception:
-                url = None
-            media = Media(
-                file_name=safe_name,
-                url=url or '',
-                mime=file.mimetype,
-                size=os.path.getsize(filepath),
-                user_id=current_user.id,
-            )
-            db.session.add(media)
-            db.session.commit()
+            media = store_upload(file, user_id=current_user.id)
             ticket_message.attachment_id = media.id
 
         db.session.add(ticket_message)
@@ -176,17 +143,7 @@ def ticket_detail(ticket_id):
     
     # Kullanıcı sohbete girdi: tüm ticket'ları görülmüş say → navbar ve Yardım rozetleri sıfırlansın
     try:
-        last_seen_map = session.get('ticket_last_seen', {}) or {}
-        from datetime import datetime as _dt
-        now_iso = _dt.utcnow().isoformat()
-        if not current_user.is_admin:
-            user_ticket_ids = [t.id for t in Ticket.query.filter_by(user_id=current_user.id).filter(Ticket.status.notin_(['closed', 'completed'])).all()]
-            for tid in user_ticket_ids:
-                last_seen_map[str(tid)] = now_iso
-        else:
-            # admin için sadece bu ticket'ı güncelle
-            last_seen_map[str(ticket.id)] = now_iso
-        session['ticket_last_seen'] = last_seen_map
+        mark_tickets_seen(current_user, ticket)
     except Exception:
         pass
     return render_template('helpdesk/ticket_detail.html', title=ticket.subject, ticket=ticket)
@@ -230,45 +187,54 @@ def unread_count():
     """Return total unread ticket messages for current user."""
     if current_user.is_admin:
         return {"count": 0}
-    tickets = Ticket.query.filter_by(user_id=current_user.id).filter(Ticket.status.notin_(['closed', 'completed'])).all()
-    last_seen_map = session.get('ticket_last_seen', {}) or {}
-    total = 0
-    for t in tickets:
-        seen_iso = last_seen_map.get(str(t.id))
-        seen_dt = None
-        if seen_iso:
-            from datetime import datetime as _dt
-            try:
-                seen_dt = _dt.fromisoformat(seen_iso)
-            except Exception:
-                seen_dt = None
-        q = TicketMessage.query.filter(
-            TicketMessage.ticket_id == t.id,
-            TicketMessage.user_id != current_user.id
-        )
-        if seen_dt:
-            q = q.filter(TicketMessage.created_at > seen_dt)
-        total += q.count()
-    return {"count": total}
+    return {"count": get_unread_count(current_user)}
 
 @bp.route("/<int:ticket_id>/stream")
 @login_required
 def stream_messages(ticket_id):
-    """Return messages newer than given last_id for a ticket."""
-    ticket = Ticket.query.get_or_404(ticket_id)
-    if ticket.user_id != current_user.id and not current_user.is_admin:
-        return {"messages": []}
-    
-    # Don't stream messages for completed tickets
-    if ticket.status in ['closed', 'completed']:
+    """Return messages newer than given last_id for a ticket.
+
+    ``wait=1`` ile istek, yeni mesaj gelene ya da ticket durumu değişene kadar
+    en fazla ``HELPDESK_POLL_TIMEOUT`` saniye bekler (long-poll). Bekleme
+    sırasında veritabanına gidilmez; bkz. ``ticketstream``.
+    """
+    state = ticket_state(ticket_id)
+    if state is None:
+        abort(404)
+    if state['user_id'] != current_user.id and not current_user.is_admin:
         return {"messages": []}
-        
+
     try:
         last_id = int(request.args.get('last_id') or 0)
     except Exception:
         last_id = 0
-    msgs = TicketMessage.query.filter(
-        TicketMessage.ticket_id == ticket.id,
+    waited = False
+    status = request.args.get('status') or state['status']
+    if (
+        request.args.get('wait')
+        and state['last_id'] <= last_id
+        and state['status'] == status
+        and state['status'] not in ['closed', 'completed']
+    ):
+        # Beklerken havuzdan bağlantı tutulmasın; yüklü current_user alanları kullanılabilir kalır
+        db.session.close()
+        state, waited = wait_for_change(
+            ticket_id, last_id, status, current_app.config.get('HELPDESK_POLL_TIMEOUT', 25)
+        )
+        if state is None:
+            abort(404)
+
+    payload = {"messages": [], "status": state['status'], "last_id": max(last_id, state['last_id']), "waited": waited}
+    # Don't stream messages for completed tickets
+    if state['status'] in ['closed', 'completed'] or state['last_id'] <= last_id:
+        return payload
+
+    # Yazar ve ek tek sorguda yüklenir (mesaj başına ek sorgu yok)
+    msgs = TicketMessage.query.options(
+        joinedload(TicketMessage.author).load_only(User.id, User.name, User.is_admin),
+        joinedload(TicketMessage.attachment).load_only(Media.id, Media.url, Media.file_name),
+    ).filter(
+        TicketMessage.ticket_id == ticket_id,
         TicketMessage.id > last_id
     ).order_by(TicketMessage.id.asc()).all()
     data = []
@@ -292,7 +258,10 @@ def stream_messages(ticket_id):
             "attachment_url": (m.attachment.url if m.attachment else None),
             "attachment_name": (m.attachment.file_name if m.attachment else None),
         })
-    return {"messages": data}
+    payload["messages"] = data
+    if msgs:
+        payload["last_id"] = max(payload["last_id"], msgs[-1].id)
+    return payload
 
 @bp.route("/<int:ticket_id>/seen", methods=["POST"])
 @login_required
@@ -306,16 +275,7 @@ def mark_seen(ticket_id):
         return {"ok": False}
         
     try:
-        last_seen_map = session.get('ticket_last_seen', {}) or {}
-        from datetime import datetime as _dt
-        now_iso = _dt.utcnow().isoformat()
-        if not current_user.is_admin:
-            user_ticket_ids = [t.id for t in Ticket.query.filter_by(user_id=current_user.id).filter(Ticket.status.notin_(['closed', 'completed'])).all()]
-            for tid in user_ticket_ids:
-                last_seen_map[str(tid)] = now_iso
-        else:
-            last_seen_map[str(ticket.id)] = now_iso
-        session['ticket_last_seen'] = last_seen_map
+        mark_tickets_seen(current_user, ticket)
         return {"ok": True}
     except Exception:
         return {"ok": False}
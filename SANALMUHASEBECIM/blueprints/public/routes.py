@@ -7,10 +7,38 @@ from SANALMUHASEBECIM.extensions import db, mail
 from flask_mail import Message
 from datetime import datetime
 from SANALMUHASEBECIM.utils import send_telegram_message, send_email, get_email_signature
+from SANALMUHASEBECIM.pagecache import cached_page, cached_fragment
+from types import SimpleNamespace
 
 
 
+def _popular_posts():
+    """Öne çıkanlar + popüler fallback (toplam 5); cache'lenebilir düz veri döner."""
+    featured_q = (
+        Post.query.filter_by(is_active=True, is_featured=True)
+        .order_by(Post.published_at.desc().nullslast(), Post.post_date.desc())
+    )
+    popular_posts = featured_q.limit(5).all()
+    if len(popular_posts) < 5:
+        remaining = 5 - len(popular_posts)
+        exclude_ids = [p.id for p in popular_posts] or [0]
+        # Denormalize like_count üzerinden (ix_post_popular) sıralanır
+        popular_q = (
+            Post.query
+            .filter(Post.is_active == True, ~Post.id.in_(exclude_ids))
+            .order_by(Post.like_count.desc(), Post.post_date.desc())
+            .limit(remaining)
+        )
+        popular_posts.extend(popular_q.all())
+    return [
+        SimpleNamespace(id=p.id, slug=p.slug, title=p.title, subtitle=p.subtitle,
+                        like_count=p.like_count, comment_count=p.comment_count)
+        for p in popular_posts
+    ]
+
+
 @bp.route("/")
+@cached_page('blog')
 def index():
     try:
         page = request.args.get('page', 1, type=int)
@@ -19,26 +47,7 @@ def index():
         prev_url = url_for('public.index', page=posts.prev_num) if posts.has_prev else None
         services = Service.query.filter_by(is_active=True).order_by(Service.order_index.asc(), Service.id.asc()).limit(3).all()
         posts_items = posts.items
-        # Öne çıkanlar + popüler fallback (toplam 5)
-        from sqlalchemy import func
-        featured_q = (
-            Post.query.filter_by(is_active=True, is_featured=True)
-            .order_by(Post.published_at.desc().nullslast(), Post.post_date.desc())
-        )
-        featured_posts = featured_q.limit(5).all()
-        popular_posts = featured_posts[:]
-        if len(popular_posts) < 5:
-            remaining = 5 - len(popular_posts)
-            exclude_ids = [p.id for p in popular_posts] or [0]
-            popular_q = (
-                Post.query
-                .filter(Post.is_active == True, ~Post.id.in_(exclude_ids))
-                .outerjoin(Like, Like.post_id == Post.id)
-                .group_by(Post.id)
-                .order_by(func.count(Like.id).desc(), Post.post_date.desc())
-                .limit(remaining)
-            )
-            popular_posts.extend(popular_q.all())
+        popular_posts = cached_fragment('popular_posts', ('blog',), _popular_posts)
     except Exception as e:
         posts = {'items': [], 'has_next': False, 'has_prev': False, 'next_num': None, 'prev_num': None}
         next_url = None
@@ -196,6 +205,7 @@ def contact():
 def contact_trailing_redirect():
     return redirect(url_for('public.contact'), code=301)
 @bp.route("/services")
+@cached_page()
 def services():
     try:
         # Tüm aktif hizmetler: order_index'e göre sırala, aynı sırada olanları id'ye göre sırala
@@ -234,6 +244,7 @@ def user_public_profile(user_id):
     return render_template('public/user_profile.html', title=user.name, user=user, recent_posts=recent_posts, recent_comments=recent_comments)
 
 @bp.route("/services/<slug>")
+@cached_page()
 def service_detail(slug):
     try:
         service = Service.query.filter_by(slug=slug, is_active=True).first_or_404()
@@ -0,0 +1,129 @@
+"""Yazı detayındaki yorum ağacı, sabit sayıda sorguyla.
+
+Şablon eskiden ``post.comments``, ``comment.replies``, ``comment.author`` ve
+``comment.likes`` tembel ilişkilerini dolaşıyordu; yorum başına birkaç sorgu
+demekti. ``load_comment_tree`` bunun yerine:
+
+1. yazının onaylı tüm yorumlarını yazar sütunlarıyla birlikte tek sorguda
+   okur (``ix_comment_post_thread``),
+2. ağacı bellekte kurar; beğeni sayıları denormalize ``Comment.like_count``
+   sütunundan gelir,
+3. giriş yapmış kullanıcının bu yazıdaki yorum beğenilerini tek sorguda
+   alıp her düğüme ``liked`` bayrağını koyar,
+4. kök yorumları (thread) sayfalar; yanıtlar kendi thread'iyle birlikte gelir.
+
+Onaylanmamış bir yorumun yanıtları ağaca bağlanamadığı için gösterilmez.
+"""
+from sqlalchemy import exists, select
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Comment, CommentLike, Like, User
+
+THREADS_PER_PAGE = 20
+
+
+class CommentAuthor:
+    __slots__ = ('id', 'name', 'profile_photo')
+
+    def __init__(self, id, name, profile_photo):
+        self.id = id
+        self.name = name
+        self.profile_photo = profile_photo
+
+
+class CommentNode:
+    """Read-only comment with the attributes the post template uses."""
+
+    __slots__ = ('id', 'content', 'date', 'parent_id', 'like_count', 'author', 'replies', 'liked')
+
+    def __init__(self, id, content, date, parent_id, like_count, author):
+        self.id = id
+        self.content = content
+        self.date = date
+        self.parent_id = parent_id
+        self.like_count = like_count or 0
+        self.author = author
+        self.replies = []
+        self.liked = False
+
+
+class CommentPage:
+    """One page of top-level threads; same attributes as the blog index pagination."""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = max(1, (total + per_page - 1) // per_page)
+        self.has_prev = page > 1
+        self.has_next = page < self.pages
+        self.prev_num = page - 1 if self.has_prev else None
+        self.next_num = page + 1 if self.has_next else None
+
+
+def _liked_comment_ids(post_id, user_id):
+    rows = db.session.execute(
+        select(CommentLike.comment_id)
+        .join(Comment, Comment.id == CommentLike.comment_id)
+        .where(CommentLike.user_id == user_id, Comment.post_id == post_id)
+    ).scalars()
+    return set(rows)
+
+
+def build_tree(rows):
+    """Link ``CommentNode``s by ``parent_id``; returns the roots in input order."""
+    nodes = {node.id: node for node in rows}
+    roots = []
+    for node in nodes.values():
+        if node.parent_id is None:
+            roots.append(node)
+        else:
+            parent = nodes.get(node.parent_id)
+            if parent is not None:
+                parent.replies.append(node)
+    return roots
+
+
+def load_comment_tree(post_id, user_id=None, page=1, per_page=THREADS_PER_PAGE):
+    """Approved comments of a post as a ``CommentPage`` of threads (newest first).
+
+    Replies are ordered oldest first below their parent. ``user_id`` fills the
+    ``liked`` flags; anonymous visitors cost a single query.
+    """
+    rows = db.session.execute(
+        select(
+            Comment.id, Comment.content, Comment.date, Comment.parent_id, Comment.like_count,
+            User.id.label('author_id'), User.name, User.profile_photo,
+        )
+        .join(User, User.id == Comment.user_id)
+        .where(Comment.post_id == post_id, Comment.is_approved == True)  # noqa: E712
+        .order_by(Comment.date, Comment.id)
+    ).all()
+    authors = {}
+    nodes = []
+    for row in rows:
+        author = authors.get(row.author_id)
+        if author is None:
+            author = authors[row.author_id] = CommentAuthor(row.author_id, row.name, row.profile_photo)
+        nodes.append(CommentNode(row.id, row.content, row.date, row.parent_id, row.like_count, author))
+
+    if user_id is not None and nodes:
+        liked = _liked_comment_ids(post_id, user_id)
+        for node in nodes:
+            node.liked = node.id in liked
+
+    roots = build_tree(nodes)
+    roots.reverse()
+    page = max(1, page)
+    start = (page - 1) * per_page
+    return CommentPage(roots[start:start + per_page], page, per_page, len(roots))
+
+
+def post_liked(post_id, user_id):
+    """Whether ``user_id`` liked the post (one indexed EXISTS lookup)."""
+    if user_id is None:
+        return False
+    return bool(db.session.execute(
+        select(exists().where(Like.user_id == user_id, Like.post_id == post_id))
+    ).scalar())
@@ -14,6 +14,8 @@ class Config:
     # Enter your database URL in .env (e.g. sqlite for local: sqlite:///app.db)
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(BASE_DIR, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Açılışta SQLite tabloları + varsayılan hesaplar (startup); kapalıyken `flask setup all`
+    DB_AUTO_SETUP = os.environ.get('DB_AUTO_SETUP', 'true').lower() in ('1', 'true', 'yes')
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     REMEMBER_COOKIE_DURATION = timedelta(days=30)
     REMEMBER_COOKIE_SECURE = False
@@ -35,12 +37,60 @@ class Config:
     MAIL_USE_UTF8 = True
     MAIL_CHARSET = 'utf-8'
 
+    # Shared cache / rate-limit backend: redis://host:6379/0, sqlite:////path/shared.sqlite
+    # or empty for per-process memory (see sharedstore.py)
+    SHARED_STORE_URL = os.environ.get('SHARED_STORE_URL') or ''
+    CACHE_DEFAULT_TIMEOUT = 300
+    # Anonim ziyaretçiler için sayfa/fragment cache (pagecache)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 300))
+    ADMIN_RATE_LIMIT = os.environ.get('ADMIN_RATE_LIMIT') or '5 per minute'
+    # Randevu dilimleri (slots): "mon-fri 09:00-12:00 13:00-18:00; sat 10:00-14:00"
+    BOOKING_WORKING_HOURS = os.environ.get('BOOKING_WORKING_HOURS') or 'mon-sun 09:00-18:00'
+    BOOKING_SLOT_MINUTES = int(os.environ.get('BOOKING_SLOT_MINUTES', 30))
+    BOOKING_AVAILABILITY_TIMEOUT = int(os.environ.get('BOOKING_AVAILABILITY_TIMEOUT', 3600))
+    # Aylık faturalama (billing): son ödeme günü, hatırlatma ve gecikme süreleri (gün)
+    BILLING_DUE_DAY = int(os.environ.get('BILLING_DUE_DAY', 5))
+    BILLING_REMINDER_DAYS = int(os.environ.get('BILLING_REMINDER_DAYS', 5))
+    BILLING_GRACE_DAYS = int(os.environ.get('BILLING_GRACE_DAYS', 3))
+    # İstek başına SQL ölçümü ve N+1 uyarıları (sqlstats); varsayılan kapalı
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() in ('1', 'true', 'yes')
+    SQL_DEBUG_PANEL = os.environ.get('SQL_DEBUG_PANEL', 'false').lower() in ('1', 'true', 'yes')
+    SQL_N1_THRESHOLD = int(os.environ.get('SQL_N1_THRESHOLD', 5))
+    SQL_LOG_MIN_QUERIES = int(os.environ.get('SQL_LOG_MIN_QUERIES', 30))
+    # Helpdesk long-poll (ticketstream): azami bekleme, cache kontrol aralığı ve eşzamanlı bekleyici sınırı.
+    # Bekleyici sınırı sunucu thread sayısının (waitress varsayılanı 4) altında kalmalı.
+    HELPDESK_POLL_TIMEOUT = int(os.environ.get('HELPDESK_POLL_TIMEOUT', 25))
+    HELPDESK_POLL_INTERVAL = float(os.environ.get('HELPDESK_POLL_INTERVAL', 1.0))
+    HELPDESK_MAX_WAITERS = int(os.environ.get('HELPDESK_MAX_WAITERS', 2))
+
+    # Blog search index: auto (SQLite FTS5 / MSSQL full-text / in-memory), sqlite, mssql or memory
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+
+    # Giden e-posta kuyruğu (mailqueue): worker sayısı, parti boyutu, hız sınırı ve yeniden deneme
+    MAIL_QUEUE_INPROCESS = os.environ.get('MAIL_QUEUE_INPROCESS', 'true').lower() in ('1', 'true', 'yes')
+    MAIL_QUEUE_WORKERS = int(os.environ.get('MAIL_QUEUE_WORKERS') or 2)
+    MAIL_QUEUE_BATCH_SIZE = int(os.environ.get('MAIL_QUEUE_BATCH_SIZE') or 50)
+    MAIL_QUEUE_RATE_PER_MINUTE = int(os.environ.get('MAIL_QUEUE_RATE_PER_MINUTE') or 120)
+    MAIL_QUEUE_MAX_ATTEMPTS = int(os.environ.get('MAIL_QUEUE_MAX_ATTEMPTS') or 6)
+    MAIL_QUEUE_RETRY_BASE_SECONDS = 30
+    MAIL_QUEUE_CLAIM_TIMEOUT = 600
+    MAIL_QUEUE_POLL_SECONDS = 15
+
     BASE_URL = os.environ.get('BASE_URL') or 'http://127.0.0.1:5000'
 
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024))
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(BASE_DIR, 'SANALMUHASEBECIM', 'static', 'uploads')
     ALLOWED_EXTENSIONS = set((os.environ.get('ALLOWED_EXTENSIONS') or 'pdf,jpg,jpeg,png,doc,docx,xls,xlsx').split(','))
 
+    # Static dosyalar: parmak izli URL'ler immutable, diğerleri STATIC_MAX_AGE saniye cache'lenir
+    STATIC_FINGERPRINT = os.environ.get('STATIC_FINGERPRINT', 'true').lower() in ('1', 'true', 'yes')
+    STATIC_FINGERPRINT_EXCLUDE = ()
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
+    STATIC_COMPRESS_ON_DEMAND = os.environ.get('STATIC_COMPRESS_ON_DEMAND', 'true').lower() in ('1', 'true', 'yes')
+    # Önde nginx/IIS varsa dosya gövdesini X-Sendfile ile sunucuya bırak
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() in ('1', 'true', 'yes')
+
     # Optional: enter your credentials in .env if you use these features
     TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN') or ''
     TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID') or ''
@@ -51,6 +101,13 @@ class Config:
     FACEBOOK_CLIENT_ID = os.environ.get('FACEBOOK_CLIENT_ID') or ''
     FACEBOOK_CLIENT_SECRET = os.environ.get('FACEBOOK_CLIENT_SECRET') or ''
 
+    # Telegram / Google Calendar calls run on a background dispatcher thread
+    TELEGRAM_API_BASE = os.environ.get('TELEGRAM_API_BASE') or 'https://api.telegram.org'
+    NOTIFY_ASYNC = os.environ.get('NOTIFY_ASYNC', 'true').lower() in ('1', 'true', 'yes')
+    NOTIFY_COALESCE_SECONDS = float(os.environ.get('NOTIFY_COALESCE_SECONDS', 1.0))
+    NOTIFY_MAX_RETRIES = int(os.environ.get('NOTIFY_MAX_RETRIES', 3))
+    NOTIFY_HTTP_TIMEOUT = int(os.environ.get('NOTIFY_HTTP_TIMEOUT', 10))
+
     # Payment / IBAN (optional) – enter your info in .env
     IBAN = os.environ.get('IBAN') or ''
     IBAN_ACCOUNT_HOLDER = os.environ.get('IBAN_ACCOUNT_HOLDER') or ''
@@ -70,11 +127,19 @@ class ProductionConfig(Config):
     REMEMBER_COOKIE_SECURE = True
     TESTING = False
     LOG_LEVEL = 'WARNING'
+    # Worker açılışı veritabanına dokunmaz; kurulum deploy sırasında `flask setup all` ile
+    DB_AUTO_SETUP = os.environ.get('DB_AUTO_SETUP', 'false').lower() in ('1', 'true', 'yes')
 
 
 class TestingConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Benchmark'lar tohumlanmış bir dosya veritabanı kullanabilir (scripts/benchmarks)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
+    # Testlerde kuyruk mailqueue.drain() ile elle boşaltılır
+    MAIL_QUEUE_INPROCESS = False
+    # Bildirimler senkron gönderilir; TELEGRAM_API_BASE yerel stub'a yönlendirilebilir
+    NOTIFY_ASYNC = False
+    PAGE_CACHE_ENABLED = False
 
 
 config = {
@@ -0,0 +1,149 @@
+"""Post ve yorumlar için denormalize sayaçlar.
+
+``Post.like_count``, ``Post.comment_count`` ve ``Comment.like_count`` ilgili
+satır eklenip silindikçe aynı flush içinde atomik bir
+``UPDATE ... SET n = n + 1`` ile güncellenir; okuma-değiştirme-yazma yarışı
+olmaz. ``Post.comment_count`` yalnızca onaylı yorumları sayar: yorum
+onaylanınca ya da onayı kaldırılınca da güncellenir. Veritabanı ``RETURNING``/``OUTPUT`` destekliyorsa yeni değer oturuma
+kaydedilir ve beğeni uçları ek sorgu atmadan ``last_count`` ile döndürür.
+
+Toplu silmeler (``query.delete()``) mapper olaylarını atlar; bu ve benzeri
+kaymalar ``flask counters reconcile`` ile düzeltilir.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import object_session
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Comment, CommentLike, Like, Post
+
+# Çocuk model -> [(sayaç tablosu modeli, yabancı anahtar özniteliği, sayaç sütunu, koşul sütunu)]
+# Koşul sütunu verilmişse yalnızca o sütunu doğru olan satırlar sayılır.
+COUNTERS = {
+    Like: [(Post, 'post_id', 'like_count', None)],
+    Comment: [(Post, 'post_id', 'comment_count', 'is_approved')],
+    CommentLike: [(Comment, 'comment_id', 'like_count', None)],
+}
+
+_SESSION_KEY = 'counter_values'
+
+
+def _bump(connection, session_, model, pk, column, delta):
+    table = model.__table__
+    counter = table.c[column]
+    stmt = table.update().where(table.c.id == pk).values({column: func.coalesce(counter, 0) + delta})
+    if connection.dialect.update_returning:
+        value = connection.execute(stmt.returning(counter)).scalar()
+        if session_ is not None and value is not None:
+            session_.info.setdefault(_SESSION_KEY, {})[(model.__name__, pk, column)] = value
+    else:
+        connection.execute(stmt)
+
+
+def _make_listener(delta):
+    def listener(mapper, connection, target):
+        session_ = object_session(target)
+        for model, fk, column, flag in COUNTERS[type(target)]:
+            pk = getattr(target, fk)
+            if pk is not None and (flag is None or getattr(target, flag)):
+                _bump(connection, session_, model, pk, column, delta)
+    return listener
+
+
+def _flag_changed(mapper, connection, target):
+    """Count or uncount a row whose condition column flipped (e.g. a comment got approved)."""
+    session_ = object_session(target)
+    state = db.inspect(target)
+    for model, fk, column, flag in COUNTERS[type(target)]:
+        if flag is None:
+            continue
+        history = state.attrs[flag].history
+        if not history.has_changes():
+            continue
+        before = bool(history.deleted and history.deleted[0])
+        after = bool(getattr(target, flag))
+        pk = getattr(target, fk)
+        if before != after and pk is not None:
+            _bump(connection, session_, model, pk, column, 1 if after else -1)
+
+
+_increment = _make_listener(1)
+_decrement = _make_listener(-1)
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for _model, _counters in COUNTERS.items():
+    event.listen(_model, 'after_insert', _increment)
+    event.listen(_model, 'after_delete', _decrement)
+    for *_, _flag in _counters:
+        if _flag is not None:
+            # Commit sonrası süresi dolmuş alanda da eski değer yüklensin; yoksa
+            # _flag_changed değerin gerçekten değişip değişmediğini bilemez
+            event.listen(getattr(_model, _flag), 'set', _load_old_value, active_history=True)
+            event.listen(_model, 'after_update', _flag_changed)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_counter_values(session_):
+    session_.info.pop(_SESSION_KEY, None)
+
+
+def bump(model, pk, delta, column='like_count'):
+    """Add ``delta`` to a counter in the current transaction.
+
+    For Core writes that bypass the mapper events (see ``likes``); the new value is
+    available through ``last_count`` like after a flush.
+    """
+    _bump(db.session.connection(), db.session, model, pk, column, delta)
+
+
+def last_count(model, pk, column='like_count'):
+    """Counter value written by the last flush of this session, falling back to a SELECT."""
+    value = db.session.info.get(_SESSION_KEY, {}).pop((model.__name__, pk, column), None)
+    if value is None:
+        table = model.__table__
+        value = db.session.execute(select(table.c[column]).where(table.c.id == pk)).scalar()
+    return value or 0
+
+
+def _recount(model, column, child, fk, ids=None, flag=None):
+    """Rewrite drifted counters of ``model`` from a grouped count; returns the number of rows fixed."""
+    table = model.__table__
+    child_table = child.__table__
+    actual = select(func.count()).where(child_table.c[fk] == table.c.id)
+    if flag is not None:
+        actual = actual.where(child_table.c[flag] == True)  # noqa: E712
+    actual = actual.scalar_subquery()
+    stmt = (
+        table.update()
+        .where(func.coalesce(table.c[column], -1) != actual)
+        .values({column: actual})
+    )
+    if ids is not None:
+        stmt = stmt.where(table.c.id.in_(list(ids)))
+    return db.session.execute(stmt).rowcount
+
+
+def reconcile(post_ids=None, comment_ids=None):
+    """Repair counter drift; limit to the given ids when provided."""
+    fixed = {
+        'post.like_count': _recount(Post, 'like_count', Like, 'post_id', post_ids),
+        'post.comment_count': _recount(Post, 'comment_count', Comment, 'post_id', post_ids, flag='is_approved'),
+        'comment.like_count': _recount(Comment, 'like_count', CommentLike, 'comment_id', comment_ids),
+    }
+    db.session.commit()
+    return fixed
+
+
+counters_cli = AppGroup('counters', help='Denormalized counter commands.')
+
+
+@counters_cli.command('reconcile')
+def reconcile_command():
+    """Recount likes and approved comments and fix drifted counters."""
+    for name, count in reconcile().items():
+        click.echo(f"{name}: {count} rows fixed.")
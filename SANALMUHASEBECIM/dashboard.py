@@ -0,0 +1,126 @@
+"""Admin dashboard metrikleri.
+
+Yedi toplam sayı tek bir SELECT içinde skaler alt sorgularla hesaplanır; sonuç ve
+"son aktiviteler" listeleri kısa süreli olarak ``cache`` üzerinde tutulur. İlgili
+modellere kayıt eklendiğinde ya da silindiğinde cache commit sonrası temizlenir,
+böylece admin sayfayı yenilediğinde veritabanına sadece değişiklik varsa gidilir.
+"""
+from types import SimpleNamespace
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import joinedload, load_only, object_session
+
+from SANALMUHASEBECIM.extensions import cache, db
+from SANALMUHASEBECIM.models import User, Post, Comment, Appointment, Lead, Ticket, Service
+
+COUNTS_KEY = 'dashboard:counts'
+RECENT_KEY = 'dashboard:recent'
+COUNTS_TIMEOUT = 60
+RECENT_TIMEOUT = 30
+RECENT_LIMIT = 5
+
+COUNTED_MODELS = {
+    'total_users': User,
+    'total_posts': Post,
+    'total_comments': Comment,
+    'total_appointments': Appointment,
+    'total_leads': Lead,
+    'total_tickets': Ticket,
+    'total_services': Service,
+}
+
+
+def _query_counts():
+    """Compute every dashboard total in a single round trip."""
+    columns = [
+        select(func.count()).select_from(model).scalar_subquery().label(name)
+        for name, model in COUNTED_MODELS.items()
+    ]
+    row = db.session.execute(select(*columns)).one()
+    return dict(row._mapping)
+
+
+def get_dashboard_counts():
+    """Return {'total_users': n, ...}, cached for ``COUNTS_TIMEOUT`` seconds."""
+    counts = cache.get(COUNTS_KEY)
+    if counts is None:
+        counts = _query_counts()
+        cache.set(COUNTS_KEY, counts, timeout=COUNTS_TIMEOUT)
+    return counts
+
+
+def _query_recent():
+    # Cache'e ORM nesneleri değil, şablonun kullandığı alanların kopyası konur
+    users = db.session.execute(
+        select(User).options(load_only(User.name, User.email, User.created_at))
+        .order_by(User.created_at.desc()).limit(RECENT_LIMIT)
+    ).scalars().all()
+    posts = db.session.execute(
+        select(Post).options(
+            load_only(Post.title, Post.is_active, Post.post_date),
+            joinedload(Post.author).load_only(User.name),
+        )
+        .order_by(Post.post_date.desc()).limit(RECENT_LIMIT)
+    ).scalars().all()
+    appointments = db.session.execute(
+        select(Appointment).options(load_only(Appointment.email, Appointment.appointment_datetime, Appointment.status))
+        .order_by(Appointment.created_at.desc()).limit(RECENT_LIMIT)
+    ).scalars().all()
+    leads = db.session.execute(
+        select(Lead).order_by(Lead.created_at.desc()).limit(RECENT_LIMIT)
+    ).scalars().all()
+    return {
+        'recent_users': [
+            SimpleNamespace(id=u.id, name=u.name, email=u.email, created_at=u.created_at) for u in users
+        ],
+        'recent_posts': [
+            SimpleNamespace(
+                id=p.id, title=p.title, is_active=p.is_active, post_date=p.post_date,
+                author=SimpleNamespace(id=p.author.id, name=p.author.name) if p.author else None,
+            )
+            for p in posts
+        ],
+        'recent_appointments': [
+            SimpleNamespace(id=a.id, email=a.email, appointment_datetime=a.appointment_datetime, status=a.status)
+            for a in appointments
+        ],
+        'recent_leads': [
+            SimpleNamespace(id=l.id, name=l.name, lead_type=l.lead_type, status=l.status, created_at=l.created_at)
+            for l in leads
+        ],
+    }
+
+
+def get_recent_activity():
+    """Return the "recent" lists of the dashboard, cached for ``RECENT_TIMEOUT`` seconds."""
+    recent = cache.get(RECENT_KEY)
+    if recent is None:
+        recent = _query_recent()
+        cache.set(RECENT_KEY, recent, timeout=RECENT_TIMEOUT)
+    return recent
+
+
+def invalidate_dashboard():
+    cache.delete_many(COUNTS_KEY, RECENT_KEY)
+
+
+def _mark_dirty(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None:
+        session_.info['dashboard_dirty'] = True
+
+
+for _model in COUNTED_MODELS.values():
+    event.listen(_model, 'after_insert', _mark_dirty)
+    event.listen(_model, 'after_delete', _mark_dirty)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _flush_dashboard_cache(session_):
+    if session_.info.pop('dashboard_dirty', False):
+        invalidate_dashboard()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_dashboard_dirty(session_):
+    session_.info.pop('dashboard_dirty', None)
@@ -0,0 +1,293 @@
+"""E-posta şablon motoru.
+
+İşlem e-postaları ``templates/email/`` altındaki Jinja parçalarından üretilir:
+
+* Şablonlar uygulamanın Jinja ortamından bağımsız, tek bir ortamda bir kez
+  derlenip önbellekte tutulur (istek bağlamı gerekmez; toplu gönderimde
+  mesaj başına yalnızca render maliyeti kalır).
+* ``_styles.css`` kuralları şablon kaynağı yüklenirken ``class="..."``
+  özniteliklerinden satır içi ``style="..."``'a çevrilir; CSS inlining çalışma
+  anında değil derleme sırasında yapılır.
+* Ortak çerçeve (``_layout.html``: header + imza) süreç başına bir kez render
+  edilip ön ve son ek olarak saklanır; her mesajda yalnızca içerik parçası
+  render edilip bu iki dizeyle birleştirilir.
+* Düz metin gövde, aynı adlı ``.txt`` şablonu yoksa içerik HTML'inden otomatik
+  üretilir ve imzanın düz metin hâli eklenir.
+
+    html, text = render_email('confirm_email', name=user.name, confirm_url=url)
+    send_templated_email('notice', 'Konu', ['a@b.com'], greeting='Merhaba', paragraphs=[...])
+"""
+import os
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime
+from html.parser import HTMLParser
+
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from markupsafe import Markup
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+STYLESHEET = '_styles.css'
+SITE = {
+    'site_name': 'Sanal Muhasebecim',
+    'tagline': 'Güvenilir Finansal Çözüm Ortağınız',
+    'contact_email': 'info@sanalmuhasebem.net',
+    'website': 'www.sanalmuhasebem.net',
+}
+REPLY_TO = SITE['contact_email']
+_CONTENT_MARKER = '\x00content\x00'
+
+RenderedEmail = namedtuple('RenderedEmail', 'html text')
+
+
+# --- CSS inlining ------------------------------------------------------------
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_RULE_RE = re.compile(r'\.([\w-]+)\s*\{([^}]*)\}')
+_TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)(\s[^<>]*?)?(/?)>')
+_CLASS_ATTR_RE = re.compile(r'\sclass="([^"]*)"')
+_STYLE_ATTR_RE = re.compile(r'\sstyle="([^"]*)"')
+# ``bg-{{ color }}`` gibi şablon ifadesi içeren sınıf adları tek parça sayılır
+_CLASS_TOKEN_RE = re.compile(r'[\w-]*\{\{.*?\}\}[\w-]*|\S+')
+_DYNAMIC_CLASS_RE = re.compile(r'^([\w-]*)\{\{(.*?)\}\}([\w-]*)$')
+CSS_GLOBAL = '_css'
+
+
+def parse_stylesheet(css):
+    """``{class_name: 'prop: value; ...'}`` for the single-class rules of a stylesheet."""
+    rules = {}
+    for name, body in _CSS_RULE_RE.findall(_CSS_COMMENT_RE.sub('', css)):
+        declarations = [d.strip() for d in body.split(';') if d.strip()]
+        rules[name] = '; '.join(filter(None, [rules.get(name)] + ['; '.join(declarations)]))
+    return rules
+
+
+def _dynamic_style(name):
+    """Jinja lookup for a class name built from an expression, e.g. ``bg-{{ color }}``."""
+    match = _DYNAMIC_CLASS_RE.match(name)
+    if not match:
+        return None
+    prefix, expr, suffix = match.groups()
+    return f"{{{{ {CSS_GLOBAL}.get({prefix!r} ~ ({expr.strip()}) ~ {suffix!r}, '') }}}}"
+
+
+def inline_css(source, rules):
+    """Replace known ``class`` names in ``source`` with the equivalent inline ``style``.
+
+    Class names containing a template expression are resolved at render time from the
+    ``_css`` global (a dict lookup). Unknown class names are kept; an existing ``style``
+    attribute is appended last so that hand-written declarations still win.
+    """
+    def replace(match):
+        attrs = match.group(2) or ''
+        class_attr = _CLASS_ATTR_RE.search(attrs)
+        if not class_attr:
+            return match.group(0)
+        styles, kept = [], []
+        for name in _CLASS_TOKEN_RE.findall(class_attr.group(1)):
+            style = rules.get(name) or _dynamic_style(name)
+            if style:
+                styles.append(style)
+            else:
+                kept.append(name)
+        if not styles:
+            return match.group(0)
+        attrs = attrs[:class_attr.start()] + attrs[class_attr.end():]
+        if kept:
+            attrs += f' class="{" ".join(kept)}"'
+        style_attr = _STYLE_ATTR_RE.search(attrs)
+        if style_attr:
+            styles.append(style_attr.group(1).strip().rstrip(';'))
+            attrs = attrs[:style_attr.start()] + attrs[style_attr.end():]
+        return f'<{match.group(1)}{attrs} style="{"; ".join(styles)}"{match.group(3)}>'
+    return _TAG_RE.sub(replace, source)
+
+
+class InliningLoader(FileSystemLoader):
+    """File loader that inlines the e-mail stylesheet into ``.html`` templates on load."""
+
+    def __init__(self, searchpath, stylesheet=STYLESHEET):
+        super().__init__(searchpath)
+        self.stylesheet = stylesheet
+        self._rules = None
+
+    def rules(self, environment):
+        if self._rules is None:
+            source, _, _ = super().get_source(environment, self.stylesheet)
+            self._rules = parse_stylesheet(source)
+        return self._rules
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        if template.endswith('.html'):
+            source = inline_css(source, self.rules(environment))
+        return source, filename, uptodate
+
+
+# --- HTML -> düz metin -------------------------------------------------------
+
+_BLOCK_TAGS = {
+    'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'table', 'tr',
+    'blockquote', 'pre', 'code', 'section', 'header', 'footer',
+}
+_SKIP_TAGS = {'style', 'script', 'head', 'title'}
+_INLINE_SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.links = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self.skip += 1
+        elif tag == 'br':
+            self.parts.append('\n')
+        elif tag == 'li':
+            self.parts.append('\n- ')
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n\n')
+        elif tag == 'a':
+            self.links.append((dict(attrs).get('href'), len(self.parts)))
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n\n')
+        elif tag == 'a' and self.links:
+            href, start = self.links.pop()
+            label = ''.join(self.parts[start:]).strip()
+            if href and href.startswith(('http://', 'https://')) and href != label:
+                self.parts.append(f' ({href})')
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.parts.append(_INLINE_SPACE_RE.sub(' ', data.replace('\n', ' ')))
+
+
+def html_to_text(html):
+    """Readable plain-text version of an e-mail HTML body (paragraphs, bullets, link targets)."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = [line.strip() for line in ''.join(parser.parts).split('\n')]
+    return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+
+# --- Motor -------------------------------------------------------------------
+
+class EmailRenderer:
+    """Compiled e-mail templates plus the pre-rendered shared frame."""
+
+    def __init__(self, template_dir=TEMPLATE_DIR, auto_reload=False):
+        self.env = Environment(
+            loader=InliningLoader(template_dir),
+            autoescape=True,
+            auto_reload=auto_reload,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            cache_size=-1,
+        )
+        rules = self.env.loader.rules(self.env)
+        self.env.globals.update(SITE, year=datetime.now().year)
+        self.env.globals[CSS_GLOBAL] = {name: Markup(style) for name, style in rules.items()}
+        frame = self.env.get_template('_layout.html').render(content=Markup(_CONTENT_MARKER))
+        self.prefix, self.suffix = frame.split(_CONTENT_MARKER)
+        self.header_html = self.env.get_template('_header.html').render()
+        self.footer_html = self.env.get_template('_footer.html').render()
+        self.text_footer = '--\n' + html_to_text(self.footer_html)
+        self._text_templates = {}
+
+    def _text_template(self, name):
+        if name not in self._text_templates:
+            try:
+                self._text_templates[name] = self.env.get_template(f'{name}.txt')
+            except TemplateNotFound:
+                self._text_templates[name] = None
+        return self._text_templates[name]
+
+    def wrap(self, content_html):
+        return self.prefix + content_html + self.suffix
+
+    def render(self, template, /, **context):
+        content = self.env.get_template(f'{template}.html').render(context)
+        text_template = self._text_template(template)
+        text = text_template.render(context) if text_template is not None else html_to_text(content)
+        return RenderedEmail(self.wrap(content), f'{text}\n\n{self.text_footer}')
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Process-wide renderer; templates are compiled once (reloaded on change in debug)."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                debug = False
+                try:
+                    from flask import current_app
+                    debug = bool(current_app and current_app.debug)
+                except RuntimeError:
+                    pass
+                _renderer = EmailRenderer(auto_reload=debug)
+    return _renderer
+
+
+def render_email(template, /, **context):
+    """Render ``templates/email/<template>.html`` into a full (html, text) message."""
+    return get_renderer().render(template, **context)
+
+
+def render_many(template, contexts):
+    """Yield one rendered message per context; for bulk/personalised sends."""
+    renderer = get_renderer()
+    for context in contexts:
+        yield renderer.render(template, **context)
+
+
+def wrap_html(content_html):
+    """Wrap an already rendered HTML fragment in the shared header and signature."""
+    return get_renderer().wrap(content_html)
+
+
+def send_templated_email(template, /, subject, recipients, reply_to=REPLY_TO, attachments=None,
+                         cc=None, bcc=None, commit=True, **context):
+    """Render a template and put the message on the outgoing queue (see mailqueue)."""
+    from SANALMUHASEBECIM.mailqueue import enqueue_email
+    html, text = render_email(template, **context)
+    return enqueue_email(
+        subject=subject,
+        recipients=recipients,
+        text_body=text,
+        html_body=html,
+        attachments=attachments,
+        reply_to=reply_to,
+        cc=cc,
+        bcc=bcc,
+        commit=commit,
+    )
+
+
+def send_notice(subject, recipients, greeting=None, headline=None, paragraphs=(), details=(),
+                items=(), items_intro=None, closing=(), signoff=True, **kwargs):
+    """Short transactional notice (``notice.html``).
+
+    ``details`` is a list of ``(label, value)`` or ``(label, value, href)`` rows shown
+    in a highlighted box; ``items`` a bullet list introduced by ``items_intro``.
+    """
+    rows = [tuple(row) + (None,) * (3 - len(row)) for row in details]
+    return send_templated_email(
+        'notice', subject, recipients,
+        greeting=greeting, headline=headline, paragraphs=list(paragraphs), details=rows,
+        items=list(items), items_intro=items_intro, closing=list(closing), signoff=signoff,
+        **kwargs,
+    )
@@ -1,6 +1,8 @@
+import threading
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask import request, abort, redirect, url_for, flash
+from flask import request, abort, redirect, url_for, flash, current_app
 from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_limiter import Limiter
@@ -8,7 +10,7 @@ from flask_limiter.util import get_remote_address
 from flask_login import current_user
 from flask_caching import Cache
 from flask_wtf.csrf import CSRFProtect
-from authlib.integrations.flask_client import OAuth
+from SANALMUHASEBECIM.sharedstore import configure_shared_store
 
 # Database
 db = SQLAlchemy()
@@ -69,19 +71,44 @@ limiter = Limiter(
     ]
 )
 
-# Cache
-cache = Cache(config={
-    'CACHE_TYPE': 'simple',
-    'CACHE_DEFAULT_TIMEOUT': 300
-})
+# Cache (arka uç SHARED_STORE_URL ile seçilir, bkz. sharedstore.py)
+cache = Cache()
 
 # CSRF Protection
 csrf = CSRFProtect()
 
 # OAuth
-oauth = OAuth()
+class LazyOAuth:
+    """authlib ``OAuth`` registry created on first attribute access.
+
+    authlib and its HTTP/crypto dependencies are slow to import and most workers
+    never serve an OAuth login, so the registry for the current app is built
+    (and the providers registered) only when ``oauth.<name>`` is first used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def _registry(self):
+        app = current_app._get_current_object()
+        registry = app.extensions.get('oauth_registry')
+        if registry is None:
+            with self._lock:
+                registry = app.extensions.get('oauth_registry')
+                if registry is None:
+                    from authlib.integrations.flask_client import OAuth
+                    registry = OAuth(app)
+                    _register_oauth_providers(app, registry)
+                    app.extensions['oauth_registry'] = registry
+        return registry
+
+    def __getattr__(self, name):
+        return getattr(self._registry(), name)
+
+
+oauth = LazyOAuth()
 
-def _register_oauth_providers(app):
+def _register_oauth_providers(app, oauth):
     """Register OAuth providers if credentials exist in config."""
     # Google (OIDC)
     google_client_id = app.config.get('GOOGLE_CLIENT_ID')
@@ -118,8 +145,8 @@ def init_extensions(app):
     login_manager.init_app(app)
     mail.init_app(app)
     migrate.init_app(app, db)
+    configure_shared_store(app)
     limiter.init_app(app)
     cache.init_app(app)
     csrf.init_app(app)
-    oauth.init_app(app)
-    _register_oauth_providers(app)
+    # OAuth sağlayıcıları ilk kullanımda kaydedilir (LazyOAuth)
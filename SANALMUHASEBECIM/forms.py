@@ -150,12 +150,9 @@ class DanismanlikForm(FlaskForm):
 
     def __init__(self, *args, **kwargs):
         super(DanismanlikForm, self).__init__(*args, **kwargs)
-        # Saat seçeneklerini oluştur (09:00-17:00 arası, 30'ar dakikalık dilimler)
-        time_slots = []
-        for hour in range(9, 18):
-            for minute in ['00', '30']:
-                time_slots.append((f'{hour:02d}:{minute}', f'{hour:02d}:{minute}'))
-        self.appointment_time.choices = time_slots
+        # Saat seçenekleri çalışma saatlerinden gelir (BOOKING_WORKING_HOURS, bkz. slots)
+        from SANALMUHASEBECIM.slots import slot_choices
+        self.appointment_time.choices = slot_choices()
 
     def validate_appointment_date(self, field):
         today = date.today()
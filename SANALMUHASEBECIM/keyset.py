@@ -0,0 +1,174 @@
+"""Uzun listeler için keyset (cursor) sayfalama.
+
+``paginate()`` OFFSET ve her sayfada ``COUNT(*)`` yerine listenin sıralama
+anahtarıyla (ör. ``(created_at, id)``) "son görülen satırdan sonrası"nı ister::
+
+    page = keyset.paginate(User.query, [User.created_at, User.id], request.args.get('cursor'))
+    url_for('admin.users', cursor=page.next_cursor)
+
+Derin sayfalar da ilk sayfa kadar ucuzdur (indeksli bir aralık taraması +
+``LIMIT``). Anahtarın son sütunu benzersiz olmalıdır (genellikle ``id``).
+
+* ``next_cursor`` / ``prev_cursor`` imzalı, opak belirteçlerdir; içinde yön,
+  sınır satırın anahtar değerleri ve sayfa numarası bulunur. Bozuk ya da
+  kurcalanmış belirteç ilk sayfaya döner.
+* NULL değerler SQLite ve MSSQL'deki gibi en küçük sayılır (``DESC``'te
+  sonda); nullable anahtar sütunlarında karşılaştırma buna göre kurulur.
+* ``count_key`` verilirse toplam satır sayısı ``COUNT_TIMEOUT`` saniyeliğine
+  cache'lenir; ``total`` ve ``pages`` bu yüzden yaklaşıktır. Verilmezse hiç
+  sayım yapılmaz.
+"""
+import hashlib
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, false, literal, or_
+
+from SANALMUHASEBECIM.extensions import cache
+
+PER_PAGE = 20
+COUNT_TIMEOUT = 60
+
+
+class KeysetPage:
+    """One page of a keyset-paginated list."""
+
+    def __init__(self, items, per_page, page, next_cursor, prev_cursor, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.page = page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.has_next = next_cursor is not None
+        self.has_prev = prev_cursor is not None
+        self.total = total
+        self.pages = max(1, (total + per_page - 1) // per_page, page) if total is not None else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+# --- Belirteçler -------------------------------------------------------------
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='keyset-cursor')
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['n', str(value)]
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, list):
+        tag, raw = value
+        if tag == 'dt':
+            return datetime.fromisoformat(raw)
+        if tag == 'd':
+            return date.fromisoformat(raw)
+        if tag == 'n':
+            return Decimal(raw)
+    return value
+
+
+def encode_cursor(forward, values, page):
+    return _serializer().dumps(['n' if forward else 'p', page, [_dump_value(v) for v in values]])
+
+
+def decode_cursor(token, size):
+    """``(forward, values, page)`` or ``None`` for a missing, tampered or mismatched token."""
+    if not token:
+        return None
+    try:
+        direction, page, values = _serializer().loads(token)
+        values = [_load_value(v) for v in values]
+    except (BadSignature, TypeError, ValueError):
+        return None
+    if direction not in ('n', 'p') or len(values) != size or not isinstance(page, int):
+        return None
+    return direction == 'n', values, max(1, page)
+
+
+# --- Sorgu -------------------------------------------------------------------
+
+def _nullable(column):
+    return getattr(getattr(column, 'expression', column), 'nullable', True)
+
+
+def _beyond(column, value, smaller):
+    """Rows strictly past ``value`` on this column; NULL sorts lowest."""
+    if value is None:
+        return false() if smaller else column.isnot(None)
+    # Bağlı parametre: Boolean sütunlar True/False ile < / > karşılaştırmasına izin vermez
+    bound = literal(value, getattr(column, 'type', None))
+    condition = column < bound if smaller else column > bound
+    if smaller and _nullable(column):
+        condition = or_(condition, column.is_(None))
+    return condition
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def seek_condition(keys, values, smaller):
+    """Lexicographic ``(k1, k2, ...) < / > (v1, v2, ...)`` written portably."""
+    clauses = []
+    for i, (column, value) in enumerate(zip(keys, values)):
+        ties = [_equal(c, v) for c, v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*ties, _beyond(column, value, smaller)))
+    return or_(*clauses)
+
+
+def _key(item, keys):
+    return [getattr(item, column.key) for column in keys]
+
+
+def approx_count(query, key, timeout=COUNT_TIMEOUT):
+    """``query.count()`` cached under ``key`` for ``timeout`` seconds."""
+    cache_key = 'keyset-count:' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+    total = cache.get(cache_key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(cache_key, total, timeout=timeout)
+    return total
+
+
+def paginate(query, keys, cursor=None, per_page=PER_PAGE, descending=True, count_key=None, count_query=None):
+    """Page ``query`` (an unordered ``Model.query``) by the columns in ``keys``.
+
+    ``keys`` is the list order, most significant first, ending in a unique column;
+    ``descending`` applies to all of them. ``count_query`` overrides the query used
+    for the cached total (e.g. one without eager loads).
+    """
+    state = decode_cursor(cursor, len(keys))
+    forward, values, page = state if state else (True, None, 1)
+    smaller = forward == descending
+
+    page_query = query
+    if values is not None:
+        page_query = query.filter(seek_condition(keys, values, smaller))
+    order = [column.desc() if smaller else column.asc() for column in keys]
+    rows = page_query.order_by(None).order_by(*order).limit(per_page + 1).all()
+    extra = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    has_next = extra if forward else True
+    has_prev = values is not None if forward else extra
+    next_cursor = encode_cursor(True, _key(rows[-1], keys), page + 1) if has_next and rows else None
+    prev_cursor = encode_cursor(False, _key(rows[0], keys), max(1, page - 1)) if has_prev and rows else None
+
+    if count_key is not None:
+        total = approx_count(count_query if count_query is not None else query, count_key)
+    else:
+        total = None
+    return KeysetPage(rows, per_page, page, next_cursor, prev_cursor, total)
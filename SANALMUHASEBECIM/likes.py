@@ -0,0 +1,106 @@
+"""Yazı ve yorum beğenileri: benzersiz kısıt üzerine tek yazımlı toggle.
+
+``like (user_id, post_id)`` ve ``comment_like (user_id, comment_id)`` benzersiz
+indeksleri aynı beğeninin iki kez yazılmasını veritabanı düzeyinde engeller.
+Toggle önce okumadan koşullu bir ``DELETE`` çalıştırır; satır silindiyse beğeni
+kaldırılmıştır. Silinecek satır yoksa çakışmada hiçbir şey yapmayan bir
+``INSERT`` çalışır (SQLite/PostgreSQL: ``ON CONFLICT DO NOTHING``; MSSQL:
+``INSERT ... SELECT ... WHERE NOT EXISTS`` bir savepoint içinde, yarışta
+benzersiz indeks hatası yutulur).
+
+Sayaç (``counters.bump``) yalnızca bir satır gerçekten eklenip silindiğinde,
+aynı transaction içinde atomik ``UPDATE`` ile değişir; eşzamanlı çift
+tıklamalar yinelenen satır üretmez ve sayaçları şişirmez. Core yazımları
+mapper olaylarını tetiklemediği için ``blog`` sayfa cache'i
+``pagecache.mark_dirty`` ile commit sonrası ayrıca geçersiz kılınır.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, delete, exists, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+
+from SANALMUHASEBECIM.counters import bump, last_count
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Comment, CommentLike, Like, Post
+from SANALMUHASEBECIM.pagecache import mark_dirty
+
+# Beğenilen model -> (beğeni modeli, yabancı anahtar sütunu)
+TARGETS = {
+    Post: (Like, 'post_id'),
+    Comment: (CommentLike, 'comment_id'),
+}
+
+
+def _match(table, fk, user_id, target_id):
+    return and_(table.c.user_id == user_id, table.c[fk] == target_id)
+
+
+def _insert_ignore(like_model, fk, user_id, target_id):
+    """Insert the like unless it exists; returns the number of rows written (0 or 1)."""
+    table = like_model.__table__
+    values = {'user_id': user_id, fk: target_id}
+    if 'date' in table.c:
+        values['date'] = datetime.utcnow()
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(values).on_conflict_do_nothing()
+        return db.session.execute(stmt).rowcount
+    rows = select(*[literal(value, table.c[key].type) for key, value in values.items()]).where(
+        ~exists().where(_match(table, fk, user_id, target_id))
+    )
+    try:
+        with db.session.begin_nested():
+            return db.session.execute(insert(table).from_select(list(values), rows)).rowcount
+    except IntegrityError:
+        # Eşzamanlı bir istek aynı beğeniyi az önce yazdı
+        return 0
+
+
+def _delete(like_model, fk, user_id, target_id):
+    table = like_model.__table__
+    return db.session.execute(delete(table).where(_match(table, fk, user_id, target_id))).rowcount
+
+
+def like(model, target_id, user_id):
+    """Idempotently like ``model`` #``target_id``; returns True if a row was written."""
+    like_model, fk = TARGETS[model]
+    written = _insert_ignore(like_model, fk, user_id, target_id) == 1
+    if written:
+        bump(model, target_id, 1)
+        mark_dirty(model)
+    return written
+
+
+def unlike(model, target_id, user_id):
+    """Idempotently remove the like; returns True if a row was deleted."""
+    like_model, fk = TARGETS[model]
+    removed = _delete(like_model, fk, user_id, target_id) == 1
+    if removed:
+        bump(model, target_id, -1)
+        mark_dirty(model)
+    return removed
+
+
+def toggle(model, target_id, user_id):
+    """Flip the like state; returns ``(liked, like_count)``. The caller commits."""
+    if unlike(model, target_id, user_id):
+        liked = False
+    else:
+        like(model, target_id, user_id)
+        liked = True
+    return liked, last_count(model, target_id)
+
+
+def remove_duplicates():
+    """Delete duplicate like rows (keeping the oldest) before the unique indexes are added."""
+    removed = 0
+    for like_model, fk in TARGETS.values():
+        table = like_model.__table__
+        keep = select(db.func.min(table.c.id)).group_by(table.c.user_id, table.c[fk])
+        removed += db.session.execute(delete(table).where(table.c.id.notin_(keep))).rowcount
+    db.session.commit()
+    return removed
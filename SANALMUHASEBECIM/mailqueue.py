@@ -0,0 +1,368 @@
+"""Kalıcı giden e-posta kuyruğu.
+
+``send_email`` mesajı ``outbound_email`` tablosuna yazar ve hemen döner. Sınırlı
+sayıda worker thread'i kuyruğu boşaltır: her worker ``mail.connect()`` ile tek
+bir SMTP bağlantısı açıp bir partideki tüm mesajları onun üzerinden gönderir.
+Hatalı gönderimler üstel bekleme ile yeniden denenir, deneme sınırı aşılınca
+mesaj ``dead`` durumuna alınır. Gönderim hızı süreç genelinde sınırlandırılır.
+
+``enqueue_email`` çağıranın transaction'ını commit etmez: çağıranın
+commit edilmemiş yazımları varsa satır o transaction'a katılır (commit ile
+birlikte kalıcı olur, rollback'te gönderilmez); yoksa kendi oturumunda hemen
+commit edilir. Worker'lar commit sonrası uyandırılır.
+
+Web sürecinden bağımsız çalıştırmak için::
+
+    flask mail-queue run      # worker havuzunu ön planda çalıştırır
+    flask mail-queue drain    # kuyruğu bir kez boşaltır
+    flask mail-queue retry-dead
+"""
+import base64
+import json
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.orm import Session
+
+from SANALMUHASEBECIM.extensions import db, mail
+from SANALMUHASEBECIM.models import OutboundEmail
+
+# SMTP bağlantısının kendisiyle ilgili hatalar: partinin kalanı bırakılır ve yeniden bağlanılır
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+_pool_lock = threading.Lock()
+_pool = None
+_rate_limiter_lock = threading.Lock()
+_rate_limiter = None
+
+# session.info anahtarları: commit edilmemiş yazım var mı / commit sonrası worker uyandırılsın mı
+_WRITES_KEY = 'mailqueue_uncommitted_writes'
+_WAKE_KEY = 'mailqueue_wake'
+
+
+class RateLimiter:
+    """Simple token bucket shared by all workers of the process."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def process_rate_limiter(app=None):
+    """The one ``RateLimiter`` of this process (queue workers and drain)."""
+    global _rate_limiter
+    app = app or current_app._get_current_object()
+    # start_workers _pool_lock'u tutarken çağırır; ayrı kilit
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(app.config.get('MAIL_QUEUE_RATE_PER_MINUTE', 120))
+    return _rate_limiter
+
+
+def enqueue_email(subject, recipients, text_body=None, html_body=None, attachments=None,
+                  reply_to=None, cc=None, bcc=None, commit=True):
+    """Persist an outgoing message and wake the worker pool.
+
+    ``commit=False`` always joins the caller's transaction (e.g. billing runs).
+    """
+    payload = {
+        'text_body': text_body,
+        'html_body': html_body,
+        'reply_to': reply_to,
+        'cc': cc,
+        'bcc': bcc,
+        'attachments': [
+            {
+                'filename': a.get('filename'),
+                'content_type': a.get('content_type', 'application/octet-stream'),
+                'content_b64': base64.b64encode(a.get('content') or b'').decode('ascii'),
+            }
+            for a in (attachments or [])
+        ],
+    }
+    row = OutboundEmail(
+        subject=subject,
+        recipients=json.dumps(list(recipients or [])),
+        payload_json=json.dumps(payload, ensure_ascii=False),
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    if commit and not _has_uncommitted_writes(db.session):
+        # Çağıranın bekleyen işi yok: satır kendi transaction'ında yazılır
+        with Session(db.engine, expire_on_commit=False) as own:
+            own.add(row)
+            own.commit()
+        wake_workers()
+    else:
+        db.session.add(row)
+        db.session.info[_WAKE_KEY] = True
+    return row
+
+
+def _has_uncommitted_writes(session_):
+    return bool(session_.new or session_.dirty or session_.deleted or session_.info.get(_WRITES_KEY))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _note_flush(session_, flush_context):
+    session_.info[_WRITES_KEY] = True
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _note_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WRITES_KEY] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _wake_after_commit(session_):
+    session_.info.pop(_WRITES_KEY, None)
+    if session_.info.pop(_WAKE_KEY, None):
+        try:
+            wake_workers()
+        except Exception as e:
+            current_app.logger.warning(f"Mail queue wake-up failed: {e}")
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_writes(session_):
+    session_.info.pop(_WRITES_KEY, None)
+    session_.info.pop(_WAKE_KEY, None)
+
+
+def _build_message(row):
+    from SANALMUHASEBECIM.utils import create_multipart_email
+    payload = json.loads(row.payload_json)
+    attachments = [
+        {
+            'filename': a['filename'],
+            'content_type': a['content_type'],
+            'content': base64.b64decode(a['content_b64']),
+        }
+        for a in payload.get('attachments') or []
+    ]
+    return create_multipart_email(
+        subject=row.subject,
+        recipients=json.loads(row.recipients),
+        html_content=payload.get('html_body') or '',
+        text_content=payload.get('text_body'),
+        attachments=attachments or None,
+        reply_to=payload.get('reply_to'),
+        cc=payload.get('cc'),
+        bcc=payload.get('bcc'),
+    )
+
+
+def claim_batch(worker_id, limit):
+    """Atomically claim up to ``limit`` due messages for a worker.
+
+    Satırlar koşullu UPDATE ile sahiplenildiği için birden fazla süreç aynı
+    kuyruğu güvenle boşaltabilir. Takılı kalmış ``sending`` satırları
+    (ör. worker çöktü) ``MAIL_QUEUE_CLAIM_TIMEOUT`` sonrası yeniden alınır.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config.get('MAIL_QUEUE_CLAIM_TIMEOUT', 600))
+    due = or_(
+        (OutboundEmail.status == 'pending') & (OutboundEmail.next_attempt_at <= now),
+        (OutboundEmail.status == 'sending') & (OutboundEmail.claimed_at < stale),
+    )
+    ids = db.session.execute(
+        select(OutboundEmail.id).where(due).order_by(OutboundEmail.next_attempt_at, OutboundEmail.id).limit(limit)
+    ).scalars().all()
+    if not ids:
+        db.session.rollback()
+        return []
+    db.session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.id.in_(ids), due)
+        .values(status='sending', claimed_by=worker_id, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return OutboundEmail.query.filter_by(claimed_by=worker_id, status='sending').order_by(OutboundEmail.id).all()
+
+
+def _record_failure(row, error):
+    cfg = current_app.config
+    row.attempts = (row.attempts or 0) + 1
+    row.last_error = str(error)[:2000]
+    row.claimed_by = None
+    row.claimed_at = None
+    if row.attempts >= cfg.get('MAIL_QUEUE_MAX_ATTEMPTS', 6):
+        row.status = 'dead'
+        current_app.logger.error(f"Outbound email #{row.id} dead-lettered after {row.attempts} attempts: {error}")
+    else:
+        delay = min(cfg.get('MAIL_QUEUE_RETRY_BASE_SECONDS', 30) * (2 ** (row.attempts - 1)), 3600)
+        row.status = 'pending'
+        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+
+def _release(rows):
+    for row in rows:
+        row.status = 'pending'
+        row.claimed_by = None
+        row.claimed_at = None
+
+
+def process_batch(worker_id, rate_limiter):
+    """Claim one batch and send it over a single SMTP connection.
+
+    Returns ``(claimed, sent)``.
+    """
+    rows = claim_batch(worker_id, current_app.config.get('MAIL_QUEUE_BATCH_SIZE', 50))
+    if not rows:
+        return 0, 0
+    sent = 0
+    try:
+        with mail.connect() as conn:
+            for index, row in enumerate(rows):
+                rate_limiter.acquire()
+                try:
+                    conn.send(_build_message(row))
+                except _CONNECTION_ERRORS as e:
+                    _record_failure(row, e)
+                    _release(rows[index + 1:])
+                    break
+                except Exception as e:
+                    _record_failure(row, e)
+                else:
+                    row.status = 'sent'
+                    row.sent_at = datetime.utcnow()
+                    row.claimed_by = None
+                    row.claimed_at = None
+                    row.last_error = None
+                    sent += 1
+                db.session.commit()
+            db.session.commit()
+    except Exception as e:
+        # Bağlantı açılamadı: partide henüz gönderilmemiş her mesaj bir deneme harcar
+        db.session.rollback()
+        for row in rows:
+            if row.status == 'sending':
+                _record_failure(row, e)
+        db.session.commit()
+    return len(rows), sent
+
+
+def drain(max_batches=None):
+    """Send everything currently due in the calling thread. Returns sent count."""
+    limiter = process_rate_limiter()
+    worker_id = f"drain-{uuid.uuid4().hex[:12]}"
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        claimed, sent = process_batch(worker_id, limiter)
+        if not claimed:
+            break
+        total += sent
+        batches += 1
+    return total
+
+
+class WorkerPool:
+    """Bounded pool of daemon threads draining the queue."""
+
+    def __init__(self, app, size):
+        self.app = app
+        self.size = max(1, size)
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.rate_limiter = process_rate_limiter(app)
+        self.threads = []
+
+    def start(self):
+        for i in range(self.size):
+            t = threading.Thread(target=self._run, name=f"mailqueue-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def _run(self):
+        worker_id = f"{uuid.uuid4().hex[:12]}-{threading.current_thread().name}"
+        poll = self.app.config.get('MAIL_QUEUE_POLL_SECONDS', 15)
+        while not self.stop.is_set():
+            with self.app.app_context():
+                try:
+                    claimed, _ = process_batch(worker_id, self.rate_limiter)
+                except Exception as e:
+                    claimed = 0
+                    db.session.rollback()
+                    self.app.logger.error(f"Mail queue worker error: {e}")
+                finally:
+                    db.session.remove()
+            if not claimed:
+                self.wake.wait(poll)
+                self.wake.clear()
+
+
+def start_workers(app=None):
+    """Start the in-process worker pool once per process."""
+    global _pool
+    app = app or current_app._get_current_object()
+    if not app.config.get('MAIL_QUEUE_INPROCESS', True):
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(app, app.config.get('MAIL_QUEUE_WORKERS', 2))
+            _pool.start()
+    return _pool
+
+
+def wake_workers():
+    pool = start_workers()
+    if pool is not None:
+        pool.wake.set()
+
+
+mail_queue_cli = AppGroup('mail-queue', help='Outbound email queue commands.')
+
+
+@mail_queue_cli.command('run')
+@click.option('--workers', type=int, default=None, help='Worker thread count.')
+def run_command(workers):
+    """Run the worker pool in the foreground."""
+    app = current_app._get_current_object()
+    pool = WorkerPool(app, workers or app.config.get('MAIL_QUEUE_WORKERS', 2))
+    pool.start()
+    click.echo(f"Mail queue: {pool.size} worker(s) running. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop.set()
+        pool.wake.set()
+
+
+@mail_queue_cli.command('drain')
+def drain_command():
+    """Send all due messages once and exit."""
+    click.echo(f"Sent: {drain()}")
+
+
+@mail_queue_cli.command('retry-dead')
+def retry_dead_command():
+    """Move dead-lettered messages back to the queue."""
+    count = OutboundEmail.query.filter_by(status='dead').update(
+        {'status': 'pending', 'attempts': 0, 'next_attempt_at': datetime.utcnow()},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    click.echo(f"Requeued: {count}")
@@ -0,0 +1,189 @@
+"""İçerik adresli medya deposu.
+
+Yüklenen dosya parça parça geçici dosyaya yazılırken SHA-256 özeti hesaplanır;
+dosya özetine göre ``UPLOAD_FOLDER/media/ab/cd/<sha256><uzantı>`` yoluna taşınır.
+Aynı içerik ikinci kez yüklendiğinde diske yeniden yazılmaz, yeni ``Media``
+satırı mevcut dosyayı gösterir. Orijinal dosya adı yalnızca ``Media.file_name``
+olarak saklanır; iki kullanıcının ``fatura.pdf`` dosyaları birbirini ezmez.
+
+Resimler için genişlik/yükseklik doldurulur ve Pillow kuruluysa aynı dizine
+WebP türevleri üretilir:
+
+* ``thumb``: uzun kenarı 320px (avatar, liste görselleri),
+* ``webp``: uzun kenarı en fazla 1600px.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+
+from flask import current_app, url_for
+from werkzeug.utils import secure_filename
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Media
+
+CHUNK_SIZE = 64 * 1024
+MEDIA_DIR = 'media'
+IMAGE_MIMES = {'image/png', 'image/jpeg', 'image/gif', 'image/webp'}
+DERIVATIVES = {'thumb': 320, 'webp': 1600}
+WEBP_QUALITY = 82
+
+
+def media_root():
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], MEDIA_DIR)
+
+
+def blob_path(digest, ext=''):
+    """Two-level sharding keeps every directory small (65536 leaf directories)."""
+    return os.path.join(media_root(), digest[:2], digest[2:4], digest + ext)
+
+
+def derivative_path(digest, name):
+    return blob_path(digest, f'.{name}.webp')
+
+
+def public_url(path):
+    rel_path = os.path.relpath(path, os.path.join(current_app.root_path, 'static'))
+    return url_for('static', filename=rel_path.replace('\\', '/'))
+
+
+def _extension(filename):
+    name = secure_filename(filename or '')
+    return '.' + name.rsplit('.', 1)[1].lower() if '.' in name else ''
+
+
+def _stream_to_temp(stream, directory):
+    """Copy ``stream`` into a temp file in ``directory``; return (path, sha256, size)."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(prefix='.upload-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), size
+
+
+# --- Resim boyutları ----------------------------------------------------------
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        # SOF0..SOF15 (DHT/JPG/DAC hariç)
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>xHH', f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def image_size(path):
+    """Read (width, height) from the file header without decoding pixels."""
+    with open(path, 'rb') as f:
+        head = f.read(30)
+        if head[:8] == b'\x89PNG\r\n\x1a\n':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:2] == b'\xff\xd8':
+            return _jpeg_size(f)
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            kind = head[12:16]
+            if kind == b'VP8X':
+                return 1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little')
+            if kind == b'VP8 ':
+                w, h = struct.unpack('<HH', head[26:30])
+                return w & 0x3FFF, h & 0x3FFF
+            if kind == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return None
+
+
+def _make_derivatives(digest, source):
+    """Write WebP derivatives next to the blob; returns the names created."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return []
+    created = []
+    try:
+        with Image.open(source) as im:
+            im = ImageOps.exif_transpose(im)
+            if im.mode not in ('RGB', 'RGBA'):
+                im = im.convert('RGBA' if 'transparency' in im.info or im.mode in ('LA', 'P') else 'RGB')
+            for name, max_side in DERIVATIVES.items():
+                target = derivative_path(digest, name)
+                if not os.path.exists(target):
+                    copy = im.copy()
+                    copy.thumbnail((max_side, max_side), Image.LANCZOS)
+                    tmp_path = target + '.tmp'
+                    copy.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+                    os.replace(tmp_path, target)
+                created.append(name)
+    except Exception as e:
+        current_app.logger.warning(f"Image derivatives failed for {digest}: {e}")
+    return created
+
+
+def store_upload(file, user_id=None, file_name=None, commit=True):
+    """Stream a werkzeug ``FileStorage`` into the store and return its ``Media`` row.
+
+    Aynı içeriğe sahip bir dosya zaten varsa diske yazılmaz; boyut, resim
+    ölçüleri ve türevler mevcut kayıttan alınır.
+    """
+    file_name = secure_filename(file_name or file.filename or '') or 'file'
+    ext = _extension(file.filename or file_name)
+    root = media_root()
+    os.makedirs(root, exist_ok=True)
+    tmp_path, digest, size = _stream_to_temp(file.stream, root)
+
+    existing = Media.query.filter_by(sha256=digest).order_by(Media.id).first()
+    path = blob_path(digest, ext)
+    if existing is not None:
+        os.unlink(tmp_path)
+        path = blob_path(digest, os.path.splitext(existing.url)[1])
+        width, height, variants = existing.width, existing.height, existing.variants
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        width = height = None
+        variants = None
+        if (file.mimetype or '') in IMAGE_MIMES:
+            dims = image_size(path)
+            if dims:
+                width, height = dims
+            variants = ','.join(_make_derivatives(digest, path)) or None
+
+    media = Media(
+        file_name=file_name,
+        url=public_url(path),
+        mime=file.mimetype,
+        size=size,
+        width=width,
+        height=height,
+        sha256=digest,
+        variants=variants,
+        user_id=user_id,
+    )
+    db.session.add(media)
+    if commit:
+        db.session.commit()
+    return media
@@ -1,5 +1,5 @@
 from SANALMUHASEBECIM.extensions import db, login_manager
-from sqlalchemy import Index
+from sqlalchemy import Index, text
 from datetime import datetime, timedelta
 from flask_login import UserMixin
 import secrets
@@ -35,6 +35,12 @@ class User(db.Model, UserMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     seen_notifications = db.Column(db.Text)  # JSON: which notifications user has seen
+    search_text = db.Column(db.Unicode(255), index=True)  # Katlanmış ad + e-posta (adminsearch)
+
+    __table_args__ = (
+        # Admin listesi keyset sayfalama: (created_at, id); id indekste örtük olarak bulunur
+        Index('ix_user_created', 'created_at'),
+    )
 
     # İlişkiler
     comments = db.relationship('Comment', backref='author', lazy=True)
@@ -151,9 +157,26 @@ class Media(db.Model):
     size = db.Column(db.Integer)  # bytes
     width = db.Column(db.Integer)
     height = db.Column(db.Integer)
+    sha256 = db.Column(db.String(64), index=True)  # İçerik özeti (media.store_upload)
+    variants = db.Column(db.String(100))  # Üretilen türevler: "thumb,webp"
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
 
+    __table_args__ = (
+        # Kullanıcının yüklemeleri, en yeni önce
+        Index('ix_media_user_created', 'user_id', 'created_at'),
+    )
+
+    def variant_url(self, name):
+        """URL of a derivative (``thumb``/``webp``); falls back to the original file."""
+        if self.sha256 and name in (self.variants or '').split(','):
+            return f"{self.url.rsplit('/', 1)[0]}/{self.sha256}.{name}.webp"
+        return self.url
+
+    @property
+    def thumb_url(self):
+        return self.variant_url('thumb')
+
 class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
@@ -172,6 +195,10 @@ class Post(db.Model):
     is_featured = db.Column(db.Boolean, nullable=False, default=False)
     featured_order = db.Column(db.Integer)  # küçükten büyüğe sıralanır
 
+    # Denormalize sayaçlar - counters modülü tarafından atomik olarak güncellenir
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     cover_id = db.Column(db.Integer, db.ForeignKey('media.id'))
     cover = db.relationship('Media', lazy=True)
 
@@ -182,6 +209,13 @@ class Post(db.Model):
 
     tags = db.relationship('Tag', secondary=post_tag, lazy='subquery', backref=db.backref('posts', lazy=True))
 
+    __table_args__ = (
+        # Popüler yazılar: is_active filtresi + like_count sıralaması
+        Index('ix_post_popular', 'is_active', 'like_count'),
+        # Blog listesi: yayındaki yazılar published_at sırasıyla
+        Index('ix_post_active_status_published', 'is_active', 'status', 'published_at'),
+    )
+
     def __init__(self, title, subtitle, post_text, user):
         self.title = title
         self.subtitle = subtitle
@@ -206,6 +240,16 @@ class Comment(db.Model):
     replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy=True)
     likes = db.relationship('CommentLike', backref='comment', lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Yazı altındaki onaylı kök yorumlar, tarih sırasıyla
+        Index('ix_comment_post_thread', 'post_id', 'parent_id', 'is_approved', 'date'),
+        # Moderasyon kuyruğu: yalnızca onay bekleyenler (filtreli indeks)
+        Index('ix_comment_pending_date', 'date',
+              mssql_where=text('is_approved = 0'), sqlite_where=text('is_approved = 0')),
+        # Admin yorum listesi keyset sayfalama: (date, id)
+        Index('ix_comment_date', 'date'),
+    )
+
     def __repr__(self):
         return f'Comment by User {self.user_id} on Post {self.post_id}'
 
@@ -217,6 +261,13 @@ class Like(db.Model):
     # İlişkiler
     user = db.relationship('User', backref='post_likes', lazy=True)
 
+    __table_args__ = (
+        # Yazı başına beğeniler; user_id ile sayım/üyelik indeksten karşılanır
+        Index('ix_like_post_user', 'post_id', 'user_id'),
+        # Kullanıcı başına tek beğeni (likes.toggle bu kısıta dayanır)
+        Index('uq_like_user_post', 'user_id', 'post_id', unique=True),
+    )
+
     def __repr__(self):
         return f'Like by User {self.user_id} on Post {self.post_id}'
 
@@ -229,6 +280,11 @@ class CommentLike(db.Model):
     # İlişkiler
     user = db.relationship('User', backref='comment_likes', lazy=True)
 
+    __table_args__ = (
+        # Kullanıcı başına tek beğeni (likes.toggle bu kısıta dayanır)
+        Index('uq_comment_like_user_comment', 'user_id', 'comment_id', unique=True),
+    )
+
     def __repr__(self):
         return f'CommentLike by User {self.user_id} on Comment {self.comment_id}'
 
@@ -253,6 +309,17 @@ class Appointment(db.Model):
     platform = db.Column(db.String(20))  # meet|zoom|teams
     payment_status = db.Column(db.String(20), default='none')  # none|awaiting|paid
     price_amount = db.Column(db.Numeric(10, 2))
+    search_text = db.Column(db.Unicode(255), index=True)  # Katlanmış e-posta (adminsearch)
+
+    __table_args__ = (
+        # Admin listesi ve dolu dilimler: durum filtresi + tarih sırası
+        Index('ix_appointments_status_datetime', 'status', 'appointment_datetime'),
+        # Kullanıcının randevuları; misafir randevuları (user_id NULL) indekse girmez
+        Index('ix_appointments_user_datetime', 'user_id', 'appointment_datetime',
+              mssql_where=text('user_id IS NOT NULL'), sqlite_where=text('user_id IS NOT NULL')),
+        # Filtresiz admin listesi keyset sayfalama: (appointment_datetime, id)
+        Index('ix_appointments_datetime', 'appointment_datetime'),
+    )
 
     def __init__(self, email, appointment_datetime, purpose=None, user=None, notes=None, status='pending', service_request_id=None):
         self.email = email
@@ -266,6 +333,15 @@ class Appointment(db.Model):
     def __repr__(self):
         return f'Appointment({self.email}, {self.appointment_datetime})'
 
+class SlotReservation(db.Model):
+    """Dolu randevu dilimi - (personel, başlangıç) birincil anahtarı çift rezervasyonu engeller (bkz. slots)"""
+    __tablename__ = 'slot_reservation'
+
+    staff_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0: atanmamış/varsayılan danışman
+    starts_at = db.Column(db.DateTime, primary_key=True)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('Appointments.id', ondelete='CASCADE'), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Ticket(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -277,6 +353,7 @@ class Ticket(db.Model):
     completed_at = db.Column(db.DateTime)  # Tamamlanma tarihi
     completed_by = db.Column(db.Integer, db.ForeignKey('user.id'))  # Kim tamamladı
     assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'))  # Atanan yetkili
+    search_text = db.Column(db.Unicode(255), index=True)  # Katlanmış konu (adminsearch)
     messages = db.relationship('TicketMessage', backref='ticket', lazy=True, cascade='all, delete-orphan')
     
     # İlişkiler
@@ -284,6 +361,15 @@ class Ticket(db.Model):
     assignee = db.relationship('User', foreign_keys=[assigned_to])
     completer = db.relationship('User', foreign_keys=[completed_by])
 
+    __table_args__ = (
+        # Kullanıcının açık ticket'ları (helpdesk, okunmamış sayaçları)
+        Index('ix_ticket_user_status', 'user_id', 'status'),
+        # Admin listesi: durum filtresi + en yeni önce
+        Index('ix_ticket_status_created', 'status', 'created_at'),
+        # Filtresiz admin listesi keyset sayfalama: (created_at, id)
+        Index('ix_ticket_created', 'created_at'),
+    )
+
 class TicketMessage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer, db.ForeignKey('ticket.id'), nullable=False)
@@ -299,6 +385,11 @@ class TicketMessage(db.Model):
     # İlişkiler
     author = db.relationship('User', foreign_keys=[user_id])
 
+    __table_args__ = (
+        # Ticket akışı ve okunmamış sayımı: ticket_id eşitliği + created_at aralığı, user_id kapsanır
+        Index('ix_ticket_message_ticket_created', 'ticket_id', 'created_at', 'user_id'),
+    )
+
 class Service(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
@@ -328,6 +419,12 @@ class Subscriber(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_notified_at = db.Column(db.DateTime)
+    search_text = db.Column(db.Unicode(255), index=True)  # Katlanmış e-posta (adminsearch)
+
+    __table_args__ = (
+        # Admin abone listesi keyset sayfalama: (created_at, id)
+        Index('ix_subscriber_created', 'created_at'),
+    )
 
 class MonthlyPayment(db.Model):
     """Aylık ödeme modeli - Aylık müşterilerin ödemelerini takip etmek için"""
@@ -336,16 +433,72 @@ class MonthlyPayment(db.Model):
     lead = db.relationship('Lead', backref='monthly_payments')
     payment_month = db.Column(db.Date, nullable=False)  # Hangi ay için ödeme (YYYY-MM-01)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, paid, confirmed, overdue
+    status = db.Column(db.String(20), default='pending')  # due (faturalandı), pending (müşteri bildirdi), paid, confirmed, overdue
     payment_date = db.Column(db.Date)  # Kullanıcının ödeme yaptığı tarih
     confirmation_date = db.Column(db.DateTime)  # Admin'in onayladığı tarih
     next_payment_date = db.Column(db.Date)  # Bir sonraki ödeme tarihi
+    reminder_level = db.Column(db.SmallInteger, nullable=False, default=0, server_default='0')  # 0 yok, 1 yaklaşan, 2 gecikmiş (bkz. billing)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('uq_monthly_payment_lead_month', 'lead_id', 'payment_month', unique=True),
+        Index('ix_monthly_payment_status_month', 'status', 'payment_month'),
+    )
     
     def __repr__(self):
         return f'MonthlyPayment(lead_id={self.lead_id}, month={self.payment_month}, status={self.status})'
 
+class NewsletterDelivery(db.Model):
+    """Bülten gönderim kaydı - yazı başına her aboneye bir kez kuyruğa alınır (bkz. newsletter)"""
+    __tablename__ = 'newsletter_delivery'
+
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), nullable=False)
+    subscriber_id = db.Column(db.Integer, db.ForeignKey('subscriber.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Aynı yazı aynı aboneye iki kez kuyruğa alınmaz; eşzamanlı iki gönderimi de engeller
+        Index('uq_newsletter_delivery_post_subscriber', 'post_id', 'subscriber_id', unique=True),
+    )
+
+class OutboundEmail(db.Model):
+    """Giden e-posta kuyruğu - mailqueue worker'ları tarafından gönderilir"""
+    __tablename__ = 'outbound_email'
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.Unicode(300), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)  # JSON liste
+    payload_json = db.Column(db.Text, nullable=False)  # text/html gövde, cc, bcc, reply_to, ekler
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending|sending|sent|dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = db.Column(db.String(64))
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        Index('ix_outbound_email_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'OutboundEmail(id={self.id}, status={self.status}, attempts={self.attempts})'
+
+class SearchToken(db.Model):
+    """Admin araması için trigram indeksi - adminsearch tarafından yazılır"""
+    __tablename__ = 'search_token'
+
+    entity = db.Column(db.String(20), primary_key=True)
+    token = db.Column(db.Unicode(3), primary_key=True)
+    entity_id = db.Column(db.Integer, primary_key=True)
+
+    __table_args__ = (
+        Index('ix_search_token_entity_id', 'entity', 'entity_id'),
+    )
+
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
@@ -411,6 +564,13 @@ class Lead(db.Model):
     payments = db.relationship('Payment', backref='lead', lazy=True)
     customer_services = db.relationship('CustomerService', backref='lead', lazy=True)
 
+    __table_args__ = (
+        # Faturalama çalıştırması ve müşteri hizmet listesi
+        Index('ix_lead_type_status_next_payment', 'lead_type', 'status', 'next_payment_date'),
+        # Admin lead listesi keyset sayfalama: (created_at, id)
+        Index('ix_lead_created', 'created_at'),
+    )
+
 class Payment(db.Model):
     """Ödeme modeli"""
     id = db.Column(db.Integer, primary_key=True)
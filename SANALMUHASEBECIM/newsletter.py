@@ -0,0 +1,135 @@
+"""Yeni blog yazısı bülteni.
+
+``dispatch_new_post`` HTTP isteğinden hemen döner; bülten arka plandaki bir
+thread'de ``outbound_email`` kuyruğuna yazılır, gönderim, yeniden deneme ve
+hız sınırı ``mailqueue`` worker'larına kalır. Aboneler id üzerinden keyset
+pagination ile sayfa sayfa okunur, şablon yazı başına bir kez render edilir.
+
+İlerleme yazı başına ``newsletter_delivery`` tablosunda tutulur: bir sayfanın
+e-postaları ve gönderim kayıtları aynı transaction'da yazılır, kaydı olan
+abone atlanır. Yarıda kalan bir gönderim ``flask newsletter send <post_id>``
+ile kaldığı yerden sürdürülebilir; farklı yazıların gönderimleri birbirini
+etkilemez, aynı yazı için eşzamanlı iki çalıştırmayı benzersiz
+(post_id, subscriber_id) indeksi durdurur.
+"""
+import queue
+import threading
+from datetime import datetime
+
+import click
+from flask import current_app, url_for
+from flask.cli import AppGroup
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.mailqueue import enqueue_email
+from SANALMUHASEBECIM.models import NewsletterDelivery, Post, Subscriber
+
+PAGE_SIZE = 500
+
+_jobs = queue.Queue()
+_runner_lock = threading.Lock()
+_runner = None
+
+
+def render_post_email(post):
+    """Render subject, html and text bodies of the newsletter once for a post."""
+    from SANALMUHASEBECIM.emails import render_email
+    base_url = current_app.config.get('BASE_URL') or 'http://127.0.0.1:5000'
+    with current_app.test_request_context(base_url=base_url):
+        post_url = url_for('blog.post_detail', slug=post.slug, _external=True)
+    html_body, text_body = render_email('new_post', post=post, post_url=post_url)
+    return f"Yeni Yazı: {post.title}", html_body, text_body
+
+
+def _pending_page(post_id, after_id):
+    delivered = exists().where(
+        NewsletterDelivery.post_id == post_id,
+        NewsletterDelivery.subscriber_id == Subscriber.id,
+    )
+    return db.session.execute(
+        select(Subscriber.id, Subscriber.email)
+        .where(Subscriber.is_active == True, Subscriber.id > after_id, ~delivered)
+        .order_by(Subscriber.id)
+        .limit(PAGE_SIZE)
+    ).all()
+
+
+def send_post_newsletter(post_id):
+    """Queue the newsletter of a post for every subscriber without a delivery record. Returns queued count."""
+    post = db.session.get(Post, post_id)
+    if not post or not post.slug:
+        return 0
+    subject, html_body, text_body = render_post_email(post)
+    queued = 0
+    last_id = 0
+    retried = False
+    while True:
+        page = _pending_page(post_id, last_id)
+        if not page:
+            return queued
+        now = datetime.utcnow()
+        recipients = [(sub_id, email) for sub_id, email in page if email]
+        for sub_id, email in recipients:
+            enqueue_email(subject=subject, recipients=[email], text_body=text_body, html_body=html_body, commit=False)
+        db.session.execute(
+            insert(NewsletterDelivery),
+            [{'post_id': post_id, 'subscriber_id': sub_id, 'created_at': now} for sub_id, _ in page],
+        )
+        if recipients:
+            db.session.execute(
+                update(Subscriber)
+                .where(Subscriber.id.in_([sub_id for sub_id, _ in recipients]))
+                .values(last_notified_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Aynı yazı başka bir çalıştırma tarafından gönderiliyor; sayfa onun
+            # kayıtları hariç tutularak bir kez yeniden okunur
+            db.session.rollback()
+            if retried:
+                raise
+            retried = True
+            continue
+        retried = False
+        last_id = page[-1].id
+        queued += len(recipients)
+
+
+def _run_jobs(app):
+    while True:
+        post_id = _jobs.get()
+        with app.app_context():
+            try:
+                queued = send_post_newsletter(post_id)
+                app.logger.info(f"Newsletter post={post_id} queued for {queued} subscribers")
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Newsletter post={post_id} failed: {e}")
+            finally:
+                db.session.remove()
+        _jobs.task_done()
+
+
+def dispatch_new_post(post_id):
+    """Queue the newsletter of a post for background delivery and return immediately."""
+    global _runner
+    app = current_app._get_current_object()
+    with _runner_lock:
+        if _runner is None:
+            _runner = threading.Thread(target=_run_jobs, args=(app,), name='newsletter', daemon=True)
+            _runner.start()
+    _jobs.put(post_id)
+
+
+newsletter_cli = AppGroup('newsletter', help='Blog newsletter commands.')
+
+
+@newsletter_cli.command('send')
+@click.argument('post_id', type=int)
+def send_command(post_id):
+    """Queue (or resume) the newsletter of a post in the foreground."""
+    click.echo(f"Queued: {send_post_newsletter(post_id)}")
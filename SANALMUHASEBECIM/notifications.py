@@ -0,0 +1,290 @@
+"""Telegram ve Google Calendar çağrıları için arka plan dağıtıcısı.
+
+İstek handler'ları dış servisleri beklemez: ``notify_telegram`` mesajı bir
+tampona, ``dispatch`` ise işi kuyruğa koyup hemen döner. Tek bir daemon thread:
+
+* kısa bir pencere içinde biriken Telegram mesajlarını tek mesajda birleştirir,
+* havuzlanmış bir ``requests.Session`` ile gönderir, hata/429 durumunda yeniden dener,
+* Calendar servis nesnesini süreç boyunca bir kez oluşturup tekrar kullanır.
+
+``NOTIFY_ASYNC=False`` iken her şey çağıran thread'de senkron çalışır (testler);
+``TELEGRAM_API_BASE`` yerel bir stub sunucuya yönlendirilebilir.
+"""
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+TELEGRAM_MAX_LENGTH = 4096
+CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+_http_lock = threading.Lock()
+_http = None
+_calendar_lock = threading.Lock()
+_calendar = None
+_calendar_source = None
+_dispatcher_lock = threading.Lock()
+_dispatcher = None
+
+
+def http_session() -> requests.Session:
+	"""Process-wide ``requests.Session`` with a keep-alive connection pool."""
+	global _http
+	with _http_lock:
+		if _http is None:
+			session = requests.Session()
+			session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+			session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+			_http = session
+	return _http
+
+
+def _split_message(text: str) -> List[str]:
+	parts = []
+	while len(text) > TELEGRAM_MAX_LENGTH:
+		cut = text.rfind('\n', 0, TELEGRAM_MAX_LENGTH)
+		if cut <= 0:
+			cut = TELEGRAM_MAX_LENGTH
+		parts.append(text[:cut])
+		text = text[cut:].lstrip('\n')
+	if text:
+		parts.append(text)
+	return parts
+
+
+def telegram_configured() -> bool:
+	cfg = current_app.config
+	return bool(cfg.get('TELEGRAM_BOT_TOKEN') and cfg.get('TELEGRAM_CHAT_ID'))
+
+
+def post_telegram(text: str) -> bool:
+	"""Send a message to the configured chat, retrying transient failures."""
+	cfg = current_app.config
+	if not telegram_configured():
+		return False
+	base = (cfg.get('TELEGRAM_API_BASE') or 'https://api.telegram.org').rstrip('/')
+	url = f"{base}/bot{cfg['TELEGRAM_BOT_TOKEN']}/sendMessage"
+	retries = cfg.get('NOTIFY_MAX_RETRIES', 3)
+	ok = True
+	for part in _split_message(text):
+		for attempt in range(retries + 1):
+			delay = 2 ** attempt
+			try:
+				resp = http_session().post(
+					url,
+					json={"chat_id": cfg['TELEGRAM_CHAT_ID'], "text": part, "parse_mode": "HTML"},
+					timeout=cfg.get('NOTIFY_HTTP_TIMEOUT', 10),
+				)
+				if resp.ok:
+					break
+				if resp.status_code == 429:
+					try:
+						delay = resp.json().get('parameters', {}).get('retry_after', delay)
+					except ValueError:
+						pass
+				elif resp.status_code < 500:
+					# 4xx (ör. geçersiz HTML) tekrar denemekle düzelmez
+					current_app.logger.warning(f"Telegram rejected message: {resp.status_code} {resp.text[:200]}")
+					ok = False
+					break
+			except requests.RequestException as e:
+				current_app.logger.warning(f"Telegram request failed (attempt {attempt + 1}): {e}")
+			if attempt < retries:
+				time.sleep(delay)
+		else:
+			ok = False
+	return ok
+
+
+def calendar_service():
+	"""Return the cached Google Calendar client, building it on first use."""
+	global _calendar, _calendar_source
+	path = current_app.config.get('GOOGLE_SERVICE_ACCOUNT_JSON')
+	if not path:
+		return None
+	with _calendar_lock:
+		if _calendar is None or _calendar_source != path:
+			from google.oauth2 import service_account
+			from googleapiclient.discovery import build
+			creds = service_account.Credentials.from_service_account_file(path, scopes=CALENDAR_SCOPES)
+			_calendar = build('calendar', 'v3', credentials=creds, cache_discovery=False)
+			_calendar_source = path
+	return _calendar
+
+
+def reset_calendar_service():
+	global _calendar
+	with _calendar_lock:
+		_calendar = None
+
+
+class NotificationDispatcher:
+	"""Single background worker for outbound integration calls."""
+
+	def __init__(self, app):
+		self.app = app
+		self.jobs = queue.Queue()
+		self._lock = threading.Lock()
+		self._telegram_buffer = []
+		self._telegram_due = None
+		self.thread = threading.Thread(target=self._run, name='notifications', daemon=True)
+
+	def start(self):
+		self.thread.start()
+		return self
+
+	def submit(self, func: Callable, *args, **kwargs):
+		self.jobs.put((func, args, kwargs))
+
+	def telegram(self, text: str):
+		with self._lock:
+			if not self._telegram_buffer:
+				self._telegram_due = time.monotonic() + self.app.config.get('NOTIFY_COALESCE_SECONDS', 1.0)
+			self._telegram_buffer.append(text)
+		# Worker'ı uyandırıp bekleme süresini yeniden hesaplat
+		self.jobs.put(None)
+
+	def _take_due_telegram(self, force=False):
+		with self._lock:
+			if not self._telegram_buffer:
+				return None, None
+			remaining = self._telegram_due - time.monotonic()
+			if remaining > 0 and not force:
+				return None, remaining
+			messages, self._telegram_buffer = self._telegram_buffer, []
+			self._telegram_due = None
+		return '\n\n'.join(messages), None
+
+	def _call(self, func, *args, **kwargs):
+		with self.app.app_context():
+			try:
+				func(*args, **kwargs)
+			except Exception as e:
+				self.app.logger.error(f"Notification job {getattr(func, '__name__', func)} failed: {e}")
+			finally:
+				from SANALMUHASEBECIM.extensions import db
+				db.session.remove()
+
+	def _run(self):
+		while True:
+			text, wait = self._take_due_telegram()
+			if text:
+				self._call(post_telegram, text)
+				continue
+			try:
+				job = self.jobs.get(timeout=wait)
+			except queue.Empty:
+				continue
+			try:
+				if job is not None:
+					func, args, kwargs = job
+					self._call(func, *args, **kwargs)
+			finally:
+				self.jobs.task_done()
+
+	def flush(self, timeout=None):
+		"""Block until queued jobs and buffered Telegram messages are delivered (CLI/tests)."""
+		deadline = None if timeout is None else time.monotonic() + timeout
+		self.jobs.join()
+		text, _ = self._take_due_telegram(force=True)
+		if text:
+			self._call(post_telegram, text)
+		return deadline is None or time.monotonic() <= deadline
+
+
+def get_dispatcher(app=None) -> Optional[NotificationDispatcher]:
+	"""Return the process dispatcher, starting it lazily; None when running synchronously."""
+	global _dispatcher
+	app = app or current_app._get_current_object()
+	if not app.config.get('NOTIFY_ASYNC', True):
+		return None
+	with _dispatcher_lock:
+		if _dispatcher is None:
+			_dispatcher = NotificationDispatcher(app).start()
+	return _dispatcher
+
+
+def notify_telegram(text: str) -> bool:
+	"""Queue a Telegram notification. Returns False when Telegram is not configured."""
+	if not telegram_configured():
+		return False
+	dispatcher = get_dispatcher()
+	if dispatcher is None:
+		return post_telegram(text)
+	dispatcher.telegram(text)
+	return True
+
+
+def dispatch(func: Callable, *args, **kwargs):
+	"""Run ``func`` in the background worker inside an app context."""
+	dispatcher = get_dispatcher()
+	if dispatcher is None:
+		return func(*args, **kwargs)
+	dispatcher.submit(func, *args, **kwargs)
+	return None
+
+
+def insert_calendar_event(summary: str,
+						  description: str,
+						  starts_at: datetime,
+						  ends_at: datetime,
+						  attendees_emails: Optional[List[str]] = None) -> Optional[str]:
+	"""Create an event on the configured calendar and return its htmlLink."""
+	calendar_id = current_app.config.get('GOOGLE_CALENDAR_ID')
+	service = calendar_service()
+	if service is None or not calendar_id:
+		return None
+	event_body = {
+		'summary': summary,
+		'description': description,
+		'start': {'dateTime': starts_at.isoformat(), 'timeZone': 'Europe/Istanbul'},
+		'end': {'dateTime': ends_at.isoformat(), 'timeZone': 'Europe/Istanbul'},
+	}
+	if attendees_emails:
+		event_body['attendees'] = [{'email': e} for e in attendees_emails]
+	try:
+		event = service.events().insert(calendarId=calendar_id, body=event_body, sendUpdates='all').execute()
+	except Exception:
+		reset_calendar_service()
+		raise
+	return event.get('htmlLink')
+
+
+def delete_calendar_events(summary: Optional[str] = None,
+						   starts_at: Optional[datetime] = None,
+						   ends_at: Optional[datetime] = None,
+						   attendee_email: Optional[str] = None) -> bool:
+	"""Delete events matching the time range, summary text and attendee."""
+	calendar_id = current_app.config.get('GOOGLE_CALENDAR_ID')
+	service = calendar_service()
+	if service is None or not calendar_id:
+		return False
+	list_kwargs = {'calendarId': calendar_id, 'singleEvents': True, 'orderBy': 'startTime', 'maxResults': 50}
+	if starts_at:
+		list_kwargs['timeMin'] = starts_at.isoformat()
+	if ends_at:
+		list_kwargs['timeMax'] = ends_at.isoformat()
+	if summary:
+		list_kwargs['q'] = summary
+	try:
+		items = service.events().list(**list_kwargs).execute().get('items', [])
+	except Exception:
+		reset_calendar_service()
+		raise
+	for ev in items:
+		if attendee_email:
+			emails = [a.get('email') for a in (ev.get('attendees') or []) if a.get('email')]
+			if attendee_email not in emails:
+				continue
+		if summary and summary.lower() not in (ev.get('summary') or '').lower():
+			continue
+		try:
+			service.events().delete(calendarId=calendar_id, eventId=ev.get('id')).execute()
+		except Exception:
+			pass
+	return True
@@ -0,0 +1,181 @@
+"""Anonim ziyaretçiler için tam sayfa ve fragment cache.
+
+``@cached_page('blog')`` ile işaretlenen bir GET görünümü, giriş yapmamış ve
+bekleyen flash mesajı olmayan ziyaretçiler için URL + ilgili query
+parametrelerine göre cache'lenir. Cache'ten dönen yanıt ne görünümü ne de
+context processor'ları çalıştırır; veritabanına hiç gidilmez. Sayfadaki CSRF
+token'ı cache'e yer tutucu olarak yazılır ve her yanıtta ziyaretçinin kendi
+token'ı ile değiştirilir.
+
+Geçersiz kılma kapsamlar (scope) üzerinden yapılır: her kapsamın cache'te bir
+nesil (generation) değeri vardır ve anahtarlar bu değeri içerir. ``Post``,
+``Like``, ``Comment`` ve ``Tag`` yazımları ``blog``, ``Service`` yazımları
+``services`` neslini commit sonrası yeniler; eski kayıtlar süresi dolarak
+silinir. Paylaşılan cache (bkz. ``sharedstore``) ile tüm worker'lar aynı
+nesli görür.
+
+``cached_fragment`` aynı kapsamlarla sayfa parçası verisini (footer
+hizmetleri, popüler yazılar) cache'ler; giriş yapmış kullanıcılara da fayda
+sağlar.
+"""
+import uuid
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from SANALMUHASEBECIM.extensions import cache, db
+from SANALMUHASEBECIM.models import Comment, Like, Post, Service, Tag
+
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF__'
+DEFAULT_QUERY_ARGS = ('page',)
+
+# Model -> etkilediği kapsamlar
+SCOPES = {
+    Post: ('blog',),
+    Like: ('blog',),
+    Comment: ('blog',),
+    Tag: ('blog',),
+    Service: ('services',),
+}
+
+
+def _generation_key(scope):
+    return f'pagecache:gen:{scope}'
+
+
+def generations(scopes):
+    """Current generation token of each scope (created on first use)."""
+    keys = [_generation_key(s) for s in scopes]
+    values = cache.get_many(*keys) if keys else []
+    result = []
+    for key, value in zip(keys, values):
+        if value is None:
+            cache.add(key, uuid.uuid4().hex[:12], timeout=0)
+            value = cache.get(key)
+        result.append(value)
+    return result
+
+
+def invalidate(*scopes):
+    """Start a new generation for ``scopes``; pages and fragments built on the old one are dropped."""
+    for scope in scopes:
+        cache.set(_generation_key(scope), uuid.uuid4().hex[:12], timeout=0)
+
+
+def _timeout(timeout):
+    return timeout if timeout is not None else current_app.config.get('PAGE_CACHE_TIMEOUT', 300)
+
+
+def cached_fragment(name, scopes, builder, timeout=None):
+    """Return ``builder()`` cached under ``name`` until one of ``scopes`` changes.
+
+    ``builder`` ORM nesnesi değil düz veri (ör. ``SimpleNamespace`` listesi)
+    döndürmelidir; cache'ten dönen değer oturuma bağlı değildir.
+    """
+    key = f"fragment:{name}:{':'.join(generations(scopes))}"
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout=_timeout(timeout))
+    return value
+
+
+def _cacheable_request():
+    return (
+        current_app.config.get('PAGE_CACHE_ENABLED', True)
+        and request.method == 'GET'
+        and not current_user.is_authenticated
+        and '_flashes' not in session
+    )
+
+
+def _page_key(scopes, query_args):
+    args = '&'.join(
+        f'{name}={value}'
+        for name in sorted(query_args)
+        for value in request.args.getlist(name)
+    )
+    return f"page:{request.path}?{args}:{':'.join(generations(scopes))}"
+
+
+def cached_page(*scopes, query_args=DEFAULT_QUERY_ARGS, timeout=None):
+    """Cache a public GET view's rendered HTML for anonymous visitors.
+
+    Sadece ``query_args`` içindeki parametreler anahtara girer; diğerleri
+    (ör. utm_*) aynı cache kaydını kullanır. ``services`` kapsamı footer'daki
+    hizmet listesi nedeniyle her sayfaya otomatik eklenir.
+    """
+    scopes = tuple(dict.fromkeys(scopes + ('services',)))
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _cacheable_request():
+                return view(*args, **kwargs)
+            key = _page_key(scopes, query_args)
+            entry = cache.get(key)
+            if entry is not None:
+                body, mimetype = entry
+                if CSRF_PLACEHOLDER in body:
+                    from flask_wtf.csrf import generate_csrf
+                    body = body.replace(CSRF_PLACEHOLDER, generate_csrf())
+                response = make_response(body)
+                response.mimetype = mimetype
+                response.headers['X-Page-Cache'] = 'HIT'
+                response.vary.add('Cookie')
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough and '_flashes' not in session:
+                body = response.get_data(as_text=True)
+                token = g.get('csrf_token')
+                if token:
+                    body = body.replace(token, CSRF_PLACEHOLDER)
+                cache.set(key, (body, response.mimetype), timeout=_timeout(timeout))
+                response.headers['X-Page-Cache'] = 'MISS'
+            response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
+
+
+# --- Geçersiz kılma -----------------------------------------------------------
+
+def mark_dirty(model, session_=None):
+    """Invalidate ``model``'s scopes after the current transaction commits.
+
+    Mapper olaylarını atlayan Core yazımları (ör. ``likes``) için; ORM
+    yazımları bunu olay dinleyicileri üzerinden otomatik yapar.
+    """
+    session_ = session_ if session_ is not None else db.session
+    session_.info.setdefault('pagecache_dirty', set()).update(SCOPES[model])
+
+
+def _mark_dirty(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None:
+        mark_dirty(type(target), session_)
+
+
+for _model in SCOPES:
+    event.listen(_model, 'after_insert', _mark_dirty)
+    event.listen(_model, 'after_update', _mark_dirty)
+    event.listen(_model, 'after_delete', _mark_dirty)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _flush_page_cache(session_):
+    dirty = session_.info.pop('pagecache_dirty', None)
+    if dirty:
+        try:
+            invalidate(*dirty)
+        except Exception as e:
+            current_app.logger.warning(f"Page cache invalidation failed for {sorted(dirty)}: {e}")
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_page_cache_changes(session_):
+    session_.info.pop('pagecache_dirty', None)
@@ -0,0 +1,59 @@
+"""Liste sayfaları için ortak sorgu yardımcıları."""
+from sqlalchemy import func, inspect, select
+
+from SANALMUHASEBECIM.extensions import db
+
+
+def related_counts(pk_column, ids, **relations):
+    """Count related rows for a set of parent ids in a single query.
+
+    ``relations`` eşlemesi sonuç adını ilişkili tablonun yabancı anahtar
+    sütununa bağlar::
+
+        related_counts(Service.id, [1, 2], lead_count=Lead.service_id,
+                       service_request_count=ServiceRequest.service_id)
+        # -> {1: {'lead_count': 3, 'service_request_count': 0}, 2: {...}}
+
+    Her ilişki sadece verilen id'ler için ``GROUP BY`` ile sayılır ve alt
+    sorgular ana tabloya LEFT JOIN edilir; sayfa ne kadar büyük olursa olsun
+    tek bir sorgu çalışır.
+    """
+    ids = list(dict.fromkeys(i for i in ids if i is not None))
+    counts = {i: dict.fromkeys(relations, 0) for i in ids}
+    if not ids or not relations:
+        return counts
+    stmt = select(pk_column).where(pk_column.in_(ids))
+    columns = []
+    for name, fk in relations.items():
+        grouped = (
+            select(fk.label('parent_id'), func.count().label('n'))
+            .where(fk.in_(ids))
+            .group_by(fk)
+            .subquery(f"{name}_grouped")
+        )
+        stmt = stmt.outerjoin(grouped, grouped.c.parent_id == pk_column)
+        columns.append(func.coalesce(grouped.c.n, 0).label(name))
+    for row in db.session.execute(stmt.add_columns(*columns)):
+        counts[row[0]] = {name: row._mapping[name] for name in relations}
+    return counts
+
+
+def annotate_related_counts(items, **relations):
+    """Set related counts as attributes on a page of model instances.
+
+    ``admin.services`` gibi liste sayfalarında satır başına ``count()`` yerine
+    kullanılır::
+
+        annotate_related_counts(page.items, lead_count=Lead.service_id)
+        page.items[0].lead_count
+    """
+    items = list(items)
+    if not items:
+        return items
+    pk_column = inspect(type(items[0])).primary_key[0]
+    key = pk_column.key
+    counts = related_counts(pk_column, [getattr(item, key) for item in items], **relations)
+    for item in items:
+        for name, value in counts.get(getattr(item, key), {}).items():
+            setattr(item, name, value)
+    return items
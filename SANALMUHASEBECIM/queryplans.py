@@ -0,0 +1,142 @@
+"""Sık çalışan sorguların beklenen indeksi kullandığının doğrulanması.
+
+Her kayıt uygulamadaki bir sıcak sorgunun (helpdesk okunmamış sayımı, admin
+listeleri ve keyset sayfaları, blog listesi, yorum ağacı, faturalama ...) temsilî bir kopyası ve
+kullanması beklenen indekstir (bkz. ``models.py`` ``__table_args__`` ve
+``add_hot_path_indexes`` migration'ı). Sorgu planı veritabanından alınır:
+
+* SQLite: ``EXPLAIN QUERY PLAN`` (``USING [COVERING] INDEX <ad>``),
+* MSSQL: ``SET SHOWPLAN_XML ON`` (``Index="[<ad>]"``).
+
+::
+
+    flask query-plans check            # eksik indeks kullanımında çıkış kodu 1
+    flask query-plans check -v         # planları da yaz
+
+İyileştiriciler çok küçük ya da istatistiksiz tablolarda başka bir yol
+seçebilir; kontrol temsilî veri içeren bir veritabanında (SQLite'ta
+``ANALYZE`` sonrası, bkz. ``scripts/benchmarks/seed.py``) çalıştırılmalıdır.
+"""
+import re
+import sys
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import event, func, select
+
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.keyset import seek_condition
+from SANALMUHASEBECIM.models import (
+    Appointment, Comment, Lead, Like, Media, MonthlyPayment, Post, Ticket, TicketMessage, User,
+)
+
+_SQLITE_INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+_MSSQL_INDEX_RE = re.compile(r'Index="\[([^\]]+)\]"')
+
+
+def hot_queries():
+    """``[(name, expected_index, statement)]`` mirroring the queries the app runs."""
+    since = datetime.utcnow() - timedelta(days=7)
+    return [
+        ('helpdesk_unread', 'ix_ticket_message_ticket_created',
+         select(TicketMessage.ticket_id, func.count(TicketMessage.id))
+         .where(TicketMessage.ticket_id == 1, TicketMessage.created_at > since, TicketMessage.user_id != 1)
+         .group_by(TicketMessage.ticket_id)),
+        ('helpdesk_open_tickets', 'ix_ticket_user_status',
+         select(Ticket.id).where(Ticket.user_id == 1, Ticket.status.notin_(('closed', 'completed')))),
+        ('admin_tickets', 'ix_ticket_status_created',
+         select(Ticket.id).where(Ticket.status == 'open').order_by(Ticket.created_at.desc()).limit(20)),
+        ('admin_appointments', 'ix_appointments_status_datetime',
+         select(Appointment.id).where(Appointment.status == 'pending')
+         .order_by(Appointment.appointment_datetime.desc()).limit(20)),
+        ('user_appointments', 'ix_appointments_user_datetime',
+         select(Appointment.id).where(Appointment.user_id == 1).order_by(Appointment.appointment_datetime)),
+        ('billing_leads', 'ix_lead_type_status_next_payment',
+         select(Lead.id).where(Lead.lead_type == 'monthly', Lead.status.in_(('paid', 'completed')))),
+        ('blog_index', 'ix_post_active_status_published',
+         select(Post.id).where(Post.is_active == True, Post.status == 'published')  # noqa: E712
+         .order_by(Post.published_at.desc()).limit(6)),
+        ('post_comments', 'ix_comment_post_thread',
+         select(Comment.id).where(Comment.post_id == 1, Comment.parent_id.is_(None), Comment.is_approved == True)  # noqa: E712
+         .order_by(Comment.date.desc())),
+        ('pending_comments', 'ix_comment_pending_date',
+         select(func.count(Comment.id)).where(Comment.is_approved == False)),  # noqa: E712
+        ('post_likes', 'ix_like_post_user',
+         select(func.count(Like.id)).where(Like.post_id == 1)),
+        ('like_toggle', 'uq_like_user_post',
+         select(Like.id).where(Like.user_id == 1, Like.post_id == 1)),
+        ('user_uploads', 'ix_media_user_created',
+         select(Media.id).where(Media.user_id == 1).order_by(Media.created_at.desc())),
+        ('admin_users_keyset', 'ix_user_created',
+         select(User.id).where(seek_condition([User.created_at, User.id], [since, 1000], smaller=True))
+         .order_by(User.created_at.desc(), User.id.desc()).limit(21)),
+        ('admin_comments_keyset', 'ix_comment_date',
+         select(Comment.id).where(seek_condition([Comment.date, Comment.id], [since, 1000], smaller=True))
+         .order_by(Comment.date.desc(), Comment.id.desc()).limit(21)),
+        ('last_monthly_payment', 'uq_monthly_payment_lead_month',
+         select(MonthlyPayment.id).where(MonthlyPayment.lead_id == 1)
+         .order_by(MonthlyPayment.payment_month.desc()).limit(1)),
+    ]
+
+
+def _sqlite_plan(conn, statement):
+    def prefix(conn_, cursor, sql, parameters, context, executemany):
+        return 'EXPLAIN QUERY PLAN ' + sql, parameters
+
+    event.listen(conn, 'before_cursor_execute', prefix, retval=True)
+    try:
+        rows = conn.execute(statement).cursor.fetchall()
+    finally:
+        event.remove(conn, 'before_cursor_execute', prefix)
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def _mssql_plan(conn, statement):
+    conn.exec_driver_sql('SET SHOWPLAN_XML ON')
+    try:
+        rows = conn.execute(statement).cursor.fetchall()
+    finally:
+        conn.exec_driver_sql('SET SHOWPLAN_XML OFF')
+    return ''.join(str(row[0]) for row in rows)
+
+
+def explain(statement):
+    """Return ``(plan_text, [index names used])`` for ``statement`` on the current database."""
+    with db.engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            plan = _sqlite_plan(conn, statement)
+            return plan, _SQLITE_INDEX_RE.findall(plan)
+        if dialect == 'mssql':
+            plan = _mssql_plan(conn, statement)
+            return plan, sorted(set(_MSSQL_INDEX_RE.findall(plan)))
+        raise NotImplementedError(f'Query plan check is not implemented for {dialect}')
+
+
+def check():
+    """``[(name, expected_index, used_indexes, ok, plan)]`` for every hot query."""
+    results = []
+    for name, expected, statement in hot_queries():
+        plan, used = explain(statement)
+        results.append((name, expected, used, expected in used, plan))
+    return results
+
+
+query_plans_cli = AppGroup('query-plans', help='Query plan verification commands.')
+
+
+@query_plans_cli.command('check')
+@click.option('-v', '--verbose', is_flag=True, help='Print the full plan of every query.')
+@with_appcontext
+def check_command(verbose):
+    """Verify that each hot query uses its index."""
+    missing = 0
+    for name, expected, used, ok, plan in check():
+        missing += not ok
+        click.echo(f"{'OK  ' if ok else 'MISS'} {name}: expected {expected}, used {', '.join(used) or '-'}")
+        if verbose:
+            click.echo('    ' + plan.replace('\n', '\n    '))
+    if missing:
+        click.echo(f"{missing} queries do not use their index.", err=True)
+        sys.exit(1)
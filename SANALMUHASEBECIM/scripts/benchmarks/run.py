@@ -0,0 +1,279 @@
+"""Ana kullanıcı akışları için benchmark / yük testi.
+
+Tohumlanmış bir SQLite veritabanı (bkz. ``seed.py``) üzerinde
+``create_app('testing')`` iki şekilde sürülür:
+
+* ``client``: Flask test istemcisi, tek iş parçacığı; sunucu katmanı olmadan
+  uygulamanın kendi maliyeti,
+* ``waitress``: yerel bir waitress sunucusu ve eşzamanlı HTTP istemcileri;
+  üretimdeki iş parçacığı havuzuna yakın yük.
+
+Her senaryo için p50/p95/p99/ortalama gecikme, istek başına sorgu sayısı
+(``sqlstats`` başlıklarından; akışlı dışa aktarımlarda yalnızca gövde
+öncesi sorgular sayılır) ve tepe bellek (ayrı bir ``tracemalloc``
+geçişinde) ölçülür; sonuç makinece okunabilir JSON olarak yazılır.
+``--compare`` önceki bir sonuçla kıyaslar ve gerileme varsa sıfırdan farklı
+kodla çıkar (CI için)::
+
+    python SANALMUHASEBECIM/scripts/benchmarks/seed.py --db /tmp/bench.db --scale 0.1
+    python SANALMUHASEBECIM/scripts/benchmarks/run.py --db /tmp/bench.db --output bench.json
+    python SANALMUHASEBECIM/scripts/benchmarks/run.py --db /tmp/bench.db --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+ADMIN_EMAIL = 'admin@example.com'
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(durations, queries):
+    ms = [d * 1000 for d in durations]
+    return {
+        'requests': len(ms),
+        'p50_ms': round(_percentile(ms, 50), 2),
+        'p95_ms': round(_percentile(ms, 95), 2),
+        'p99_ms': round(_percentile(ms, 99), 2),
+        'mean_ms': round(statistics.fmean(ms), 2) if ms else 0.0,
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+        'max_queries': max(queries) if queries else None,
+    }
+
+
+def build_scenarios(app):
+    """(name, path, login_as) tuples built from data present in the benchmark database."""
+    from SANALMUHASEBECIM.extensions import db
+    from SANALMUHASEBECIM.models import Post, Ticket, User
+
+    with app.app_context():
+        post = db.session.execute(
+            db.select(Post.slug).where(Post.status == 'published').order_by(Post.like_count.desc()).limit(1)
+        ).scalar()
+        ticket = db.session.execute(
+            db.select(Ticket.id, Ticket.user_id).order_by(Ticket.id).limit(1)
+        ).first()
+        admin_id = db.session.execute(db.select(User.id).where(User.email == ADMIN_EMAIL)).scalar()
+    if post is None or ticket is None:
+        raise SystemExit('Benchmark database is empty; run seed.py first.')
+
+    return [
+        ('home', '/', None),
+        ('blog_index', '/blog/', None),
+        ('blog_post', f'/blog/{post}', None),
+        ('helpdesk_stream', f'/helpdesk/{ticket.id}/stream?last_id=0', ticket.user_id),
+        ('admin_dashboard', '/admin/', admin_id),
+        ('admin_export_appointments', '/admin/appointments/export', admin_id),
+        ('admin_export_leads', '/admin/leads/export', admin_id),
+        ('admin_export_tickets', '/admin/tickets/export', admin_id),
+    ]
+
+
+def _client(app, user_id):
+    client = app.test_client()
+    if user_id is not None:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    return client
+
+
+def _queries(response):
+    value = response.headers.get('X-SQL-Queries')
+    return int(value) if value is not None else None
+
+
+def run_client(app, scenarios, requests, warmup):
+    results = {}
+    for name, path, user_id in scenarios:
+        client = _client(app, user_id)
+        for _ in range(warmup):
+            client.get(path)
+        durations, queries, statuses = [], [], set()
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            durations.append(time.perf_counter() - started)
+            statuses.add(response.status_code)
+            if _queries(response) is not None:
+                queries.append(_queries(response))
+        results[name] = dict(summarize(durations, queries), statuses=sorted(statuses))
+    return results
+
+
+def measure_memory(app, scenarios):
+    """Peak Python heap allocated while serving one request of each scenario."""
+    peaks = {}
+    for name, path, user_id in scenarios:
+        client = _client(app, user_id)
+        client.get(path)  # şablon derleme ve önbellek ısınması ölçüme girmesin
+        tracemalloc.start()
+        client.get(path).get_data()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks[name] = round(peak / 1024, 1)
+    return peaks
+
+
+def _serve(server):
+    try:
+        server.run()
+    except OSError:
+        # close() soketi döngü beklerken kapatır; beklenen kapanış
+        pass
+
+
+def run_waitress(app, scenarios, requests, concurrency, threads):
+    from waitress import create_server
+
+    server = create_server(app, host='127.0.0.1', port=0, threads=threads)
+    base = f'http://127.0.0.1:{server.effective_port}'
+    thread = threading.Thread(target=_serve, args=(server,), daemon=True)
+    thread.start()
+
+    results = {}
+    try:
+        for name, path, user_id in scenarios:
+            headers = {}
+            if user_id is not None:
+                client = _client(app, user_id)
+                client.get('/ping')
+                cookie = client.get_cookie(app.config.get('SESSION_COOKIE_NAME', 'session'))
+                headers['Cookie'] = f'{cookie.key}={cookie.value}'
+
+            def fetch(_):
+                req = urllib.request.Request(base + path, headers=headers)
+                started = time.perf_counter()
+                with urllib.request.urlopen(req, timeout=60) as response:
+                    response.read()
+                    elapsed = time.perf_counter() - started
+                    return elapsed, response.status, response.headers.get('X-SQL-Queries')
+
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(fetch, range(concurrency)))  # ısınma
+                started = time.perf_counter()
+                samples = list(pool.map(fetch, range(requests)))
+                wall = time.perf_counter() - started
+            queries = [int(q) for _, _, q in samples if q is not None]
+            results[name] = dict(
+                summarize([s[0] for s in samples], queries),
+                statuses=sorted({s[1] for s in samples}),
+                throughput_rps=round(len(samples) / wall, 1) if wall else None,
+            )
+    finally:
+        # Önce işçi iş parçacıkları bitsin; aksi hâlde kapanmış tetikleyiciye yazmaya çalışırlar
+        server.task_dispatcher.shutdown()
+        server.close()
+        thread.join(timeout=5)
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """List of regressions: p99 latency beyond ``tolerance`` or more queries per request."""
+    regressions = []
+    for mode, scenarios in current['results'].items():
+        for name, result in scenarios.items():
+            before = baseline.get('results', {}).get(mode, {}).get(name)
+            if not before:
+                continue
+            if before['p99_ms'] and result['p99_ms'] > before['p99_ms'] * (1 + tolerance):
+                regressions.append(f"{mode}/{name}: p99 {before['p99_ms']} -> {result['p99_ms']} ms")
+            if (before.get('queries_per_request') is not None and result.get('queries_per_request') is not None
+                    and result['queries_per_request'] > before['queries_per_request']):
+                regressions.append(
+                    f"{mode}/{name}: queries {before['queries_per_request']} -> {result['queries_per_request']}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=os.path.join(ROOT, 'bench.db'), help='Seeded SQLite file (see seed.py).')
+    parser.add_argument('--mode', choices=('client', 'waitress', 'both'), default='both')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario.')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent HTTP clients (waitress mode).')
+    parser.add_argument('--threads', type=int, default=8, help='Waitress worker threads.')
+    parser.add_argument('--only', action='append', default=[], help='Run only the named scenario (repeatable).')
+    parser.add_argument('--output', help='Write the JSON report to this file (default: stdout).')
+    parser.add_argument('--compare', help='Baseline JSON report; exit with status 1 on regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p99 slowdown vs. baseline (0.2 = 20%%).')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; run seed.py first")
+    # Uygulama içe aktarılmadan önce: yapılandırma ortamdan okunur
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.db)
+    os.environ['SQL_INSTRUMENTATION'] = 'true'
+    os.environ.setdefault('ADMIN_RATE_LIMIT', '1000000 per minute')
+
+    import logging
+    from SANALMUHASEBECIM.app import create_app
+
+    app = create_app('testing')
+    # İstek başına uyarı logları (admin erişimi, SQL özeti) ölçümü gölgelemesin
+    app.logger.setLevel(logging.ERROR)
+    logging.getLogger('sanalmuhasebecim.sql').setLevel(logging.ERROR)
+    scenarios = build_scenarios(app)
+    if args.only:
+        scenarios = [s for s in scenarios if s[0] in args.only]
+
+    results = {}
+    if args.mode in ('client', 'both'):
+        results['client'] = run_client(app, scenarios, args.requests, args.warmup)
+    if args.mode in ('waitress', 'both'):
+        results['waitress'] = run_waitress(app, scenarios, args.requests, args.concurrency, args.threads)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': os.path.abspath(args.db),
+            'database_mb': round(os.path.getsize(args.db) / 1024 / 1024, 1),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'threads': args.threads,
+        },
+        'results': results,
+        'peak_memory_kb': measure_memory(app, scenarios),
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            regressions = compare(report, json.load(fh), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
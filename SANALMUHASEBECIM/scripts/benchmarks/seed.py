@@ -0,0 +1,241 @@
+"""Benchmark veritabanını gerçekçi hacimlerle tohumlar.
+
+Varsayılan hacimler (``--scale 1``): 100k kullanıcı, 50k yazı, 1M beğeni,
+100k yorum, 20k ticket / 200k ticket mesajı, 20k randevu, 5k lead.
+``--scale 0.01`` hızlı bir duman testi için yeterlidir.
+
+Satırlar ORM olaylarını atlayan toplu ``INSERT``'lerle yazılır; beğeni/yorum
+sayaçları ve admin arama metni üretim sırasında hesaplanır. Aynı ``--seed``
+her zaman aynı veriyi üretir.
+
+    python SANALMUHASEBECIM/scripts/benchmarks/seed.py --db /tmp/bench.db --scale 0.1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+VOLUMES = {
+    'users': 100_000,
+    'posts': 50_000,
+    'likes': 1_000_000,
+    'comments': 100_000,
+    'tickets': 20_000,
+    'ticket_messages': 200_000,
+    'appointments': 20_000,
+    'leads': 5_000,
+}
+CHUNK = 10_000
+BENCH_PASSWORD = 'bench-password'
+EPOCH = datetime(2025, 1, 1)
+
+PARAGRAPH = (
+    "Şirketinizin muhasebe kayıtlarını düzenli tutmak, vergi beyannamelerinin zamanında "
+    "verilmesi ve olası cezaların önlenmesi için büyük önem taşır. Bu yazıda KDV, muhtasar "
+    "ve geçici vergi dönemlerinde dikkat edilmesi gereken noktaları özetliyoruz. "
+)
+
+
+def scaled(scale):
+    return {name: max(1, int(count * scale)) for name, count in VOLUMES.items()}
+
+
+def _chunks(rows):
+    for start in range(0, len(rows), CHUNK):
+        yield rows[start:start + CHUNK]
+
+
+def _insert(db, model, rows):
+    table = model.__table__
+    for chunk in _chunks(rows):
+        db.session.execute(table.insert(), chunk)
+    db.session.commit()
+
+
+def _skewed(rng, n):
+    """Index in [0, n) with a long-tail distribution (a few popular items)."""
+    return min(n - 1, int(n * rng.random() ** 3))
+
+
+def seed(db, volumes, rng, log=print):
+    from werkzeug.security import generate_password_hash
+    from SANALMUHASEBECIM.adminsearch import normalize
+    from SANALMUHASEBECIM.models import (
+        Appointment, Comment, Lead, Like, Post, Service, ServiceRequest, Ticket, TicketMessage, User,
+    )
+
+    timings = {}
+
+    def step(name):
+        timings[name] = time.perf_counter()
+        log(f"seeding {name} ...")
+
+    password = generate_password_hash(BENCH_PASSWORD)
+    user_offset = db.session.execute(db.select(db.func.coalesce(db.func.max(User.id), 0))).scalar()
+    n_users, n_posts = volumes['users'], volumes['posts']
+
+    step('users')
+    users = []
+    for i in range(n_users):
+        name = f"Kullanıcı {i} Şahin"
+        email = f"user{i}@bench.local"
+        users.append({
+            'id': user_offset + i + 1, 'name': name, 'email': email, 'password': password,
+            'email_confirmed': True, 'role': 'client', 'is_admin': False,
+            'created_at': EPOCH + timedelta(minutes=i), 'search_text': normalize(f"{name} {email}")[:255],
+        })
+    _insert(db, User, users)
+    user_ids = [u['id'] for u in users]
+    del users
+
+    step('services')
+    services = [
+        {'id': i + 1, 'name': f"Hizmet {i + 1}", 'slug': f"hizmet-{i + 1}", 'summary': 'Özet',
+         'description': PARAGRAPH, 'price': 1000 + i * 250, 'is_active': True, 'order_index': i}
+        for i in range(6)
+    ]
+    _insert(db, Service, services)
+
+    step('likes')
+    seen = set()
+    likes = []
+    like_counts = [0] * n_posts
+    while len(likes) < volumes['likes']:
+        post = _skewed(rng, n_posts)
+        user = rng.randrange(n_users)
+        key = user * n_posts + post
+        if key in seen:
+            continue
+        seen.add(key)
+        like_counts[post] += 1
+        likes.append({'user_id': user_ids[user], 'post_id': post + 1})
+    del seen
+
+    step('comments')
+    comment_counts = [0] * n_posts
+    comments = []
+    for i in range(volumes['comments']):
+        post = _skewed(rng, n_posts)
+        # comment_count yalnızca onaylı yorumları sayar (bkz. counters)
+        comment_counts[post] += i % 50 != 0
+        comments.append({
+            'id': i + 1, 'content': f"Yorum {i}: çok faydalı bir yazı olmuş, teşekkürler.",
+            'date': EPOCH + timedelta(minutes=i), 'user_id': user_ids[rng.randrange(n_users)],
+            # Her 50 yorumdan biri moderasyon kuyruğunda (ix_comment_pending_date planı için)
+            'post_id': post + 1, 'parent_id': None, 'is_approved': i % 50 != 0, 'like_count': 0,
+        })
+
+    step('posts')
+    posts = [
+        {
+            'id': i + 1, 'title': f"Vergi rehberi {i}: KDV ve beyanname takvimi",
+            'subtitle': 'Muhasebe', 'slug': f"vergi-rehberi-{i}", 'excerpt': PARAGRAPH[:280],
+            'post_date': EPOCH + timedelta(hours=i), 'published_at': EPOCH + timedelta(hours=i),
+            'post_text': f"<p>{PARAGRAPH * 8}</p>", 'is_active': True, 'status': 'published',
+            'user_id': user_ids[rng.randrange(n_users)],
+            'like_count': like_counts[i], 'comment_count': comment_counts[i],
+        }
+        for i in range(n_posts)
+    ]
+    _insert(db, Post, posts)
+    del posts
+    _insert(db, Like, likes)
+    del likes
+    _insert(db, Comment, comments)
+    del comments
+
+    step('tickets')
+    tickets = []
+    for i in range(volumes['tickets']):
+        subject = f"Fatura sorusu {i}"
+        tickets.append({
+            'id': i + 1, 'user_id': user_ids[rng.randrange(n_users)], 'subject': subject,
+            'status': 'open', 'priority': 'normal', 'created_at': EPOCH + timedelta(minutes=i),
+            'search_text': normalize(subject),
+        })
+    _insert(db, Ticket, tickets)
+
+    step('ticket_messages')
+    messages = []
+    for i in range(volumes['ticket_messages']):
+        ticket = tickets[i % len(tickets)]
+        messages.append({
+            'ticket_id': ticket['id'], 'user_id': ticket['user_id'] if i % 3 else 1,
+            'content': f"Mesaj {i}: e-fatura entegrasyonu hakkında bilgi rica ediyorum.",
+            'created_at': EPOCH + timedelta(seconds=i * 30), 'message_type': 'text', 'is_internal': False,
+        })
+    del tickets
+    _insert(db, TicketMessage, messages)
+    del messages
+
+    step('appointments')
+    appointments = []
+    for i in range(volumes['appointments']):
+        email = f"user{rng.randrange(n_users)}@bench.local"
+        appointments.append({
+            'id': i + 1, 'email': email, 'appointment_datetime': EPOCH + timedelta(hours=i),
+            'status': rng.choice(['pending', 'confirmed', 'cancelled', 'completed']),
+            'purpose': 'Ön görüşme', 'created_at': EPOCH + timedelta(hours=i),
+            'search_text': normalize(email),
+        })
+    _insert(db, Appointment, appointments)
+    del appointments
+
+    step('leads')
+    requests_, leads = [], []
+    for i in range(volumes['leads']):
+        user_id = user_ids[rng.randrange(n_users)]
+        service_id = rng.randrange(len(services)) + 1
+        requests_.append({'id': i + 1, 'user_id': user_id, 'service_id': service_id, 'status': 'completed'})
+        leads.append({
+            'id': i + 1, 'service_request_id': i + 1, 'user_id': user_id, 'service_id': service_id,
+            'name': 'Lead', 'lead_type': 'monthly', 'status': 'paid', 'monthly_amount': 1500,
+            'iban': 'TR000000000000000000000000', 'created_at': EPOCH + timedelta(hours=i),
+        })
+    _insert(db, ServiceRequest, requests_)
+    _insert(db, Lead, leads)
+
+    now = time.perf_counter()
+    names = list(timings)
+    return {
+        name: round((timings[names[i + 1]] if i + 1 < len(names) else now) - timings[name], 2)
+        for i, name in enumerate(names)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db', default=os.path.join(ROOT, 'bench.db'), help='SQLite file to create.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for the default volumes.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--force', action='store_true', help='Overwrite an existing database file.')
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.db):
+        if not args.force:
+            parser.error(f"{args.db} exists; use --force to recreate it")
+        os.remove(args.db)
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.db)
+
+    from SANALMUHASEBECIM.app import create_app
+    from SANALMUHASEBECIM.extensions import db
+
+    app = create_app('testing')
+    volumes = scaled(args.scale)
+    with app.app_context():
+        started = time.perf_counter()
+        timings = seed(db, volumes, random.Random(args.seed))
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+    print(f"Seeded {args.db} in {time.perf_counter() - started:.1f}s: {volumes}")
+    print(f"Step timings (s): {timings}")
+
+
+if __name__ == '__main__':
+    main()
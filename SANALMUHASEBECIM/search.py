@@ -0,0 +1,581 @@
+"""Blog tam metin araması.
+
+Yazının başlığı, alt başlığı, özeti, gövdesi ve etiket adları Türkçe'ye uygun
+şekilde katlanır (İ/I, ç/ğ/ı/ö/ş/ü -> ascii, küçük harf) ve hafif bir ek
+budayıcıdan geçirilerek indekslenir. Arka uç veritabanına göre seçilir:
+
+* SQLite: FTS5 sanal tablosu ``post_search`` (bm25 sıralaması),
+* MSSQL: ``post_search_doc`` tablosu üzerinde full-text index (CONTAINSTABLE),
+* diğer durumlar / FTS yoksa: süreç içi ters indeks (BM25).
+
+İndeks, yazı eklenince, düzenlenince ya da silinince commit sonrası artımlı
+olarak güncellenir; tamamı ``flask search rebuild`` ile yeniden kurulabilir.
+Snippet'ler orijinal metinden üretilir ve eşleşen kelimeler ``<mark>`` ile
+işaretlenir.
+"""
+import bisect
+import html
+import math
+import re
+import threading
+import unicodedata
+import uuid
+from collections import Counter
+from functools import lru_cache
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from markupsafe import Markup, escape
+from sqlalchemy import bindparam, event, select, text
+from sqlalchemy.orm import object_session
+
+from SANALMUHASEBECIM.extensions import cache, db
+from SANALMUHASEBECIM.models import Post, Tag, post_tag
+
+FIELDS = ('title', 'head', 'body', 'tags')
+FIELD_WEIGHTS = {'title': 10.0, 'head': 4.0, 'body': 1.0, 'tags': 6.0}
+MAX_TERMS = 8
+SNIPPET_WIDTH = 180
+GENERATION_KEY = 'search:generation'
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_TURKISH_UPPER = str.maketrans({'İ': 'i', 'I': 'ı'})
+
+# Sık görülen çekim ekleri (katlanmış biçimde), uzundan kısaya
+_SUFFIXES = sorted({
+    'lerinden', 'larindan', 'lerinde', 'larinda', 'lerini', 'larini', 'lerin', 'larin',
+    'leri', 'lari', 'ler', 'lar',
+    'sinden', 'sindan', 'sinde', 'sinda', 'sinin', 'sini', 'nin', 'nun',
+    'nden', 'ndan', 'nde', 'nda', 'den', 'dan', 'ten', 'tan', 'de', 'da', 'te', 'ta',
+    'yla', 'yle', 'la', 'le', 'yi', 'yu', 'ya', 'ye', 'in', 'un', 'si', 'su',
+    'cilik', 'culuk', 'ci', 'cu',
+    'i', 'u', 'a', 'e',
+}, key=len, reverse=True)
+_MIN_STEM = 3
+
+
+def _build_fold_table():
+    table = {ord('İ'): 'i', ord('I'): 'i', ord('ı'): 'i'}
+    for code in range(0xC0, 0x250):
+        ch = chr(code)
+        base = ''.join(c for c in unicodedata.normalize('NFKD', ch) if not unicodedata.combining(c)).lower()
+        if len(base) == 1 and base != ch:
+            table[code] = base
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold(value):
+    """Turkish-aware case and diacritic folding; keeps one character per input character."""
+    folded = (value or '').translate(_FOLD_TABLE).lower()
+    if len(folded) != len(value or ''):
+        # lower() bazı nadir karakterleri genişletir; snippet hizası için karakter karakter katla
+        folded = ''.join(ch.translate(_FOLD_TABLE).lower()[:1] or ch for ch in value)
+    return folded
+
+
+@lru_cache(maxsize=65536)
+def stem(token):
+    """Strip up to three inflectional suffixes (light Turkish stemmer)."""
+    for _ in range(3):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def strip_html(value):
+    return html.unescape(_TAG_RE.sub(' ', value or ''))
+
+
+def analyze(value):
+    """Return the list of index terms of a text."""
+    return [stem(t) for t in _TOKEN_RE.findall(fold(value))]
+
+
+def query_terms(q):
+    terms = []
+    for term in analyze(q):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+# --- Dokümanlar -----------------------------------------------------------
+
+def _documents(conn, ids=None):
+    """Yield ``(post_id, fields, visible)`` rows read through a Core connection."""
+    tag_stmt = select(post_tag.c.post_id, Tag.name).join(Tag, Tag.id == post_tag.c.tag_id)
+    post_stmt = select(
+        Post.id, Post.title, Post.subtitle, Post.excerpt, Post.post_text, Post.is_active, Post.status,
+    ).order_by(Post.id)
+    if ids is not None:
+        tag_stmt = tag_stmt.where(post_tag.c.post_id.in_(ids))
+        post_stmt = post_stmt.where(Post.id.in_(ids))
+    tags = {}
+    for post_id, name in conn.execute(tag_stmt):
+        tags.setdefault(post_id, []).append(name or '')
+    result = conn.execution_options(yield_per=500).execute(post_stmt)
+    for row in result:
+        fields = {
+            'title': ' '.join(analyze(row.title)),
+            'head': ' '.join(analyze(f"{row.subtitle or ''} {row.excerpt or ''}")),
+            'body': ' '.join(analyze(strip_html(row.post_text))),
+            'tags': ' '.join(analyze(' '.join(tags.get(row.id, [])))),
+        }
+        yield row.id, fields, bool(row.is_active) and row.status == 'published'
+
+
+def _visible_filter():
+    return "p.is_active = 1 AND p.status = 'published'"
+
+
+# --- Arka uçlar -------------------------------------------------------------
+
+class SQLiteFTSBackend:
+    name = 'sqlite-fts5'
+    table = 'post_search'
+
+    def ensure(self, conn):
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {'n': self.table}
+        ).first()
+        if exists:
+            return False
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE {self.table} USING fts5("
+            "title, head, body, tags, tokenize='unicode61', prefix='2 3')"
+        ))
+        return True
+
+    def delete(self, conn, ids):
+        if ids:
+            conn.execute(
+                text(f"DELETE FROM {self.table} WHERE rowid IN :ids").bindparams(bindparam('ids', expanding=True)),
+                {'ids': list(ids)},
+            )
+
+    def upsert(self, conn, docs):
+        rows = [dict(rowid=pid, **fields) for pid, fields, _visible in docs]
+        self.delete(conn, [r['rowid'] for r in rows])
+        if rows:
+            conn.execute(
+                text(f"INSERT INTO {self.table} (rowid, title, head, body, tags) "
+                     "VALUES (:rowid, :title, :head, :body, :tags)"),
+                rows,
+            )
+
+    def clear(self, conn):
+        conn.execute(text(f"DELETE FROM {self.table}"))
+
+    def query(self, terms, limit, offset):
+        match = ' AND '.join(f'"{t}"*' for t in terms)
+        weights = ', '.join(str(FIELD_WEIGHTS[f]) for f in FIELDS)
+        base = (
+            f"FROM {self.table} JOIN {Post.__tablename__} p ON p.id = {self.table}.rowid "
+            f"WHERE {self.table} MATCH :match AND {_visible_filter()}"
+        )
+        rows = db.session.execute(
+            text(f"SELECT p.id, bm25({self.table}, {weights}) AS score {base} ORDER BY score LIMIT :limit OFFSET :offset"),
+            {'match': match, 'limit': limit, 'offset': offset},
+        ).all()
+        total = db.session.execute(text(f"SELECT COUNT(*) {base}"), {'match': match}).scalar() or 0
+        return [r[0] for r in rows], total
+
+
+class MSSQLFullTextBackend:
+    name = 'mssql-fulltext'
+    table = 'post_search_doc'
+    catalog = 'ft_sanalmuhasebecim'
+
+    def ensure(self, conn):
+        if conn.execute(text(f"SELECT OBJECT_ID('{self.table}', 'U')")).scalar() is not None:
+            return False
+        conn.execute(text(
+            f"CREATE TABLE {self.table} ("
+            "post_id INT NOT NULL CONSTRAINT PK_post_search_doc PRIMARY KEY, "
+            "title NVARCHAR(MAX) NULL, head NVARCHAR(MAX) NULL, body NVARCHAR(MAX) NULL, tags NVARCHAR(MAX) NULL)"
+        ))
+        # Full-text DDL transaction içinde çalışamaz
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as ddl:
+            ddl.execute(text(
+                f"IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = '{self.catalog}') "
+                f"CREATE FULLTEXT CATALOG {self.catalog}"
+            ))
+        return True
+
+    def create_fulltext_index(self):
+        # Metin önceden katlanıp budandığı için dil nötr (0) kullanılır
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as ddl:
+            ddl.execute(text(
+                f"IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('{self.table}')) "
+                f"CREATE FULLTEXT INDEX ON {self.table} (title LANGUAGE 0, head LANGUAGE 0, body LANGUAGE 0, tags LANGUAGE 0) "
+                f"KEY INDEX PK_post_search_doc ON {self.catalog} WITH CHANGE_TRACKING AUTO"
+            ))
+
+    def delete(self, conn, ids):
+        if ids:
+            conn.execute(
+                text(f"DELETE FROM {self.table} WHERE post_id IN :ids").bindparams(bindparam('ids', expanding=True)),
+                {'ids': list(ids)},
+            )
+
+    def upsert(self, conn, docs):
+        rows = [dict(post_id=pid, **fields) for pid, fields, _visible in docs]
+        self.delete(conn, [r['post_id'] for r in rows])
+        if rows:
+            conn.execute(
+                text(f"INSERT INTO {self.table} (post_id, title, head, body, tags) "
+                     "VALUES (:post_id, :title, :head, :body, :tags)"),
+                rows,
+            )
+
+    def clear(self, conn):
+        conn.execute(text(f"DELETE FROM {self.table}"))
+
+    def query(self, terms, limit, offset):
+        condition = ' AND '.join(f'"{t}*"' for t in terms)
+        base = (
+            f"FROM CONTAINSTABLE({self.table}, *, :condition) ft "
+            f"JOIN {Post.__tablename__} p ON p.id = ft.[KEY] WHERE {_visible_filter()}"
+        )
+        rows = db.session.execute(
+            text(f"SELECT p.id, ft.[RANK] {base} ORDER BY ft.[RANK] DESC, p.id DESC "
+                 "OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY"),
+            {'condition': condition, 'limit': limit, 'offset': offset},
+        ).all()
+        total = db.session.execute(text(f"SELECT COUNT(*) {base}"), {'condition': condition}).scalar() or 0
+        return [r[0] for r in rows], total
+
+
+class MemoryBackend:
+    """In-process inverted index with BM25 scoring; only visible posts are indexed."""
+
+    name = 'memory'
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = {}
+        self.doc_len = {}
+        self.doc_terms = {}
+        self.generation = None
+        self._sorted_terms = None
+
+    def ensure(self, conn):
+        return self.generation is None
+
+    def _remove(self, pid):
+        for term in self.doc_terms.pop(pid, ()):
+            bucket = self.postings.get(term)
+            if bucket is not None:
+                bucket.pop(pid, None)
+                if not bucket:
+                    del self.postings[term]
+                    self._sorted_terms = None
+        self.doc_len.pop(pid, None)
+
+    def delete(self, conn, ids):
+        with self.lock:
+            for pid in ids:
+                self._remove(pid)
+
+    def upsert(self, conn, docs):
+        with self.lock:
+            for pid, fields, visible in docs:
+                self._remove(pid)
+                if not visible:
+                    continue
+                weights = Counter()
+                length = 0.0
+                for field, value in fields.items():
+                    counts = Counter(value.split())
+                    field_weight = FIELD_WEIGHTS[field]
+                    length += sum(counts.values()) * field_weight
+                    for token, n in counts.items():
+                        weights[token] += n * field_weight
+                for term, weight in weights.items():
+                    if term not in self.postings:
+                        self._sorted_terms = None
+                    self.postings.setdefault(term, {})[pid] = weight
+                self.doc_terms[pid] = tuple(weights)
+                self.doc_len[pid] = length
+
+    def clear(self, conn):
+        with self.lock:
+            self.postings.clear()
+            self.doc_len.clear()
+            self.doc_terms.clear()
+            self._sorted_terms = None
+
+    def _expand(self, prefix):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = self._sorted_terms
+        i = bisect.bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            yield terms[i]
+            i += 1
+
+    def query(self, terms, limit, offset):
+        with self.lock:
+            n_docs = len(self.doc_len) or 1
+            avg_len = (sum(self.doc_len.values()) / n_docs) or 1.0
+            scores = None
+            for term in terms:
+                tf = {}
+                for expanded in self._expand(term):
+                    for pid, weight in self.postings[expanded].items():
+                        tf[pid] = tf.get(pid, 0.0) + weight
+                idf = math.log(1 + (n_docs - len(tf) + 0.5) / (len(tf) + 0.5))
+                term_scores = {
+                    pid: idf * f * (self.k1 + 1) / (f + self.k1 * (1 - self.b + self.b * self.doc_len[pid] / avg_len))
+                    for pid, f in tf.items()
+                }
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+                if not scores:
+                    return [], 0
+            ranked = sorted((scores or {}).items(), key=lambda kv: (-kv[1], -kv[0]))
+        return [pid for pid, _ in ranked[offset:offset + limit]], len(ranked)
+
+
+_backend_lock = threading.Lock()
+
+
+def _fts5_available(conn):
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)"))
+        conn.execute(text("DROP TABLE temp._fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def get_backend(app=None):
+    """Return the search backend of the app, creating and filling the index on first use."""
+    app = app or current_app._get_current_object()
+    backend = app.extensions.get('search_backend')
+    if backend is not None:
+        return backend
+    with _backend_lock:
+        backend = app.extensions.get('search_backend')
+        if backend is not None:
+            return backend
+        choice = (app.config.get('SEARCH_BACKEND') or 'auto').lower()
+        dialect = db.engine.dialect.name
+        if choice == 'auto':
+            choice = {'sqlite': 'sqlite', 'mssql': 'mssql'}.get(dialect, 'memory')
+        if choice == 'sqlite':
+            with db.engine.connect() as conn:
+                if not _fts5_available(conn):
+                    choice = 'memory'
+        backend = {
+            'sqlite': SQLiteFTSBackend,
+            'mssql': MSSQLFullTextBackend,
+        }.get(choice, MemoryBackend)()
+        try:
+            with db.engine.begin() as conn:
+                created = backend.ensure(conn)
+            if isinstance(backend, MSSQLFullTextBackend):
+                backend.create_fulltext_index()
+            if created:
+                rebuild_index(backend)
+        except Exception as e:
+            app.logger.error(f"Search backend {backend.name} unavailable, using in-memory index: {e}")
+            backend = MemoryBackend()
+            rebuild_index(backend)
+        app.extensions['search_backend'] = backend
+    return backend
+
+
+def rebuild_index(backend=None, batch_size=500):
+    """Re-index every post. Returns the number of indexed posts."""
+    backend = backend or get_backend()
+    count = 0
+    with db.engine.begin() as conn:
+        backend.clear(conn)
+        batch = []
+        for doc in _documents(conn):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                backend.upsert(conn, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            backend.upsert(conn, batch)
+            count += len(batch)
+    if isinstance(backend, MemoryBackend):
+        state = cache.get(GENERATION_KEY)
+        if state is None:
+            state = {'generation': uuid.uuid4().hex, 'previous': None, 'changed': [], 'deleted': []}
+            cache.set(GENERATION_KEY, state, timeout=0)
+        backend.generation = state['generation']
+    return count
+
+
+def reindex_posts(changed_ids=(), deleted_ids=()):
+    """Incrementally update the index for changed and deleted posts."""
+    backend = get_backend()
+    changed = [i for i in set(changed_ids) if i not in set(deleted_ids)]
+    with db.engine.begin() as conn:
+        backend.delete(conn, list(deleted_ids))
+        if changed:
+            backend.upsert(conn, list(_documents(conn, changed)))
+    if isinstance(backend, MemoryBackend):
+        # Diğer süreçler son değişikliği artımlı uygular; birden fazla nesil
+        # geride kalan süreç indeksini yeniden kurar
+        state = {
+            'generation': uuid.uuid4().hex,
+            'previous': backend.generation,
+            'changed': changed,
+            'deleted': list(deleted_ids),
+        }
+        backend.generation = state['generation']
+        cache.set(GENERATION_KEY, state, timeout=0)
+
+
+def _sync_memory_backend(backend):
+    state = cache.get(GENERATION_KEY)
+    if state is None or state['generation'] == backend.generation:
+        return
+    if state['previous'] is not None and state['previous'] == backend.generation:
+        with db.engine.connect() as conn:
+            backend.delete(conn, state['deleted'])
+            if state['changed']:
+                backend.upsert(conn, list(_documents(conn, state['changed'])))
+        backend.generation = state['generation']
+    else:
+        rebuild_index(backend)
+
+
+# --- Sorgu -------------------------------------------------------------------
+
+def make_snippet(value, terms, width=SNIPPET_WIDTH, require_match=False):
+    """Return an HTML-safe excerpt of ``value`` around the first match, matches in ``<mark>``.
+
+    ``require_match`` verilirse ve metinde eşleşme yoksa None döner.
+    """
+    plain = ' '.join(strip_html(value).split())
+    folded = fold(plain)
+    spans = [
+        (m.start(), m.end())
+        for m in _TOKEN_RE.finditer(folded)
+        if any(m.group().startswith(t) for t in terms)
+    ]
+    if require_match and not spans:
+        return None
+    if not plain:
+        return Markup('')
+    start = max(0, spans[0][0] - width // 3) if spans else 0
+    end = min(len(plain), start + width)
+    if start > 0:
+        space = plain.find(' ', start)
+        start = space + 1 if 0 <= space < spans[0][0] else start
+    out = [Markup('…')] if start > 0 else []
+    cursor = start
+    for s, e in spans:
+        if s < start or e > end:
+            continue
+        out.append(escape(plain[cursor:s]))
+        out.append(Markup('<mark>') + escape(plain[s:e]) + Markup('</mark>'))
+        cursor = e
+    out.append(escape(plain[cursor:end]))
+    if end < len(plain):
+        out.append(Markup('…'))
+    return Markup('').join(out)
+
+
+class SearchResults:
+    """Pagination-compatible page of search results."""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = max(1, (total + per_page - 1) // per_page)
+        self.has_prev = page > 1
+        self.has_next = page < self.pages
+        self.prev_num = page - 1 if self.has_prev else None
+        self.next_num = page + 1 if self.has_next else None
+
+
+def search_posts(q, page=1, per_page=10):
+    """Search visible posts; each item gets a ``search_snippet`` attribute."""
+    page = max(1, page)
+    terms = query_terms(q)
+    if not terms:
+        return SearchResults([], page, per_page, 0)
+    backend = get_backend()
+    if isinstance(backend, MemoryBackend):
+        _sync_memory_backend(backend)
+    ids, total = backend.query(terms, per_page, (page - 1) * per_page)
+    posts = {p.id: p for p in Post.query.filter(Post.id.in_(ids)).all()} if ids else {}
+    items = []
+    for pid in ids:
+        post = posts.get(pid)
+        if post is None:
+            continue
+        # Gövdede eşleşme yoksa (ör. sadece başlık/etiket) özet gösterilir
+        post.search_snippet = (
+            make_snippet(post.post_text, terms, require_match=True)
+            or make_snippet(post.excerpt or post.subtitle or post.post_text, terms)
+        )
+        items.append(post)
+    return SearchResults(items, page, per_page, total)
+
+
+# --- Artımlı güncelleme -------------------------------------------------------
+
+@event.listens_for(Post, 'after_insert')
+@event.listens_for(Post, 'after_update')
+def _collect_changed_post(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None and target.id is not None:
+        session_.info.setdefault('search_changed', set()).add(target.id)
+
+
+@event.listens_for(Post, 'after_delete')
+def _collect_deleted_post(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None and target.id is not None:
+        session_.info.setdefault('search_deleted', set()).add(target.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _flush_search_index(session_):
+    changed = session_.info.pop('search_changed', set())
+    deleted = session_.info.pop('search_deleted', set())
+    if not changed and not deleted:
+        return
+    try:
+        reindex_posts(changed, deleted)
+    except Exception as e:
+        current_app.logger.warning(f"Search index update failed for posts {sorted(changed | deleted)}: {e}")
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_search_changes(session_):
+    session_.info.pop('search_changed', None)
+    session_.info.pop('search_deleted', None)
+
+
+search_cli = AppGroup('search', help='Blog search index commands.')
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    """Rebuild the blog search index from scratch."""
+    backend = get_backend()
+    click.echo(f"Indexed {rebuild_index(backend)} posts ({backend.name}).")
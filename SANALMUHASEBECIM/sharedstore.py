@@ -0,0 +1,240 @@
+"""Cache ve rate-limit sayaçları için süreçler arası paylaşılan depo.
+
+``SHARED_STORE_URL`` hem ``cache`` hem ``limiter`` için tek bir arka uç seçer:
+
+* ``redis://host:6379/0`` (veya ``rediss://``): Redis uyumlu sunucu,
+* ``sqlite:////var/lib/app/shared.sqlite``: tek sunuculu kurulumlar için dosya
+  tabanlı depo; waitress'in tüm worker'ları aynı dosyayı kullanır,
+* boş: süreç içi bellek (geliştirme ve testler).
+
+``CACHE_TYPE`` ya da ``RATELIMIT_STORAGE_URI`` açıkça verilmişse onlara dokunulmaz.
+"""
+import pickle
+import random
+import sqlite3
+import threading
+import time
+
+from flask_caching.backends.base import BaseCache
+from limits.storage import Storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+);
+CREATE TABLE IF NOT EXISTS rate_limit (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+def _sqlite_path(url):
+    return url.split(':///', 1)[1] if ':///' in url else url
+
+
+class _SQLiteStore:
+    """One connection per thread to a WAL-mode SQLite file."""
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self.read().executescript(_SCHEMA)
+
+    def read(self):
+        """Autocommit connection for single-statement reads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def write(self):
+        return _Transaction(self.read())
+
+    def maybe_purge(self, probability=0.001):
+        # Süresi dolan satırlar ara sıra temizlenir; tablo sınırsız büyümez
+        if random.random() < probability:
+            now = time.time()
+            with self.write() as conn:
+                conn.execute('DELETE FROM cache_entry WHERE expires IS NOT NULL AND expires <= ?', (now,))
+                conn.execute('DELETE FROM rate_limit WHERE expires <= ?', (now,))
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` so read-modify-write is atomic across processes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _store_for(path):
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = _SQLiteStore(path)
+        return _stores[path]
+
+
+class SQLiteCache(BaseCache):
+    """Flask-Caching backend storing pickled values in a shared SQLite file."""
+
+    def __init__(self, path, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self._store = _store_for(path)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        path = config.get('CACHE_SQLITE_PATH') or _sqlite_path(config.get('SHARED_STORE_URL') or '')
+        return cls(path, *args, **kwargs)
+
+    def _expires_at(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout else None
+
+    def get(self, key):
+        row = self._store.read().execute('SELECT value, expires FROM cache_entry WHERE key = ?', (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return None
+
+    def set(self, key, value, timeout=None):
+        self._store.maybe_purge()
+        with self._store.write() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires_at(timeout)),
+            )
+        return True
+
+    def add(self, key, value, timeout=None):
+        now = time.time()
+        with self._store.write() as conn:
+            row = conn.execute('SELECT expires FROM cache_entry WHERE key = ?', (key,)).fetchone()
+            if row is not None and (row[0] is None or row[0] > now):
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires_at(timeout)),
+            )
+        return True
+
+    def delete(self, key):
+        with self._store.write() as conn:
+            return conn.execute('DELETE FROM cache_entry WHERE key = ?', (key,)).rowcount > 0
+
+    def has(self, key):
+        row = self._store.read().execute('SELECT expires FROM cache_entry WHERE key = ?', (key,)).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
+
+    def clear(self):
+        with self._store.write() as conn:
+            conn.execute('DELETE FROM cache_entry')
+        return True
+
+    def inc(self, key, delta=1):
+        with self._store.write() as conn:
+            row = conn.execute('SELECT value, expires FROM cache_entry WHERE key = ?', (key,)).fetchone()
+            current = 0
+            expires = None
+            if row is not None and (row[1] is None or row[1] > time.time()):
+                current = pickle.loads(row[0]) or 0
+                expires = row[1]
+            value = current + delta
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires),
+            )
+        return value
+
+    def dec(self, key, delta=1):
+        return self.inc(key, -delta)
+
+
+class SQLiteLimitStorage(Storage):
+    """``limits`` storage for ``sqlite:///path`` URIs (fixed-window strategy)."""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._store = _store_for(_sqlite_path(uri))
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key, expiry, amount=1):
+        self._store.maybe_purge()
+        now = time.time()
+        with self._store.write() as conn:
+            row = conn.execute('SELECT count, expires FROM rate_limit WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] <= now:
+                count, expires = amount, now + expiry
+            else:
+                count, expires = row[0] + amount, row[1]
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit (key, count, expires) VALUES (?, ?, ?)',
+                (key, count, expires),
+            )
+        return count
+
+    def get(self, key):
+        row = self._store.read().execute('SELECT count, expires FROM rate_limit WHERE key = ?', (key,)).fetchone()
+        return row[0] if row and row[1] > time.time() else 0
+
+    def get_expiry(self, key):
+        row = self._store.read().execute('SELECT expires FROM rate_limit WHERE key = ?', (key,)).fetchone()
+        return row[0] if row and row[0] > time.time() else time.time()
+
+    def check(self):
+        try:
+            self._store.read().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._store.write() as conn:
+            return conn.execute('DELETE FROM rate_limit').rowcount
+
+    def clear(self, key):
+        with self._store.write() as conn:
+            conn.execute('DELETE FROM rate_limit WHERE key = ?', (key,))
+
+
+def configure_shared_store(app):
+    """Derive cache and rate-limit settings from ``SHARED_STORE_URL``."""
+    url = (app.config.get('SHARED_STORE_URL') or '').strip()
+    cfg = app.config
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        cfg.setdefault('CACHE_TYPE', 'RedisCache')
+        cfg.setdefault('CACHE_REDIS_URL', url)
+        cfg.setdefault('RATELIMIT_STORAGE_URI', url)
+    elif url.startswith('sqlite:'):
+        cfg.setdefault('CACHE_TYPE', 'SANALMUHASEBECIM.sharedstore.SQLiteCache')
+        cfg.setdefault('CACHE_SQLITE_PATH', _sqlite_path(url))
+        cfg.setdefault('RATELIMIT_STORAGE_URI', url)
+    else:
+        cfg.setdefault('CACHE_TYPE', 'SimpleCache')
+        cfg.setdefault('RATELIMIT_STORAGE_URI', 'memory://')
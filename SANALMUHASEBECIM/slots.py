@@ -0,0 +1,260 @@
+"""Randevu dilimi motoru.
+
+Bir günün alınabilir dilimleri ``BOOKING_WORKING_HOURS`` ve
+``BOOKING_SLOT_MINUTES`` ayarlarından hesaplanır::
+
+    BOOKING_WORKING_HOURS = "mon-fri 09:00-12:00 13:00-18:00; sat 10:00-14:00"
+
+Dolu dilimler ``slot_reservation`` tablosunda tutulur; birincil anahtar
+(personel, başlangıç) olduğundan aynı dilim için ikinci ekleme veritabanında
+reddedilir ve eşzamanlı iki istek aynı saati alamaz. Randevu iptal edilince ya
+da silinince rezervasyon kaldırılır; iptal edilmiş bir randevuyu yeniden
+etkinleştiren kod dilimi ``reserve`` ile tekrar almalıdır.
+
+Bir ayın dolu dilimleri tek aralık sorgusuyla okunur ve cache'lenir
+(``slots:month:<personel>:<yyyy-mm>``); rezervasyon eklenip silindiğinde
+commit sonrası ilgili ay cache'ten düşer.
+"""
+import calendar
+import re
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import object_session
+
+from SANALMUHASEBECIM.extensions import cache, db
+from SANALMUHASEBECIM.models import Appointment, SlotReservation
+
+DEFAULT_STAFF = 0
+ACTIVE_STATUSES = ('pending', 'email_confirmed', 'confirmed', 'awaiting_payment', 'paid')
+RELEASE_STATUSES = ('cancelled',)
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+_RANGE_RE = re.compile(r'^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$')
+
+
+class SlotTaken(Exception):
+    """The requested slot is already reserved."""
+
+
+class SlotUnavailable(Exception):
+    """The requested time is outside working hours or not aligned to a slot."""
+
+
+# --- Çalışma saatleri ---------------------------------------------------------
+
+def _weekday_set(spec):
+    days = set()
+    for part in spec.split(','):
+        if '-' in part:
+            first, last = (WEEKDAYS.index(p) for p in part.split('-', 1))
+            days.update(range(first, last + 1))
+        else:
+            days.add(WEEKDAYS.index(part))
+    return days
+
+
+@lru_cache(maxsize=8)
+def parse_working_hours(spec):
+    """Parse ``"mon-fri 09:00-18:00; sat 10:00-14:00"`` into ``{weekday: [(start, end), ...]}``."""
+    hours = {}
+    for entry in filter(None, (e.strip().lower() for e in spec.split(';'))):
+        days, *ranges = entry.split()
+        try:
+            weekdays = _weekday_set(days)
+        except ValueError:
+            raise ValueError(f"Invalid weekday in BOOKING_WORKING_HOURS: {days!r}")
+        for value in ranges:
+            match = _RANGE_RE.match(value)
+            if not match:
+                raise ValueError(f"Invalid time range in BOOKING_WORKING_HOURS: {value!r}")
+            h1, m1, h2, m2 = map(int, match.groups())
+            for weekday in weekdays:
+                hours.setdefault(weekday, []).append((time(h1, m1), time(h2, m2)))
+    return {weekday: sorted(ranges) for weekday, ranges in hours.items()}
+
+
+def _slot_minutes():
+    return int(current_app.config.get('BOOKING_SLOT_MINUTES', 30))
+
+
+def day_slots(day):
+    """Bookable slot start times of ``day`` according to working hours."""
+    hours = parse_working_hours(current_app.config.get('BOOKING_WORKING_HOURS') or '')
+    step = timedelta(minutes=_slot_minutes())
+    slots = []
+    for start, end in hours.get(day.weekday(), ()):
+        current = datetime.combine(day, start)
+        limit = datetime.combine(day, end)
+        while current + step <= limit:
+            slots.append(current)
+            current += step
+    return slots
+
+
+def slot_choices():
+    """``(value, label)`` pairs of every slot time across the week, for form select fields."""
+    monday = date(2024, 1, 1)
+    times = sorted({s.strftime('%H:%M') for offset in range(7) for s in day_slots(monday + timedelta(days=offset))})
+    return [(t, t) for t in times]
+
+
+def check_bookable(starts_at):
+    if starts_at not in day_slots(starts_at.date()):
+        raise SlotUnavailable(starts_at)
+
+
+# --- Aylık doluluk ------------------------------------------------------------
+
+def _month_key(staff_id, year, month):
+    return f'slots:month:{staff_id}:{year:04d}-{month:02d}'
+
+
+def taken_slots(year, month, staff_id=DEFAULT_STAFF):
+    """``{'YYYY-MM-DD': ['HH:MM', ...]}`` of reserved slots in a month (one range query, cached)."""
+    key = _month_key(staff_id, year, month)
+    taken = cache.get(key)
+    if taken is None:
+        start = datetime(year, month, 1)
+        end = datetime(year + (month == 12), month % 12 + 1, 1)
+        rows = db.session.execute(
+            select(SlotReservation.starts_at)
+            .where(
+                SlotReservation.staff_id == staff_id,
+                SlotReservation.starts_at >= start,
+                SlotReservation.starts_at < end,
+            )
+            .order_by(SlotReservation.starts_at)
+        ).scalars()
+        taken = {}
+        for starts_at in rows:
+            taken.setdefault(starts_at.strftime('%Y-%m-%d'), []).append(starts_at.strftime('%H:%M'))
+        cache.set(key, taken, timeout=current_app.config.get('BOOKING_AVAILABILITY_TIMEOUT', 3600))
+    return taken
+
+
+def month_availability(year, month, staff_id=DEFAULT_STAFF, now=None):
+    """Free and taken slot times for every day of a month; past slots are not offered."""
+    now = now or datetime.now()
+    taken = taken_slots(year, month, staff_id)
+    days = {}
+    for day_number in range(1, calendar.monthrange(year, month)[1] + 1):
+        day = date(year, month, day_number)
+        key = day.isoformat()
+        day_taken = taken.get(key, [])
+        free = [
+            s.strftime('%H:%M') for s in day_slots(day)
+            if s > now and s.strftime('%H:%M') not in day_taken
+        ]
+        days[key] = {'free': free, 'taken': day_taken}
+    return days
+
+
+# --- Rezervasyon --------------------------------------------------------------
+
+def reserve(appointment, staff_id=None, check_hours=True):
+    """Reserve ``appointment.appointment_datetime`` for the appointment inside a savepoint.
+
+    Raises ``SlotUnavailable`` for times outside working hours and ``SlotTaken``
+    when another appointment holds the slot. The outer transaction is left
+    intact; the caller commits or rolls back.
+    """
+    if check_hours:
+        check_bookable(appointment.appointment_datetime)
+    if appointment.id is None:
+        db.session.flush()
+    try:
+        with db.session.begin_nested():
+            db.session.add(SlotReservation(
+                staff_id=staff_id if staff_id is not None else (appointment.staff_id or DEFAULT_STAFF),
+                starts_at=appointment.appointment_datetime,
+                appointment_id=appointment.id,
+            ))
+    except IntegrityError:
+        raise SlotTaken(appointment.appointment_datetime)
+
+
+def _mark_month(session_, staff_id, starts_at):
+    session_.info.setdefault('slots_dirty', set()).add((staff_id, starts_at.year, starts_at.month))
+
+
+def _release(connection, session_, condition):
+    rows = connection.execute(
+        select(SlotReservation.staff_id, SlotReservation.starts_at).where(condition)
+    ).all()
+    if rows:
+        connection.execute(delete(SlotReservation).where(condition))
+        if session_ is not None:
+            for staff_id, starts_at in rows:
+                _mark_month(session_, staff_id, starts_at)
+
+
+def release_for_user(user_id):
+    """Drop reservations of a user's appointments before they are bulk-deleted."""
+    appointment_ids = select(Appointment.id).where(Appointment.user_id == user_id)
+    _release(db.session.connection(), db.session, SlotReservation.appointment_id.in_(appointment_ids))
+
+
+@event.listens_for(SlotReservation, 'after_insert')
+@event.listens_for(SlotReservation, 'after_delete')
+def _reservation_changed(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None:
+        _mark_month(session_, target.staff_id, target.starts_at)
+
+
+@event.listens_for(Appointment, 'after_update')
+def _release_cancelled(mapper, connection, target):
+    if target.status in RELEASE_STATUSES and db.inspect(target).attrs.status.history.has_changes():
+        _release(connection, object_session(target), SlotReservation.appointment_id == target.id)
+
+
+@event.listens_for(Appointment, 'before_delete')
+def _release_deleted(mapper, connection, target):
+    _release(connection, object_session(target), SlotReservation.appointment_id == target.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _flush_month_cache(session_):
+    dirty = session_.info.pop('slots_dirty', None)
+    if dirty:
+        try:
+            cache.delete_many(*(_month_key(*entry) for entry in dirty))
+        except Exception as e:
+            current_app.logger.warning(f"Slot cache invalidation failed: {e}")
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_month_cache_changes(session_):
+    session_.info.pop('slots_dirty', None)
+
+
+slots_cli = AppGroup('slots', help='Booking slot commands.')
+
+
+@slots_cli.command('sync')
+def sync_command():
+    """Reserve slots for active upcoming appointments that have none."""
+    reserved = conflicts = 0
+    appointments = Appointment.query \
+        .outerjoin(SlotReservation, SlotReservation.appointment_id == Appointment.id) \
+        .filter(SlotReservation.appointment_id.is_(None)) \
+        .filter(Appointment.status.in_(ACTIVE_STATUSES)) \
+        .filter(Appointment.appointment_datetime >= datetime.now()) \
+        .order_by(Appointment.id) \
+        .all()
+    for appointment in appointments:
+        try:
+            # Eski randevular çalışma saatleri dışında olabilir; yalnızca çakışma kontrol edilir
+            reserve(appointment, check_hours=False)
+            reserved += 1
+        except SlotTaken:
+            conflicts += 1
+            click.echo(f"Appointment #{appointment.id} ({appointment.appointment_datetime:%d.%m.%Y %H:%M}) could not be reserved.")
+    db.session.commit()
+    click.echo(f"{reserved} slots reserved, {conflicts} conflicts.")
@@ -0,0 +1,189 @@
+"""İstek başına SQL ölçümü ve N+1 dedektörü (opsiyonel).
+
+``SQL_INSTRUMENTATION`` açıkken SQLAlchemy engine olayları her isteğin sorgu
+sayısını, toplam veritabanı süresini ve sorgu kalıplarını (parametreler ve
+``IN (?, ?, ...)`` listeleri sadeleştirilmiş SQL) ``g`` üzerinde toplar.
+Aynı kalıp bir istekte ``SQL_N1_THRESHOLD`` kez ya da daha fazla çalışırsa
+olası N+1 olarak işaretlenir ve eşiğe ulaşıldığı anda çağıran uygulama satırı
+(``blueprints/admin/routes.py:412`` gibi) kaydedilir.
+
+Sonuçlar:
+
+* yanıt başlıkları: ``X-SQL-Queries``, ``X-SQL-Time-ms``, ``X-SQL-N1`` ve
+  tarayıcı geliştirici araçlarında görünen ``Server-Timing: db;dur=...``,
+* ``sanalmuhasebecim.sql`` logger'ına istek başına tek satır JSON
+  (N+1 varsa ya da ``SQL_LOG_MIN_QUERIES`` aşılırsa WARNING, diğerleri DEBUG),
+* ``SQL_DEBUG_PANEL`` açıksa yöneticilere HTML sayfaların altında küçük bir panel.
+
+Kapalıyken hiçbir olay dinleyicisi kurulmaz; ek maliyet yoktur.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from markupsafe import escape
+from sqlalchemy import event
+
+from SANALMUHASEBECIM.extensions import db
+
+logger = logging.getLogger('sanalmuhasebecim.sql')
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+_IN_LIST_RE = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+|@P\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|@P\d+))+\s*\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SPACE_RE = re.compile(r'\s+')
+_SKIP_ENDPOINTS = ('static',)
+MAX_SHAPE_LENGTH = 500
+
+
+def statement_shape(statement):
+    """Normalize a SQL statement so that the same query with different parameters compares equal."""
+    shape = _STRING_RE.sub('?', statement)
+    shape = _IN_LIST_RE.sub('(?)', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+def _caller():
+    """First stack frame inside the application package (excluding this module)."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_PACKAGE_DIR) and filename != _THIS_FILE:
+            return f"{os.path.relpath(filename, _PACKAGE_DIR)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+class RequestStats:
+    __slots__ = ('count', 'seconds', 'shapes', 'locations', 'threshold')
+
+    def __init__(self, threshold):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.locations = {}
+        self.threshold = threshold
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.threshold and shape not in self.locations:
+            self.locations[shape] = _caller()
+
+    def suspects(self):
+        """Statement shapes repeated at least ``threshold`` times, most frequent first."""
+        return [
+            {'shape': shape[:MAX_SHAPE_LENGTH], 'count': count, 'location': self.locations.get(shape)}
+            for shape, count in self.shapes.most_common()
+            if count >= self.threshold
+        ]
+
+    @property
+    def milliseconds(self):
+        return round(self.seconds * 1000, 1)
+
+
+def current_stats():
+    """Stats of the running request, or None when instrumentation is off."""
+    return g.get('_sqlstats') if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get('_sqlstats') is not None:
+        conn.info.setdefault('_sqlstats_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_sqlstats_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def _panel_html(stats, suspects):
+    rows = ''.join(
+        f"<tr><td style='padding:2px 6px;text-align:right'>{s['count']}×</td>"
+        f"<td style='padding:2px 6px'>{escape(s['location'] or '-')}</td>"
+        f"<td style='padding:2px 6px;font-family:monospace'>{escape(s['shape'][:160])}</td></tr>"
+        for s in suspects
+    )
+    color = '#b91c1c' if suspects else '#065f46'
+    return (
+        "<div id='sql-debug-panel' style='position:fixed;bottom:8px;left:8px;z-index:99999;max-width:90vw;"
+        "background:#fff;border:1px solid #cbd5e1;border-radius:6px;box-shadow:0 2px 8px rgba(0,0,0,.15);"
+        "font:12px/1.4 Arial,sans-serif;color:#0f172a;padding:6px 8px;opacity:.95'>"
+        f"<b style='color:{color}'>SQL: {stats.count} sorgu, {stats.milliseconds} ms"
+        f"{f', {len(suspects)} olası N+1' if suspects else ''}</b>"
+        f"{f'<table style=margin-top:4px>{rows}</table>' if rows else ''}"
+        "</div>"
+    )
+
+
+def _show_panel(app, response):
+    if not app.config.get('SQL_DEBUG_PANEL') or response.direct_passthrough:
+        return False
+    if response.mimetype != 'text/html' or response.status_code != 200:
+        return False
+    if app.debug:
+        return True
+    from flask_login import current_user
+    return bool(getattr(current_user, 'is_admin', False))
+
+
+def init_sqlstats(app):
+    """Install engine listeners and request hooks when ``SQL_INSTRUMENTATION`` is enabled."""
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def _start_sqlstats():
+        if request.endpoint not in _SKIP_ENDPOINTS:
+            g._sqlstats = RequestStats(app.config.get('SQL_N1_THRESHOLD', 5))
+
+    @app.after_request
+    def _report_sqlstats(response):
+        stats = g.pop('_sqlstats', None)
+        if stats is None:
+            return response
+        suspects = stats.suspects()
+        response.headers['X-SQL-Queries'] = str(stats.count)
+        response.headers['X-SQL-Time-ms'] = str(stats.milliseconds)
+        response.headers['X-SQL-N1'] = str(len(suspects))
+        response.headers.add('Server-Timing', f'db;dur={stats.milliseconds};desc="{stats.count} queries"')
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': stats.milliseconds,
+            'n_plus_one': suspects,
+        }
+        noisy = suspects or stats.count >= app.config.get('SQL_LOG_MIN_QUERIES', 30)
+        logger.log(logging.WARNING if noisy else logging.DEBUG, json.dumps(record, ensure_ascii=False))
+
+        if _show_panel(app, response):
+            body = response.get_data(as_text=True)
+            panel = _panel_html(stats, suspects)
+            index = body.rfind('</body>')
+            response.set_data(body[:index] + panel + body[index:] if index != -1 else body + panel)
+        return response
@@ -0,0 +1,187 @@
+"""Uygulama açılışı: veritabanı kurulumu, varsayılan hesaplar ve açılış ölçümleri.
+
+``create_app`` eskiden her worker açılışında ``db.create_all()``, SQLite sütun
+yamaları ve ``seed_default_users`` (iki sorgu + commit) çalıştırıyordu. Artık
+bunlar yalnızca ``DB_AUTO_SETUP`` açıkken (geliştirme/test varsayılanı) açılışta
+yapılır; production'da açık CLI komutlarıyla bir kez çalıştırılır::
+
+    flask setup schema     # tablolar + SQLite sütun yamaları (MSSQL: flask db upgrade)
+    flask setup seed       # admin@example.com / user@example.com
+    flask setup all
+    flask setup timings    # içe aktarma ve açılış süreleri (JSON)
+
+Böylece çok sayıda worker aynı anda soğuk açıldığında veritabanına dokunulmaz.
+Açılış aşamalarının süreleri ``app.extensions['startup_metrics']`` içinde tutulur
+ve ``sanalmuhasebecim.startup`` logger'ına tek satır JSON olarak yazılır.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+logger = logging.getLogger('sanalmuhasebecim.startup')
+
+
+class StartupMetrics:
+    """Wall-clock durations of the ``create_app`` phases, in milliseconds."""
+
+    def __init__(self, import_seconds):
+        self.started = time.perf_counter()
+        self.import_ms = round(import_seconds * 1000, 1)
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def finish(self, app):
+        record = {
+            'config': app.config.get('FLASK_ENV') or ('testing' if app.testing else None),
+            'import_ms': self.import_ms,
+            'startup_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'phases': self.phases,
+            'db_setup': bool(app.config.get('DB_AUTO_SETUP')),
+        }
+        app.extensions['startup_metrics'] = record
+        logger.info(json.dumps(record))
+        return record
+
+
+def _add_sqlite_column(db, table, column, ddl, index=False):
+    """Add a column to an existing SQLite dev table; returns True if it was missing."""
+    from sqlalchemy import text
+    try:
+        db.session.execute(text(f'SELECT {column} FROM "{table}" LIMIT 1'))
+        return False
+    except Exception:
+        db.session.rollback()
+    try:
+        db.session.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+        if index:
+            db.session.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON "{table}" ({column})'))
+        db.session.commit()
+        return True
+    except Exception:
+        db.session.rollback()
+        return False
+
+
+def prepare_schema(app):
+    """Create tables and patch columns on SQLite (no migrations needed for a quick local run).
+
+    Returns False for other databases, which are managed with Alembic (``flask db upgrade``).
+    """
+    with app.app_context():
+        from SANALMUHASEBECIM.extensions import db
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if 'sqlite' not in uri:
+            return False
+        import SANALMUHASEBECIM.models  # noqa: F401 - create_all tabloları görebilsin
+        from sqlalchemy import text
+        db.create_all()
+        # Add seen_notifications column if missing (e.g. DB created before it was in model)
+        _add_sqlite_column(db, 'user', 'seen_notifications', 'TEXT')
+        # Admin araması için search_text sütunları; eklenince mevcut kayıtlar indekslenir
+        added = [_add_sqlite_column(db, table, 'search_text', 'VARCHAR(255)', index=True)
+                 for table in ('user', 'Appointments', 'ticket', 'subscriber')]
+        if any(added):
+            from SANALMUHASEBECIM.adminsearch import rebuild as rebuild_admin_search
+            rebuild_admin_search()
+        # İçerik adresli medya deposu alanları
+        _add_sqlite_column(db, 'media', 'sha256', 'VARCHAR(64)', index=True)
+        _add_sqlite_column(db, 'media', 'variants', 'VARCHAR(100)')
+        # Beğeni/yorum sayaçları; eklenince mevcut kayıtlardan sayılır
+        added = [_add_sqlite_column(db, 'post', column, 'INTEGER NOT NULL DEFAULT 0')
+                 for column in ('like_count', 'comment_count')]
+        if any(added):
+            from SANALMUHASEBECIM.counters import reconcile as reconcile_counters
+            reconcile_counters()
+        # Faturalama hatırlatma aşaması
+        _add_sqlite_column(db, 'monthly_payment', 'reminder_level', 'SMALLINT NOT NULL DEFAULT 0')
+        # create_all mevcut tablolara sonradan eklenen indeksleri oluşturmaz
+        existing = {name for name, in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+        if not {'uq_like_user_post', 'uq_comment_like_user_comment'} <= existing:
+            # Benzersiz beğeni indeksleri yinelenen satırlar varken oluşturulamaz
+            from SANALMUHASEBECIM.likes import remove_duplicates
+            if remove_duplicates():
+                from SANALMUHASEBECIM.counters import reconcile as reconcile_counters
+                reconcile_counters()
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(db.engine)
+    return True
+
+
+def seed_default_users(app):
+    """Create default admin and user if they do not exist; returns the e-mails created."""
+    from werkzeug.security import generate_password_hash
+    created = []
+    with app.app_context():
+        from SANALMUHASEBECIM.extensions import db
+        from SANALMUHASEBECIM.models import User
+        try:
+            existing = set(db.session.execute(
+                db.select(User.email).where(User.email.in_(['admin@example.com', 'user@example.com']))
+            ).scalars())
+            if 'admin@example.com' not in existing:
+                admin = User(name='Admin', email='admin@example.com', password=generate_password_hash('admin'))
+                admin.is_admin = True
+                admin.email_confirmed = True
+                db.session.add(admin)
+                created.append(admin.email)
+            if 'user@example.com' not in existing:
+                user = User(name='User', email='user@example.com', password=generate_password_hash('user'))
+                user.email_confirmed = True
+                db.session.add(user)
+                created.append(user.email)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            created = []
+    return created
+
+
+startup_cli = AppGroup('setup', help='Database setup and startup diagnostics.')
+
+
+@startup_cli.command('schema')
+@with_appcontext
+def schema_command():
+    """Create tables and apply SQLite column patches."""
+    if prepare_schema(current_app._get_current_object()):
+        click.echo('Schema ready.')
+    else:
+        click.echo('Not SQLite: run "flask db upgrade" to apply migrations.')
+
+
+@startup_cli.command('seed')
+@with_appcontext
+def seed_command():
+    """Create the default admin and user accounts."""
+    created = seed_default_users(current_app._get_current_object())
+    click.echo(f"Created: {', '.join(created)}" if created else 'Default users already exist.')
+
+
+@startup_cli.command('all')
+@click.pass_context
+def all_command(ctx):
+    """Run schema and seed."""
+    ctx.invoke(schema_command)
+    ctx.invoke(seed_command)
+
+
+@startup_cli.command('timings')
+@with_appcontext
+def timings_command():
+    """Print import and startup durations of this process."""
+    metrics = current_app.extensions.get('startup_metrics') or {}
+    click.echo(json.dumps(metrics, indent=2))
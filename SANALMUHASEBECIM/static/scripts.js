@@ -814,6 +814,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const dateInput = bookingForm.querySelector('input[type="date"]');
         const timeInput = bookingForm.querySelector('input[type="time"]');
         
+        const monthAvailability = {};
         if (dateInput) {
             // Set minimum date to 2 days from today (yarına alamazsın kuralı)
             const today = new Date();
@@ -824,11 +825,17 @@ document.addEventListener('DOMContentLoaded', function() {
             
             dateInput.addEventListener('change', function() {
                 validateDateTime();
-                // Fetch availability for the selected date
+                // Ayın doluluğu tek çağrıda alınır; aynı ay içindeki tarih değişiklikleri istek atmaz
                 const val = this.value;
                 if (!val) return;
-                fetch(`/booking/availability?date=${val}`)
-                  .then(r => r.json())
+                const month = val.slice(0, 7);
+                if (!monthAvailability[month]) {
+                    monthAvailability[month] = fetch(`/booking/availability?month=${month}`)
+                      .then(r => r.json())
+                      .catch(err => { delete monthAvailability[month]; throw err; });
+                }
+                monthAvailability[month]
+                  .then(monthData => ({ times: ((monthData.days || {})[val] || {}).taken || [] }))
                   .then(data => {
                       const timeInput = bookingForm.querySelector('input[type="time"]');
                       if (!timeInput) return;
@@ -0,0 +1,209 @@
+"""Statik dosya teslimi: parmak izli URL'ler, uzun süreli cache ve ön sıkıştırma.
+
+* ``url_for('static', filename='styles.css')`` içerik özetine göre
+  ``/static/styles.3f2a9c1d0b7e.css`` üretir; bu URL'ler bir yıl ``immutable``
+  olarak cache'lenir, dosya değişince URL de değişir.
+* Parmak izsiz istekler (ör. TinyMCE'nin kendi yüklediği eklentiler) ETag ile
+  ``STATIC_MAX_AGE`` saniye cache'lenir; koşullu istekler 304 döner.
+* Range istekleri (büyük PDF'ler) ve ``USE_X_SENDFILE`` werkzeug'un
+  ``send_file`` desteğiyle karşılanır.
+* Metin dosyalarının ``.gz`` (ve ``brotli`` kuruluysa ``.br``) kopyaları
+  ``flask static compress`` ile ya da ilk istekte üretilir ve
+  ``Accept-Encoding`` izin veriyorsa onlar gönderilir.
+
+Yükleme klasörü parmak izine dahil edilmez: oradaki URL'ler veritabanında
+saklanır, medya dosyaları zaten içerik özetiyle adlandırılır.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+import click
+from flask import current_app, request, send_file
+from flask.cli import AppGroup
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # opsiyonel bağımlılık
+    brotli = None
+
+FINGERPRINT_LENGTH = 12
+IMMUTABLE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = ('.css', '.js', '.mjs', '.svg', '.json', '.map', '.html', '.txt', '.xml', '.ico')
+MIN_COMPRESS_SIZE = 1024
+
+_FINGERPRINTED_RE = re.compile(rf'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{{{FINGERPRINT_LENGTH}}})(?P<ext>\.[^./]+)$')
+_CONTENT_ADDRESSED_RE = re.compile(r'(^|/)[0-9a-f]{64}(\.[a-z0-9]+)*$')
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def _static_root(app=None):
+    return (app or current_app).static_folder
+
+
+def _excluded_prefixes(app):
+    prefixes = list(app.config.get('STATIC_FINGERPRINT_EXCLUDE') or ())
+    try:
+        upload = os.path.relpath(app.config.get('UPLOAD_FOLDER') or '', app.static_folder)
+    except ValueError:  # Windows: farklı sürücü
+        upload = '..'
+    if not upload.startswith('..'):
+        prefixes.append(upload.replace('\\', '/').rstrip('/') + '/')
+    return tuple(prefixes)
+
+
+def file_digest(path):
+    """Return the (cached) short content hash of a static file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _digests.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()[:FINGERPRINT_LENGTH]
+    with _digests_lock:
+        _digests[path] = (key, value)
+    return value
+
+
+def asset_path(filename, app=None):
+    """Map ``styles.css`` to ``styles.<hash>.css``; other names are returned unchanged."""
+    app = app or current_app
+    if not app.config.get('STATIC_FINGERPRINT', True) or filename.startswith(_excluded_prefixes(app)):
+        return filename
+    path = safe_join(_static_root(app), filename)
+    if path is None or not os.path.isfile(path):
+        return filename
+    digest = file_digest(path)
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{digest}{ext}' if ext else f'{filename}.{digest}'
+
+
+def _resolve(filename):
+    """Return (real filename, fingerprint matches) for a requested static name."""
+    root = _static_root()
+    path = safe_join(root, filename)
+    if path and os.path.isfile(path):
+        return filename, bool(_CONTENT_ADDRESSED_RE.search(filename))
+    match = _FINGERPRINTED_RE.match(filename)
+    if match:
+        original = match.group('stem') + match.group('ext')
+        path = safe_join(root, original)
+        if path and os.path.isfile(path):
+            return original, file_digest(path) == match.group('digest')
+    raise NotFound()
+
+
+def _accepted_encodings():
+    header = request.headers.get('Accept-Encoding', '')
+    accepted = {part.split(';', 1)[0].strip().lower() for part in header.split(',')}
+    return [enc for enc in ('br', 'gzip') if enc in accepted and (enc != 'br' or brotli is not None)]
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compressed_variant(path, encoding, create=True):
+    """Return the path of an up-to-date ``.gz``/``.br`` sidecar, creating it if needed."""
+    suffix = '.br' if encoding == 'br' else '.gz'
+    target = path + suffix
+    try:
+        source_mtime = os.stat(path).st_mtime_ns
+        if os.path.exists(target) and os.stat(target).st_mtime_ns >= source_mtime:
+            return target
+        if not create:
+            return None
+        with open(path, 'rb') as f:
+            data = _compress(f.read(), encoding)
+        tmp_path = f'{target}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+        return target
+    except OSError as e:
+        # Salt okunur dağıtımlarda sıkıştırılmamış dosya gönderilir
+        current_app.logger.debug(f"Static compression skipped for {path}: {e}")
+        return None
+
+
+def serve_static(filename):
+    """Replacement for Flask's static view with fingerprint and encoding support."""
+    filename, immutable = _resolve(filename)
+    path = safe_join(_static_root(), filename)
+    compressible = filename.endswith(COMPRESSIBLE) and os.path.getsize(path) >= MIN_COMPRESS_SIZE
+    served, encoding = path, None
+    if compressible and 'Range' not in request.headers:
+        for candidate in _accepted_encodings():
+            variant = compressed_variant(path, candidate, create=current_app.config.get('STATIC_COMPRESS_ON_DEMAND', True))
+            if variant:
+                served, encoding = variant, candidate
+                break
+
+    response = send_file(
+        served,
+        mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        conditional=True,
+        etag=True,
+        max_age=None,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if compressible:
+        response.vary.add('Accept-Encoding')
+    if immutable:
+        response.headers['Cache-Control'] = IMMUTABLE
+    else:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('STATIC_MAX_AGE', 3600)
+    return response
+
+
+def init_static(app):
+    """Install fingerprinted ``url_for('static')`` and the caching static view."""
+    @app.url_defaults
+    def _fingerprint_static(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = asset_path(values['filename'], app)
+
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = serve_static
+
+
+static_cli = AppGroup('static', help='Static asset commands.')
+
+
+@static_cli.command('compress')
+def compress_command():
+    """Precompress text assets to .gz (and .br when brotli is installed)."""
+    root = _static_root()
+    excluded = _excluded_prefixes(current_app)
+    encodings = ['gzip'] + (['br'] if brotli is not None else [])
+    count = 0
+    for dirpath, _, files in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace('\\', '/')
+        if (rel_dir + '/').startswith(excluded):
+            continue
+        for name in files:
+            path = os.path.join(dirpath, name)
+            if name.endswith(COMPRESSIBLE) and os.path.getsize(path) >= MIN_COMPRESS_SIZE:
+                for encoding in encodings:
+                    compressed_variant(path, encoding)
+                count += 1
+    click.echo(f"Compressed {count} files ({', '.join(encodings)}).")
@@ -0,0 +1,154 @@
+"""Helpdesk sohbetleri için long-poll bildirimcisi.
+
+Her ticket'ın son mesaj id'si, sahibi ve durumu paylaşılan cache'te tutulur
+(``helpdesk:ticket:<id>``). ``TicketMessage`` eklenince ya da ticket durumu
+değişince commit sonrası durum veritabanındaki commit edilmiş değerlerden
+yeniden okunup cache'e yazılır ve aynı süreçte bekleyen istekler
+``threading.Condition`` ile uyandırılır; diğer worker'lardaki bekleyiciler
+cache'i ``HELPDESK_POLL_INTERVAL`` aralıklarla okuyarak değişikliği görür.
+Bekleme sırasında veritabanına gidilmez.
+
+Cache'i dolduran bir okuyucu, eşzamanlı bir commit'ten önce okuduğu eski
+durumu yayından sonra yazabilir; bu yüzden kayıtlar kısa ömürlüdür
+(``STATE_TIMEOUT``) ve değişiklik görmeden biten bekleme veritabanındaki son
+mesaj id'sini bir kez kontrol eder.
+
+SSE yerine sınırlı süreli long-poll kullanılır: waitress'in thread havuzu
+küçüktür ve açık her sekme bir thread'i süresiz tutmamalıdır. Aynı anda
+bekleyen istek sayısı ``HELPDESK_MAX_WAITERS`` ile sınırlanır; sınır
+aşılınca yanıt beklemeden döner ve istemci normal aralıkla tekrar dener.
+Bekleyen istek havuzdan bağlantı tutmamalıdır: çağıran beklemeden önce
+oturumu kapatır (``db.session.close()``).
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import object_session
+
+from SANALMUHASEBECIM.extensions import cache, db
+from SANALMUHASEBECIM.models import Ticket, TicketMessage
+
+STATE_TIMEOUT = 60
+
+_changed = threading.Condition()
+_waiters = 0
+_waiters_lock = threading.Lock()
+
+
+def _state_key(ticket_id):
+    return f'helpdesk:ticket:{ticket_id}'
+
+
+def _load_state(connection, ticket_id):
+    row = connection.execute(
+        select(
+            Ticket.user_id,
+            Ticket.status,
+            select(func.max(TicketMessage.id)).where(TicketMessage.ticket_id == Ticket.id).scalar_subquery(),
+        ).where(Ticket.id == ticket_id)
+    ).first()
+    if row is None:
+        return None
+    return {'user_id': row[0], 'status': row[1], 'last_id': row[2] or 0}
+
+
+def ticket_state(ticket_id):
+    """Return ``{'user_id', 'status', 'last_id'}`` for a ticket, or None if it does not exist."""
+    state = cache.get(_state_key(ticket_id))
+    if state is not None:
+        return state
+    state = _load_state(db.session, ticket_id)
+    if state is None:
+        return None
+    # add: eşzamanlı bir publish'in yazdığı daha yeni durumu ezme
+    cache.add(_state_key(ticket_id), state, timeout=STATE_TIMEOUT)
+    return cache.get(_state_key(ticket_id)) or state
+
+
+def publish(ticket_id):
+    """Store the ticket's committed state and wake waiters in this process."""
+    # Commit sonrası oturum SQL çalıştıramaz; ayrı bağlantıdan commit edilmiş hâl okunur
+    with db.engine.connect() as connection:
+        state = _load_state(connection, ticket_id)
+    if state is None:
+        cache.delete(_state_key(ticket_id))
+    else:
+        cache.set(_state_key(ticket_id), state, timeout=STATE_TIMEOUT)
+    with _changed:
+        _changed.notify_all()
+
+
+def wait_for_change(ticket_id, last_id, status, timeout):
+    """Block until the ticket has a message after ``last_id`` or leaves ``status``.
+
+    Returns ``(state, waited)``; ``waited`` is False when the waiter limit was
+    reached and the call returned immediately. Close the session before calling
+    so no pooled connection is held while waiting.
+    """
+    global _waiters
+    cfg = current_app.config
+    with _waiters_lock:
+        if _waiters >= cfg.get('HELPDESK_MAX_WAITERS', 2):
+            return ticket_state(ticket_id), False
+        _waiters += 1
+    try:
+        interval = cfg.get('HELPDESK_POLL_INTERVAL', 1.0)
+        deadline = time.monotonic() + timeout
+        while True:
+            state = cache.get(_state_key(ticket_id))
+            if state is None:
+                # Cache'ten düşmüş: veritabanından yükle ve bağlantıyı hemen havuza bırak
+                state = ticket_state(ticket_id)
+                db.session.close()
+            remaining = deadline - time.monotonic()
+            if state is None or state['last_id'] > last_id or state['status'] != status:
+                return state, True
+            if remaining <= 0:
+                # Cache eski bir durumda kalmış olabilir: dönmeden önce bir kez doğrula
+                with db.engine.connect() as connection:
+                    fresh = _load_state(connection, ticket_id)
+                if fresh is None:
+                    cache.delete(_state_key(ticket_id))
+                elif fresh != state:
+                    cache.set(_state_key(ticket_id), fresh, timeout=STATE_TIMEOUT)
+                return fresh, True
+            with _changed:
+                _changed.wait(min(interval, remaining))
+    finally:
+        with _waiters_lock:
+            _waiters -= 1
+
+
+# --- Commit sonrası yayın -----------------------------------------------------
+
+@event.listens_for(TicketMessage, 'after_insert')
+def _collect_message(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None:
+        session_.info.setdefault('ticketstream', set()).add(target.ticket_id)
+
+
+@event.listens_for(Ticket, 'after_update')
+def _collect_status(mapper, connection, target):
+    session_ = object_session(target)
+    if session_ is not None and db.inspect(target).attrs.status.history.has_changes():
+        session_.info.setdefault('ticketstream', set()).add(target.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_changes(session_):
+    pending = session_.info.pop('ticketstream', None)
+    if not pending:
+        return
+    for ticket_id in pending:
+        try:
+            publish(ticket_id)
+        except Exception as e:
+            current_app.logger.warning(f"Ticket stream publish failed for ticket {ticket_id}: {e}")
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session_):
+    session_.info.pop('ticketstream', None)
@@ -0,0 +1,126 @@
+"""Helpdesk okunmamış mesaj sayacı.
+
+Navbar rozeti (context processor), ``helpdesk.index`` ve ``helpdesk.unread_count``
+aynı servisi kullanır: kullanıcının açık ticket'larındaki okunmamış mesajlar tek
+bir GROUP BY sorgusuyla sayılır ve kullanıcı bazında cache'lenir.
+"""
+from datetime import datetime
+
+from flask import session
+from sqlalchemy import and_, event, func, or_, select
+from sqlalchemy.orm import object_session
+
+from SANALMUHASEBECIM.extensions import cache, db
+from SANALMUHASEBECIM.models import Ticket, TicketMessage
+
+SESSION_KEY = 'ticket_last_seen'
+CLOSED_STATUSES = ('closed', 'completed')
+CACHE_TIMEOUT = 120
+
+
+def _cache_key(user_id):
+    return f"unread_tickets:{user_id}"
+
+
+def _last_seen_map():
+    """Return {ticket_id: datetime} parsed from the session."""
+    raw = session.get(SESSION_KEY, {}) or {}
+    parsed = {}
+    for key, value in raw.items():
+        try:
+            parsed[int(key)] = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            continue
+    return parsed
+
+
+def _query_unread_map(user_id, last_seen):
+    """Count unread messages of all open tickets of a user in one grouped query."""
+    conditions = [and_(TicketMessage.ticket_id == tid, TicketMessage.created_at > seen_dt)
+                  for tid, seen_dt in last_seen.items()]
+    if last_seen:
+        conditions.append(TicketMessage.ticket_id.notin_(list(last_seen.keys())))
+    stmt = (
+        select(TicketMessage.ticket_id, func.count(TicketMessage.id))
+        .join(Ticket, Ticket.id == TicketMessage.ticket_id)
+        .where(
+            Ticket.user_id == user_id,
+            Ticket.status.notin_(CLOSED_STATUSES),
+            TicketMessage.user_id != user_id,
+        )
+        .group_by(TicketMessage.ticket_id)
+    )
+    if conditions:
+        stmt = stmt.where(or_(*conditions))
+    return {tid: count for tid, count in db.session.execute(stmt)}
+
+
+def get_unread_map(user):
+    """Return {ticket_id: unread_count} for the user's open tickets.
+
+    Sonuç, session'daki "görüldü" zamanlarıyla birlikte cache'lenir; görüldü
+    bilgisi değişirse ya da yeni mesaj yazılırsa yeniden hesaplanır.
+    """
+    if not user or not user.is_authenticated or user.is_admin:
+        return {}
+    last_seen = _last_seen_map()
+    signature = {tid: dt.isoformat() for tid, dt in last_seen.items()}
+    key = _cache_key(user.id)
+    cached = cache.get(key)
+    if cached and cached.get('seen') == signature:
+        return cached['counts']
+    counts = _query_unread_map(user.id, last_seen)
+    cache.set(key, {'seen': signature, 'counts': counts}, timeout=CACHE_TIMEOUT)
+    return counts
+
+
+def get_unread_count(user):
+    """Return the total number of unread ticket messages for the user."""
+    return sum(get_unread_map(user).values())
+
+
+def invalidate_unread(user_id):
+    if user_id:
+        cache.delete(_cache_key(user_id))
+
+
+def mark_tickets_seen(user, ticket):
+    """Mark tickets as seen for the current session.
+
+    Müşteri bir sohbete girdiğinde tüm açık ticket'ları görülmüş sayılır (navbar
+    ve Yardım rozetleri sıfırlanır); admin için sadece ilgili ticket güncellenir.
+    """
+    last_seen_map = session.get(SESSION_KEY, {}) or {}
+    now_iso = datetime.utcnow().isoformat()
+    if not user.is_admin:
+        open_ids = db.session.execute(
+            select(Ticket.id).where(Ticket.user_id == user.id, Ticket.status.notin_(CLOSED_STATUSES))
+        ).scalars().all()
+        for tid in open_ids:
+            last_seen_map[str(tid)] = now_iso
+    else:
+        last_seen_map[str(ticket.id)] = now_iso
+    session[SESSION_KEY] = last_seen_map
+    invalidate_unread(user.id)
+
+
+# Yeni mesaj yazıldığında ticket sahibinin cache'i commit sonrası silinir
+@event.listens_for(TicketMessage, 'after_insert')
+def _collect_ticket_owner(mapper, connection, target):
+    owner_id = connection.execute(
+        select(Ticket.user_id).where(Ticket.id == target.ticket_id)
+    ).scalar()
+    session_ = object_session(target)
+    if owner_id and session_ is not None:
+        session_.info.setdefault('unread_dirty_users', set()).add(owner_id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _flush_unread_cache(session_):
+    for user_id in session_.info.pop('unread_dirty_users', ()):
+        invalidate_unread(user_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_unread_dirty(session_):
+    session_.info.pop('unread_dirty_users', None)
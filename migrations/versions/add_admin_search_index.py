@@ -0,0 +1,42 @@
+"""add admin search_text columns and trigram tokens
+
+Revision ID: add_admin_search_index
+Revises: add_outbound_email_queue
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_admin_search_index'
+down_revision = 'add_outbound_email_queue'
+branch_labels = None
+depends_on = None
+
+TABLES = ('user', 'Appointments', 'ticket', 'subscriber')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('search_text', sa.Unicode(length=255), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_search_text'), ['search_text'], unique=False)
+
+    op.create_table('search_token',
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('token', sa.Unicode(length=3), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('entity', 'token', 'entity_id')
+    )
+    op.create_index('ix_search_token_entity_id', 'search_token', ['entity', 'entity_id'], unique=False)
+    # Mevcut kayıtlar için: flask admin-search rebuild
+
+
+def downgrade():
+    op.drop_index('ix_search_token_entity_id', table_name='search_token')
+    op.drop_table('search_token')
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_search_text'))
+            batch_op.drop_column('search_text')
@@ -0,0 +1,30 @@
+"""add reminder_level and billing indexes to monthly_payment
+
+Revision ID: add_billing_run_fields
+Revises: add_slot_reservation
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_billing_run_fields'
+down_revision = 'add_slot_reservation'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('monthly_payment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reminder_level', sa.SmallInteger(), nullable=False, server_default='0'))
+        # Dönem başına tek satır: faturalama çalıştırması tekrarlanabilir
+        batch_op.create_index('uq_monthly_payment_lead_month', ['lead_id', 'payment_month'], unique=True)
+        batch_op.create_index('ix_monthly_payment_status_month', ['status', 'payment_month'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('monthly_payment', schema=None) as batch_op:
+        batch_op.drop_index('ix_monthly_payment_status_month')
+        batch_op.drop_index('uq_monthly_payment_lead_month')
+        batch_op.drop_column('reminder_level')
@@ -0,0 +1,45 @@
+"""add composite indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_billing_run_fields
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_billing_run_fields'
+branch_labels = None
+depends_on = None
+
+# (tablo, indeks, sütunlar, filtre) - models.py __table_args__ ile aynı.
+# Filtre MSSQL'de filtreli, SQLite'ta kısmi indeks olur.
+# monthly_payment (lead_id, payment_month) zaten uq_monthly_payment_lead_month ile kapsanıyor.
+INDEXES = (
+    ('ticket_message', 'ix_ticket_message_ticket_created', ['ticket_id', 'created_at', 'user_id'], None),
+    ('ticket', 'ix_ticket_user_status', ['user_id', 'status'], None),
+    ('ticket', 'ix_ticket_status_created', ['status', 'created_at'], None),
+    ('Appointments', 'ix_appointments_status_datetime', ['status', 'appointment_datetime'], None),
+    ('Appointments', 'ix_appointments_user_datetime', ['user_id', 'appointment_datetime'], 'user_id IS NOT NULL'),
+    ('lead', 'ix_lead_type_status_next_payment', ['lead_type', 'status', 'next_payment_date'], None),
+    ('post', 'ix_post_active_status_published', ['is_active', 'status', 'published_at'], None),
+    ('comment', 'ix_comment_post_thread', ['post_id', 'parent_id', 'is_approved', 'date'], None),
+    ('comment', 'ix_comment_pending_date', ['date'], 'is_approved = 0'),
+    ('like', 'ix_like_post_user', ['post_id', 'user_id'], None),
+    ('media', 'ix_media_user_created', ['user_id', 'created_at'], None),
+)
+
+
+def upgrade():
+    for table, name, columns, where in INDEXES:
+        kwargs = {}
+        if where:
+            kwargs = {'mssql_where': sa.text(where), 'sqlite_where': sa.text(where)}
+        op.create_index(name, table, columns, unique=False, **kwargs)
+
+
+def downgrade():
+    for table, name, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
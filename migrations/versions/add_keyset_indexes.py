@@ -0,0 +1,36 @@
+"""add ordering indexes for keyset pagination
+
+Revision ID: add_keyset_indexes
+Revises: add_like_unique_indexes
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_keyset_indexes'
+down_revision = 'add_like_unique_indexes'
+branch_labels = None
+depends_on = None
+
+# (tablo, indeks, sütunlar) - models.py __table_args__ ile aynı.
+# Admin listeleri (sıralama_sütunu, id) ile sayfalanır; birincil anahtar
+# SQLite'ta (rowid) ve MSSQL'de (kümelenmiş anahtar) indekse zaten eklenir.
+INDEXES = (
+    ('user', 'ix_user_created', ['created_at']),
+    ('comment', 'ix_comment_date', ['date']),
+    ('Appointments', 'ix_appointments_datetime', ['appointment_datetime']),
+    ('ticket', 'ix_ticket_created', ['created_at']),
+    ('subscriber', 'ix_subscriber_created', ['created_at']),
+    ('lead', 'ix_lead_created', ['created_at']),
+)
+
+
+def upgrade():
+    for table, name, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,41 @@
+"""unique (user, post) and (user, comment) likes
+
+Revision ID: add_like_unique_indexes
+Revises: add_hot_path_indexes
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_like_unique_indexes'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+# (tablo, benzersiz indeks, hedef sütun, sayaç tablosu)
+LIKES = (
+    ('like', 'uq_like_user_post', 'post_id', 'post'),
+    ('comment_like', 'uq_comment_like_user_comment', 'comment_id', 'comment'),
+)
+
+
+def upgrade():
+    for table_name, index_name, fk, counter_table in LIKES:
+        like = sa.table(table_name, sa.column('id', sa.Integer), sa.column('user_id', sa.Integer), sa.column(fk, sa.Integer))
+        # Çift tıklamalardan kalan yinelenen satırlar: en eskisi kalır
+        keep = sa.select(sa.func.min(like.c.id)).group_by(like.c.user_id, like.c[fk])
+        op.execute(like.delete().where(like.c.id.notin_(keep)))
+        op.create_index(index_name, table_name, ['user_id', fk], unique=True)
+
+        # Yinelenenler sayaçları şişirmişti; kalan satırlardan yeniden say
+        counter = sa.table(counter_table, sa.column('id', sa.Integer), sa.column('like_count', sa.Integer))
+        op.execute(counter.update().values(
+            like_count=sa.select(sa.func.count()).where(like.c[fk] == counter.c.id).scalar_subquery(),
+        ))
+
+
+def downgrade():
+    for table_name, index_name, _, _ in reversed(LIKES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,29 @@
+"""add media content hash and derivatives
+
+Revision ID: add_media_content_hash
+Revises: add_admin_search_index
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_content_hash'
+down_revision = 'add_admin_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('variants', sa.String(length=100), nullable=True))
+        batch_op.create_index(batch_op.f('ix_media_sha256'), ['sha256'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_sha256'))
+        batch_op.drop_column('variants')
+        batch_op.drop_column('sha256')
@@ -0,0 +1,33 @@
+"""add newsletter_delivery table for per-post newsletter progress
+
+Revision ID: add_newsletter_delivery
+Revises: billing_due_status
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_newsletter_delivery'
+down_revision = 'billing_due_status'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('newsletter_delivery',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('subscriber_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['subscriber_id'], ['subscriber.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_newsletter_delivery_post_subscriber', 'newsletter_delivery', ['post_id', 'subscriber_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_newsletter_delivery_post_subscriber', table_name='newsletter_delivery')
+    op.drop_table('newsletter_delivery')
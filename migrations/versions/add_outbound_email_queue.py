@@ -0,0 +1,39 @@
+"""add outbound email queue
+
+Revision ID: add_outbound_email_queue
+Revises: 1f16d6419dd4
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_outbound_email_queue'
+down_revision = '1f16d6419dd4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbound_email',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.Unicode(length=300), nullable=False),
+    sa.Column('recipients', sa.Text(), nullable=False),
+    sa.Column('payload_json', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('claimed_by', sa.String(length=64), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbound_email_status_next_attempt', 'outbound_email', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_outbound_email_status_next_attempt', table_name='outbound_email')
+    op.drop_table('outbound_email')
@@ -0,0 +1,42 @@
+"""add denormalized like/comment counters to post
+
+Revision ID: add_post_counters
+Revises: add_media_content_hash
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_post_counters'
+down_revision = 'add_media_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('like_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_post_popular', ['is_active', 'like_count'], unique=False)
+
+    # Mevcut kayıtlardan doldur ("like" ayrılmış kelime; tablo adları SQLAlchemy ile tırnaklanır)
+    post = sa.table('post', sa.column('id', sa.Integer), sa.column('like_count', sa.Integer), sa.column('comment_count', sa.Integer))
+    like = sa.table('like', sa.column('post_id', sa.Integer))
+    comment = sa.table('comment', sa.column('id', sa.Integer), sa.column('post_id', sa.Integer), sa.column('like_count', sa.Integer))
+    comment_like = sa.table('comment_like', sa.column('comment_id', sa.Integer))
+    op.execute(post.update().values(
+        like_count=sa.select(sa.func.count()).where(like.c.post_id == post.c.id).scalar_subquery(),
+        comment_count=sa.select(sa.func.count()).where(comment.c.post_id == post.c.id).scalar_subquery(),
+    ))
+    op.execute(comment.update().values(
+        like_count=sa.select(sa.func.count()).where(comment_like.c.comment_id == comment.c.id).scalar_subquery(),
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_popular')
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('like_count')
@@ -0,0 +1,62 @@
+"""add slot_reservation table for conflict-safe booking
+
+Revision ID: add_slot_reservation
+Revises: add_post_counters
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_slot_reservation'
+down_revision = 'add_post_counters'
+branch_labels = None
+depends_on = None
+
+ACTIVE_STATUSES = ('pending', 'email_confirmed', 'confirmed', 'awaiting_payment', 'paid')
+
+
+def upgrade():
+    slot_reservation = op.create_table(
+        'slot_reservation',
+        sa.Column('staff_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('starts_at', sa.DateTime(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['appointment_id'], ['Appointments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('staff_id', 'starts_at'),
+        sa.UniqueConstraint('appointment_id'),
+    )
+
+    # Gelecekteki aktif randevular için dilimleri ayır; aynı dilimdeki mükerrer
+    # kayıtlardan ilk oluşturulan dilimi alır, diğerleri admin tarafından çözülür
+    appointments = sa.table(
+        'Appointments',
+        sa.column('id', sa.Integer),
+        sa.column('staff_id', sa.Integer),
+        sa.column('appointment_datetime', sa.DateTime),
+        sa.column('status', sa.String),
+    )
+    rows = op.get_bind().execute(
+        sa.select(appointments.c.id, appointments.c.staff_id, appointments.c.appointment_datetime)
+        .where(appointments.c.status.in_(ACTIVE_STATUSES))
+        .where(appointments.c.appointment_datetime >= datetime.now())
+        .order_by(appointments.c.id)
+    ).all()
+    seen = set()
+    reservations = []
+    now = datetime.utcnow()
+    for appointment_id, staff_id, starts_at in rows:
+        key = (staff_id or 0, starts_at)
+        if key not in seen:
+            seen.add(key)
+            reservations.append({'staff_id': key[0], 'starts_at': starts_at, 'appointment_id': appointment_id, 'created_at': now})
+    if reservations:
+        op.bulk_insert(slot_reservation, reservations)
+
+
+def downgrade():
+    op.drop_table('slot_reservation')
@@ -0,0 +1,32 @@
+"""count only approved comments in post.comment_count
+
+Revision ID: approved_comment_count
+Revises: add_newsletter_delivery
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'approved_comment_count'
+down_revision = 'add_newsletter_delivery'
+branch_labels = None
+depends_on = None
+
+post = sa.table('post', sa.column('id', sa.Integer), sa.column('comment_count', sa.Integer))
+comment = sa.table('comment', sa.column('post_id', sa.Integer), sa.column('is_approved', sa.Boolean))
+
+
+def _recount(*conditions):
+    op.execute(post.update().values(
+        comment_count=sa.select(sa.func.count()).where(comment.c.post_id == post.c.id, *conditions).scalar_subquery(),
+    ))
+
+
+def upgrade():
+    _recount(comment.c.is_approved == sa.true())
+
+
+def downgrade():
+    _recount()
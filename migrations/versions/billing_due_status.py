@@ -0,0 +1,24 @@
+"""move billing-generated monthly payments from pending to due
+
+Revision ID: billing_due_status
+Revises: add_keyset_indexes
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'billing_due_status'
+down_revision = 'add_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 'pending' müşterinin ödeme bildirdiği satırlar içindir; faturalamanın
+    # oluşturduğu satırlarda ödeme tarihi yoktur.
+    op.execute("UPDATE monthly_payment SET status = 'due' WHERE status = 'pending' AND payment_date IS NULL")
+
+
+def downgrade():
+    op.execute("UPDATE monthly_payment SET status = 'pending' WHERE status = 'due'")
@@ -0,0 +1,27 @@
+"""Ortak test fixture'ları: her test boş bir veritabanıyla çalışır."""
+import pytest
+
+from SANALMUHASEBECIM.app import create_app
+from SANALMUHASEBECIM.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config.update(WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+    # İstekler kendi app context'lerini açsın (g, Flask-Login kullanıcısı istekler arasında taşınmasın)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def login():
+    def _login(client, user_id):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    return _login
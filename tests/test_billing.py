@@ -0,0 +1,111 @@
+"""billing.run_billing: dönem satırları, gecikme ve hatırlatma aşamaları."""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from SANALMUHASEBECIM.billing import run_billing
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Lead, MonthlyPayment, OutboundEmail, Service, ServiceRequest, User
+
+MARCH = date(2026, 3, 1)
+# BILLING_DUE_DAY=5, BILLING_REMINDER_DAYS=5, BILLING_GRACE_DAYS=3 varsayılanlarıyla
+REMINDER_DAY = date(2026, 3, 1)
+OVERDUE_DAY = date(2026, 3, 20)
+
+
+@pytest.fixture
+def ids(app):
+    with app.app_context():
+        admin = User('Yönetici', 'yonetici@example.com', 'x')
+        admin.is_admin = True
+        client = User('Müşteri Bey', 'musteri@example.com', 'x')
+        service = Service(name='Aylık Muhasebe', slug='aylik-muhasebe')
+        db.session.add_all([admin, client, service])
+        db.session.flush()
+        service_request = ServiceRequest(user_id=client.id, service_id=service.id)
+        db.session.add(service_request)
+        db.session.flush()
+        lead = Lead(
+            service_request_id=service_request.id, user_id=client.id, service_id=service.id,
+            lead_type='monthly', status='paid', monthly_amount=Decimal('1500.00'), iban='TR00',
+        )
+        db.session.add(lead)
+        db.session.commit()
+        return {'admin': admin.id, 'client': client.id, 'lead': lead.id}
+
+
+def _payment(lead_id):
+    return MonthlyPayment.query.filter_by(lead_id=lead_id, payment_month=MARCH).one()
+
+
+def _reminders(prefix):
+    return OutboundEmail.query.filter(OutboundEmail.subject.startswith(prefix)).count()
+
+
+def test_generate_is_idempotent_and_due(app, ids):
+    with app.app_context():
+        first = run_billing(today=REMINDER_DAY)
+        assert first['created'] == 1
+        assert first['due_reminders'] == 1
+        assert _payment(ids['lead']).status == 'due'
+
+        again = run_billing(today=REMINDER_DAY)
+        assert (again['created'], again['due_reminders']) == (0, 0)
+        assert MonthlyPayment.query.count() == 1
+        assert _reminders('Aylık Ödeme Hatırlatması') == 1
+
+
+def test_unpaid_payment_becomes_overdue_once(app, ids):
+    with app.app_context():
+        run_billing(today=REMINDER_DAY)
+        summary = run_billing(today=OVERDUE_DAY)
+        assert (summary['marked_overdue'], summary['overdue_reminders']) == (1, 1)
+        assert _payment(ids['lead']).status == 'overdue'
+
+        summary = run_billing(today=OVERDUE_DAY)
+        assert (summary['marked_overdue'], summary['overdue_reminders']) == (0, 0)
+
+
+def test_client_reported_payment_is_left_alone(app, ids):
+    with app.app_context():
+        run_billing(today=REMINDER_DAY)
+        _payment(ids['lead']).status = 'pending'  # müşteri "Ödendi" dedi, admin onayı bekleniyor
+        db.session.commit()
+
+        summary = run_billing(today=OVERDUE_DAY)
+        assert (summary['marked_overdue'], summary['overdue_reminders']) == (0, 0)
+        assert _payment(ids['lead']).status == 'pending'
+
+
+def test_marked_received_payment_gets_no_reminder(app, ids, login):
+    with app.app_context():
+        run_billing(today=REMINDER_DAY)
+
+    admin = app.test_client()
+    login(admin, ids['admin'])
+    admin.post('/admin/mark-monthly-payment-received', data={'lead_id': ids['lead']})
+
+    with app.app_context():
+        payment = _payment(ids['lead'])
+        assert payment.status == 'confirmed'
+        assert db.session.get(Lead, ids['lead']).next_payment_date == payment.next_payment_date
+
+        summary = run_billing(today=OVERDUE_DAY)
+        assert (summary['marked_overdue'], summary['overdue_reminders']) == (0, 0)
+        assert _reminders('Gecikmiş Ödeme') == 0
+
+
+def test_client_notice_moves_payment_to_admin_confirmation(app, ids, login):
+    with app.app_context():
+        run_billing(today=OVERDUE_DAY)
+        assert _payment(ids['lead']).status == 'overdue'
+
+    client = app.test_client()
+    login(client, ids['client'])
+    client.post(f"/account/notify-payment/{ids['lead']}")
+
+    with app.app_context():
+        payment = _payment(ids['lead'])
+        assert payment.status == 'pending'
+        assert payment.payment_date is not None
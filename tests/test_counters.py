@@ -0,0 +1,63 @@
+"""counters: Post.comment_count yalnızca onaylı yorumları sayar."""
+import pytest
+
+from SANALMUHASEBECIM.counters import reconcile
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Comment, Post, User
+
+
+@pytest.fixture
+def ids(app):
+    with app.app_context():
+        user = User('Okur', 'okur@example.com', 'x')
+        db.session.add(user)
+        db.session.flush()
+        post = Post('Başlık', 'Alt başlık', 'Metin', user)
+        post.slug = 'baslik'
+        db.session.add(post)
+        db.session.commit()
+        return user.id, post.id
+
+
+def _comment_count(post_id):
+    return db.session.get(Post, post_id, populate_existing=True).comment_count
+
+
+def test_comment_count_follows_approval(app, ids):
+    user_id, post_id = ids
+    with app.app_context():
+        approved = Comment(content='Onaylı', user_id=user_id, post_id=post_id)
+        pending = Comment(content='Bekleyen', user_id=user_id, post_id=post_id, is_approved=False)
+        db.session.add_all([approved, pending])
+        db.session.commit()
+        assert _comment_count(post_id) == 1
+
+        pending.is_approved = True
+        db.session.commit()
+        assert _comment_count(post_id) == 2
+
+        approved.is_approved = False
+        db.session.commit()
+        assert _comment_count(post_id) == 1
+
+        db.session.delete(approved)
+        db.session.commit()
+        assert _comment_count(post_id) == 1
+        db.session.delete(pending)
+        db.session.commit()
+        assert _comment_count(post_id) == 0
+
+
+def test_reconcile_counts_approved_comments_only(app, ids):
+    user_id, post_id = ids
+    with app.app_context():
+        db.session.add_all([
+            Comment(content='Onaylı', user_id=user_id, post_id=post_id),
+            Comment(content='Bekleyen', user_id=user_id, post_id=post_id, is_approved=False),
+        ])
+        db.session.commit()
+        db.session.execute(db.update(Post).values(comment_count=5))
+        db.session.commit()
+
+        assert reconcile(post_ids=[post_id])['post.comment_count'] == 1
+        assert _comment_count(post_id) == 1
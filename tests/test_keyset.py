@@ -0,0 +1,67 @@
+"""keyset.paginate: NULL anahtarlar ve eşit değerlerle ileri/geri sayfalama."""
+from datetime import datetime
+
+import pytest
+
+from SANALMUHASEBECIM import keyset
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Subscriber
+
+KEYS = [Subscriber.created_at, Subscriber.id]
+# Eşit zaman damgaları ve NULL'lar: sıralama id ile ayrışmalı
+CREATED = [datetime(2030, 1, 2), None, datetime(2030, 1, 1), datetime(2030, 1, 2), None, datetime(2030, 1, 3), None]
+
+
+@pytest.fixture
+def expected(app):
+    with app.app_context():
+        rows = [Subscriber(email=f'abone{i}@example.com') for i in range(len(CREATED))]
+        db.session.add_all(rows)
+        db.session.flush()
+        for row, created in zip(rows, CREATED):
+            row.created_at = created
+        db.session.commit()
+        # NULL en küçük: DESC sıralamada sonda
+        ordered = sorted(rows, key=lambda r: (r.created_at is not None, r.created_at or datetime.min, r.id), reverse=True)
+        return [row.id for row in ordered]
+
+
+def _walk(descending, per_page=2):
+    pages = []
+    cursor = None
+    while True:
+        page = keyset.paginate(Subscriber.query, KEYS, cursor, per_page=per_page, descending=descending)
+        pages.append(page)
+        if not page.has_next:
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_next_pages_cover_every_row_once(app, expected, descending):
+    order = expected if descending else expected[::-1]
+    with app.app_context():
+        pages = _walk(descending)
+        assert [[row.id for row in page] for page in pages] == [order[i:i + 2] for i in range(0, len(order), 2)]
+        assert [page.page for page in pages] == [1, 2, 3, 4]
+        assert not pages[0].has_prev and pages[-1].has_prev
+
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_prev_pages_return_the_same_rows(app, expected, descending):
+    with app.app_context():
+        forward = [[row.id for row in page] for page in _walk(descending)]
+        page = _walk(descending)[-1]
+        backward = [[row.id for row in page]]
+        while page.has_prev:
+            page = keyset.paginate(Subscriber.query, KEYS, page.prev_cursor, per_page=2, descending=descending)
+            backward.append([row.id for row in page])
+        assert backward[::-1] == forward
+        assert page.page == 1
+
+
+def test_tampered_cursor_falls_back_to_first_page(app, expected):
+    with app.app_context():
+        page = keyset.paginate(Subscriber.query, KEYS, 'bozuk-belirtec', per_page=2)
+        assert [row.id for row in page] == expected[:2]
+        assert page.page == 1 and not page.has_prev
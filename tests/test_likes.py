@@ -0,0 +1,88 @@
+"""likes: tek yazımlı, idempotent beğeni toggle'ı ve sayfa cache'i."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from SANALMUHASEBECIM import likes
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Comment, CommentLike, Like, Post, User
+
+
+@pytest.fixture
+def post_ids(app):
+    app.config.update(PAGE_CACHE_ENABLED=True)
+    with app.app_context():
+        user = User('Okur', 'okur@example.com', 'x')
+        db.session.add(user)
+        db.session.flush()
+        post = Post('Başlık', 'Alt başlık', 'Metin', user)
+        post.slug = 'baslik'
+        post.status = 'published'
+        post.published_at = datetime.utcnow()
+        db.session.add(post)
+        db.session.commit()
+        return user.id, post.id
+
+
+def test_like_invalidates_cached_post_page(app, login, post_ids):
+    user_id, post_id = post_ids
+    anonymous = app.test_client()
+    assert '0 beğeni' in anonymous.get('/blog/baslik').get_data(as_text=True)
+    assert anonymous.get('/blog/baslik').headers['X-Page-Cache'] == 'HIT'
+
+    reader = app.test_client()
+    login(reader, user_id)
+    assert reader.post(f'/blog/like_post/{post_id}').get_json()['likes'] == 1
+
+    response = anonymous.get('/blog/baslik')
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert '1 beğeni' in response.get_data(as_text=True)
+
+    reader.post(f'/blog/like_post/{post_id}')
+    assert '0 beğeni' in anonymous.get('/blog/baslik').get_data(as_text=True)
+
+
+def _like_count(model, pk):
+    return db.session.get(model, pk, populate_existing=True).like_count
+
+
+def test_like_and_unlike_are_idempotent(app, post_ids):
+    user_id, post_id = post_ids
+    with app.app_context():
+        assert likes.like(Post, post_id, user_id) is True
+        assert likes.like(Post, post_id, user_id) is False
+        db.session.commit()
+        assert Like.query.count() == 1
+        assert _like_count(Post, post_id) == 1
+
+        assert likes.unlike(Post, post_id, user_id) is True
+        assert likes.unlike(Post, post_id, user_id) is False
+        db.session.commit()
+        assert Like.query.count() == 0
+        assert _like_count(Post, post_id) == 0
+
+
+def test_toggle_flips_comment_like(app, post_ids):
+    user_id, post_id = post_ids
+    with app.app_context():
+        comment = Comment(content='Yorum', user_id=user_id, post_id=post_id)
+        db.session.add(comment)
+        db.session.commit()
+
+        assert likes.toggle(Comment, comment.id, user_id) == (True, 1)
+        db.session.commit()
+        assert likes.toggle(Comment, comment.id, user_id) == (False, 0)
+        db.session.commit()
+        assert CommentLike.query.count() == 0
+        assert _like_count(Comment, comment.id) == 0
+
+
+def test_unique_index_rejects_duplicate_like(app, post_ids):
+    user_id, post_id = post_ids
+    with app.app_context():
+        likes.like(Post, post_id, user_id)
+        db.session.commit()
+        db.session.add(Like(user_id=user_id, post_id=post_id))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
@@ -0,0 +1,84 @@
+"""mailqueue: sahiplenme, üstel yeniden deneme ve dead-letter."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from SANALMUHASEBECIM import mailqueue
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import OutboundEmail, User
+
+
+class _NoLimit:
+    def acquire(self):
+        pass
+
+
+def _enqueue(subject='Merhaba'):
+    return mailqueue.enqueue_email(subject=subject, recipients=['alici@example.com'], text_body='Metin').id
+
+
+def _row(row_id):
+    return db.session.get(OutboundEmail, row_id, populate_existing=True)
+
+
+def _make_due(row_id):
+    db.session.execute(db.update(OutboundEmail).where(OutboundEmail.id == row_id)
+                       .values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+
+
+def test_drain_sends_pending_message(app):
+    with app.app_context():
+        row_id = _enqueue()
+        assert mailqueue.drain() == 1
+        row = _row(row_id)
+        assert (row.status, row.attempts, row.claimed_by) == ('sent', 0, None)
+        assert row.sent_at is not None
+
+
+def test_claimed_message_is_not_claimed_twice(app):
+    with app.app_context():
+        row_id = _enqueue()
+        assert [row.id for row in mailqueue.claim_batch('worker-a', 10)] == [row_id]
+        assert mailqueue.claim_batch('worker-b', 10) == []
+
+        # worker-a çöktü: sahiplenme zaman aşımından sonra başka worker alır
+        db.session.execute(db.update(OutboundEmail).values(claimed_at=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+        assert [row.id for row in mailqueue.claim_batch('worker-b', 10)] == [row_id]
+
+
+def test_failures_back_off_then_dead_letter(app, monkeypatch):
+    app.config.update(MAIL_QUEUE_MAX_ATTEMPTS=3, MAIL_QUEUE_RETRY_BASE_SECONDS=30)
+
+    def broken(row):
+        raise ValueError('bozuk mesaj')
+
+    monkeypatch.setattr(mailqueue, '_build_message', broken)
+    with app.app_context():
+        row_id = _enqueue()
+        for attempt, delay in ((1, 30), (2, 60)):
+            before = datetime.utcnow()
+            assert mailqueue.process_batch('worker', _NoLimit()) == (1, 0)
+            row = _row(row_id)
+            assert (row.status, row.attempts, row.last_error) == ('pending', attempt, 'bozuk mesaj')
+            assert row.next_attempt_at >= before + timedelta(seconds=delay)
+            # Beklemesi dolmadan tekrar alınmaz
+            assert mailqueue.process_batch('worker', _NoLimit()) == (0, 0)
+            _make_due(row_id)
+
+        assert mailqueue.process_batch('worker', _NoLimit()) == (1, 0)
+        assert _row(row_id).status == 'dead'
+        _make_due(row_id)
+        assert mailqueue.process_batch('worker', _NoLimit()) == (0, 0)
+
+
+def test_enqueue_joins_uncommitted_caller_transaction(app):
+    with app.app_context():
+        db.session.add(User('Yeni', 'yeni@example.com', 'x'))
+        db.session.flush()
+        _enqueue('Hoş geldiniz')
+        db.session.rollback()
+        # Rollback edilen kaydın e-postası da kuyruğa girmez
+        assert OutboundEmail.query.filter_by(subject='Hoş geldiniz').count() == 0
+        assert User.query.filter_by(email='yeni@example.com').count() == 0
@@ -0,0 +1,78 @@
+"""newsletter.send_post_newsletter: yazı başına ilerleme ve kaldığı yerden sürdürme."""
+import json
+from datetime import datetime
+
+import pytest
+
+from SANALMUHASEBECIM import newsletter
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import NewsletterDelivery, OutboundEmail, Post, Subscriber, User
+
+
+@pytest.fixture
+def post_ids(app):
+    with app.app_context():
+        author = User('Yazar', 'yazar@example.com', 'x')
+        db.session.add(author)
+        db.session.flush()
+        posts = []
+        for slug in ('ilk-yazi', 'ikinci-yazi'):
+            post = Post(slug, 'Alt başlık', 'Metin', author)
+            post.slug = slug
+            post.status = 'published'
+            post.published_at = datetime.utcnow()
+            posts.append(post)
+        db.session.add_all(posts)
+        db.session.add_all([
+            Subscriber(email='a@example.com'),
+            Subscriber(email='b@example.com'),
+            Subscriber(email='pasif@example.com', is_active=False),
+        ])
+        db.session.commit()
+        return [post.id for post in posts]
+
+
+def _recipients(post_id):
+    subject = f"Yeni Yazı: {db.session.get(Post, post_id).title}"
+    return sorted(json.loads(row.recipients)[0] for row in OutboundEmail.query.filter_by(subject=subject))
+
+
+def test_each_post_reaches_every_active_subscriber_once(app, post_ids):
+    first, second = post_ids
+    with app.app_context():
+        assert newsletter.send_post_newsletter(first) == 2
+        assert newsletter.send_post_newsletter(first) == 0
+        db.session.add(Subscriber(email='c@example.com'))
+        db.session.commit()
+        # İkinci yazının ilerlemesi ilkinden bağımsız
+        assert newsletter.send_post_newsletter(second) == 3
+        assert newsletter.send_post_newsletter(first) == 1
+
+        assert _recipients(first) == ['a@example.com', 'b@example.com', 'c@example.com']
+        assert _recipients(second) == ['a@example.com', 'b@example.com', 'c@example.com']
+        assert NewsletterDelivery.query.count() == 6
+
+
+def test_interrupted_send_resumes_without_duplicates(app, post_ids, monkeypatch):
+    first, _ = post_ids
+    monkeypatch.setattr(newsletter, 'PAGE_SIZE', 1)
+    calls = []
+    enqueue = newsletter.enqueue_email
+
+    def flaky_enqueue(**kwargs):
+        calls.append(kwargs['recipients'])
+        if len(calls) == 2:
+            raise RuntimeError('bağlantı koptu')
+        return enqueue(**kwargs)
+
+    with app.app_context():
+        monkeypatch.setattr(newsletter, 'enqueue_email', flaky_enqueue)
+        with pytest.raises(RuntimeError):
+            newsletter.send_post_newsletter(first)
+        db.session.rollback()
+        # İlk sayfa e-postası ve kaydıyla birlikte yazıldı, ikincisi hiç yazılmadı
+        assert _recipients(first) == ['a@example.com']
+
+        monkeypatch.setattr(newsletter, 'enqueue_email', enqueue)
+        assert newsletter.send_post_newsletter(first) == 1
+        assert _recipients(first) == ['a@example.com', 'b@example.com']
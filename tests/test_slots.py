@@ -0,0 +1,87 @@
+"""slots: aynı dilim iki randevuya verilmez, iptal dilimi bırakır."""
+from datetime import datetime
+
+import pytest
+
+from SANALMUHASEBECIM import slots
+from SANALMUHASEBECIM.extensions import db
+from SANALMUHASEBECIM.models import Appointment, SlotReservation, User
+
+# Varsayılan BOOKING_WORKING_HOURS 'mon-sun 09:00-18:00', 30 dakikalık dilimler
+SLOT = datetime(2030, 6, 3, 10, 0)
+
+
+def _book(email, starts_at=SLOT):
+    appointment = Appointment(email, starts_at)
+    db.session.add(appointment)
+    slots.reserve(appointment)
+    db.session.commit()
+    return appointment
+
+
+def _taken_times():
+    return slots.taken_slots(SLOT.year, SLOT.month).get(SLOT.date().isoformat(), [])
+
+
+def test_second_booking_of_a_slot_is_rejected(app):
+    with app.app_context():
+        first = _book('bir@example.com')
+        assert _taken_times() == ['10:00']
+
+        second = Appointment('iki@example.com', SLOT)
+        db.session.add(second)
+        with pytest.raises(slots.SlotTaken):
+            slots.reserve(second)
+        # Savepoint geri alındı; dış transaction kullanılabilir durumda
+        db.session.rollback()
+        assert SlotReservation.query.one().appointment_id == first.id
+
+
+def test_times_outside_working_hours_are_rejected(app):
+    with app.app_context():
+        for starts_at in (datetime(2030, 6, 3, 8, 0), datetime(2030, 6, 3, 10, 10)):
+            appointment = Appointment('erken@example.com', starts_at)
+            db.session.add(appointment)
+            with pytest.raises(slots.SlotUnavailable):
+                slots.reserve(appointment)
+            db.session.rollback()
+
+
+def test_cancelling_releases_the_slot(app):
+    with app.app_context():
+        first = _book('bir@example.com')
+        assert _taken_times() == ['10:00']
+
+        first.status = 'cancelled'
+        db.session.commit()
+        assert SlotReservation.query.count() == 0
+        assert _taken_times() == []
+        assert _book('iki@example.com').id != first.id
+
+
+def test_reactivation_reserves_again_or_is_refused(app, login):
+    with app.app_context():
+        admin = User('Yönetici', 'yonetici@example.com', 'x')
+        admin.is_admin = True
+        db.session.add(admin)
+        db.session.commit()
+        first = _book('bir@example.com')
+        first.status = 'cancelled'
+        db.session.commit()
+        admin_id, first_id = admin.id, first.id
+
+    client = app.test_client()
+    login(client, admin_id)
+    client.post(f'/admin/appointment/{first_id}/update-status', data={'status': 'pending'})
+    with app.app_context():
+        assert db.session.get(Appointment, first_id).status == 'pending'
+        assert SlotReservation.query.one().appointment_id == first_id
+
+        db.session.get(Appointment, first_id).status = 'cancelled'
+        db.session.commit()
+        second_id = _book('iki@example.com').id
+
+    client.post(f'/admin/appointment/{first_id}/update-status', data={'status': 'pending'})
+    with app.app_context():
+        assert db.session.get(Appointment, first_id).status == 'cancelled'
+        assert SlotReservation.query.one().appointment_id == second_id